@@ -0,0 +1,6 @@
+'''Benchmarks
+
+Each module is a benchmark that can be run on its own, e.g.:
+
+    python -m benchmarks.navigation
+'''
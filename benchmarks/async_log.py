@@ -0,0 +1,64 @@
+'''Asynchronous logging benchmark
+
+Compares the throughput of ``rover_control.py`` with and without
+``--async-log``, at debug level by default, where every step is traced.
+
+Usage:
+    python -m benchmarks.async_log [--rovers N] [--length N]
+        [--log-level LEVEL]
+'''
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import rover_control
+from benchmarks.helpers import replaced_argv
+from benchmarks.log_overhead import write_file
+
+
+def run(argv, terminal):
+    '''Runs rover_control.py with argv and returns how long it took
+
+    The terminal output goes to a file, like it would to a real terminal.
+    '''
+    with open(os.devnull, "w", encoding="utf-8") as devnull, \
+            open(terminal, "w", encoding="utf-8") as stderr, \
+            contextlib.redirect_stdout(devnull), \
+            contextlib.redirect_stderr(stderr), \
+            replaced_argv(["rover_control.py"] + argv):
+        start = time.perf_counter()
+        rover_control.main()
+        return time.perf_counter() - start
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=200,
+                        help="Rovers in the file. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=500,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--log-level", default="debug",
+                        help="rover_control.py log level. "
+                             "Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    commands = options.rovers * options.length
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        write_file(path, options.rovers, options.length)
+        for name, extra in (("sync", []), ("async", ["--async-log"])):
+            log_file = os.path.join(tmp_dir, f"{name}.log")
+            terminal = os.path.join(tmp_dir, f"{name}.err")
+            elapsed = run(["-f", path, "--log-file", log_file,
+                           "--log-level", options.log_level] + extra,
+                          terminal)
+            print(f"{name:>6}: {elapsed:7.3f} s "
+                  f"({commands / elapsed:10,.0f} cmds/s)")
+
+
+if __name__ == "__main__":
+    main()
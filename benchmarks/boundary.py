@@ -0,0 +1,125 @@
+'''Boundary-heavy benchmark
+
+Runs edge-hugging survey patterns, where a large fraction of the moves are
+rejected by the edges of a small plateau, in three ways:
+
+* ``exceptions``: one command at a time with :meth:
+  `rover.navigation.Navigation.process_cmd`, catching each
+  ``BoundaryError`` and logging it with its traceback, as the rovers used to;
+* ``try_move``: one command at a time too, but moving with :meth:
+  `rover.navigation.Navigation.try_move`, which returns a status instead of
+  raising, and counting the rejected moves;
+* ``status``: with :meth: `rover.navigation.Navigation.process_cmds`, which
+  checks the moves inline without raising and logs the rejected ones once.
+
+The errors are logged to a file, as ``rover_control.py`` does by default.
+
+Usage:
+    python -m benchmarks.boundary [--rovers N] [--length N] [--size N]
+'''
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+import rover.exceptions as exceptions
+import rover.navigation as navigation
+
+
+def survey_patterns(rovers, length, size, seed=0):
+    '''Lawnmower patterns with legs longer than the plateau'''
+    rand = random.Random(seed)
+    patterns = []
+    for _ in range(rovers):
+        leg = "M" * rand.randint(size, 2 * size)
+        turn = rand.choice(("RMR", "LML"))
+        pattern = (leg + turn + leg + turn[::-1]) * length
+        patterns.append(pattern[:length])
+    return patterns
+
+
+def with_exceptions(nav, commands):
+    '''Runs the commands one at a time, logging each rejected move'''
+    rejected = 0
+    for command in commands:
+        try:
+            nav.process_cmd(command)
+        except exceptions.BoundaryError as err:
+            logging.exception(err)
+            rejected += 1
+    return rejected
+
+
+def with_try_move(nav, commands):
+    '''Runs the commands one at a time, counting the rejected moves'''
+    rejected = 0
+    for command in commands:
+        if command == "M":
+            if nav.try_move() != navigation.MOVED:
+                rejected += 1
+        else:
+            nav.process_cmd(command)
+    if rejected:
+        logging.error("rejected %d moves", rejected)
+    return rejected
+
+
+def with_status(nav, commands):
+    '''Runs the commands without raising'''
+    rejected, _ = nav.process_cmds(commands)
+    return rejected
+
+
+def run(function, patterns, size):
+    '''Runs each pattern from a corner, returning the time and rejections'''
+    nav = navigation.Navigation()
+    nav.set_boundaries((size, size))
+    rejected = 0
+    start = time.perf_counter()
+    for commands in patterns:
+        nav.set_xy(0, 0)
+        nav.location.heading = 0
+        rejected += function(nav, commands)
+    return time.perf_counter() - start, rejected
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=200,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=1000,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--size", type=int, default=10,
+                        help="Upper limits of the plateau. "
+                             "Default: %(default)s")
+    options = parser.parse_args()
+    patterns = survey_patterns(options.rovers, options.length, options.size)
+    commands = options.rovers * options.length
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        handler = logging.FileHandler(os.path.join(tmp_dir, "rover.log"))
+        logging.getLogger().addHandler(handler)
+        try:
+            results = {
+                name: run(function, patterns, options.size)
+                for name, function in [("exceptions", with_exceptions),
+                                       ("try_move", with_try_move),
+                                       ("status", with_status)]
+            }
+        finally:
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+
+    for name, (seconds, rejected) in results.items():
+        print(f"{name:>10}: {seconds:.3f}s, {commands / seconds:,.0f} cmds/s, "
+              f"{rejected / commands:.0%} rejected")
+    for name in ("try_move", "status"):
+        speedup = results["exceptions"][0] / results[name][0]
+        print(f"{name} is {speedup:.1f}x faster than exceptions")
+
+
+if __name__ == "__main__":
+    main()
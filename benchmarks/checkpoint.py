@@ -0,0 +1,81 @@
+'''Checkpoint benchmark
+
+Processes a mission written by :mod: `benchmarks.mission` with and without
+checkpoints, to measure what saving them costs, and how long it takes to
+restore the last one.
+
+Usage:
+    python -m benchmarks.checkpoint [--rovers N] [--length N] [--every N]
+        [--avoid-collisions]
+'''
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import rover.checkpoint as checkpoints
+import rover.control as controller
+import rover.sinks as sinks
+import rover_control
+
+from . import mission
+
+
+def timed(function, *args, **kwargs):
+    '''Calls the function and returns how long it took'''
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=200000,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=50,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--every", type=int, default=10000,
+                        help="Lines between checkpoints. Default: %(default)s")
+    parser.add_argument("--avoid-collisions", action="store_true",
+                        help="Keep a fleet, journaled at each checkpoint")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "mission.txt")
+        mission.generate(path, None, mission.parse_args(
+            [path, "--rovers", str(options.rovers),
+             "--length", str(options.length)]))
+        output = os.path.join(tmp_dir, "output.txt")
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint")
+
+        def run(checkpoint=None, resume=False):
+            mode = "a" if resume else "w"
+            with open(output, mode, encoding="utf-8") as stream:
+                sink = sinks.BufferedSink(stream)
+                rover_control.process_from_file(
+                    path, avoid_collisions=options.avoid_collisions,
+                    sink=sink, checkpoint=checkpoint, resume=resume)
+                sink.close()
+
+        plain = timed(run)
+        saving = timed(run, checkpoints.Checkpoint(
+            checkpoint_path, options.every))
+
+        # restore the last checkpoint, with the whole fleet, if any
+        restore = checkpoints.Checkpoint(checkpoint_path)
+        control = controller.Control(
+            avoid_collisions=options.avoid_collisions)
+        resuming = timed(restore.open, control, resume=True)
+        restore.close()
+
+    print(f"no checkpoints:   {plain:.3f}s")
+    print(f"every {options.every} lines: {saving:.3f}s "
+          f"({(saving / plain - 1) * 100:+.1f}%)")
+    print(f"restoring {len(control.fleet)} parked rovers: {resuming:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
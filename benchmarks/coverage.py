@@ -0,0 +1,77 @@
+'''Coverage benchmark
+
+Runs a fleet of survey rovers with and without a shared coverage map, see
+:mod: `rover.coverage`, with each engine, and reports the covered area.
+
+Usage:
+    python -m benchmarks.coverage [--rovers N] [--length N] [--plateau N]
+        [--sparse]
+'''
+import argparse
+import logging
+import random
+import time
+
+import rover.control as controller
+import rover.coverage as coverage
+import rover.sinks as sinks
+
+
+def make_lines(rovers, length, size, seed=0):
+    '''Rovers running long legs and turning, like survey patterns'''
+    rand = random.Random(seed)
+    lines = [f"{size} {size}"]
+    for _ in range(rovers):
+        lines.append(f"{rand.randint(0, size)} {rand.randint(0, size)} "
+                     f"{rand.choice('NESW')}")
+        cmds = []
+        while len(cmds) < length:
+            cmds.extend("M" * rand.randint(1, 40))
+            cmds.append(rand.choice("LR"))
+        lines.append("".join(cmds[:length]))
+    return lines
+
+
+def run(lines, engine, track_coverage):
+    '''Processes the lines, returning how long it took and the controller'''
+    control = controller.Control(
+        engine, sink=sinks.ListSink(), track_coverage=track_coverage)
+    start = time.perf_counter()
+    for line in lines:
+        control.process(line)
+    return time.perf_counter() - start, control
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=2000,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=1000,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--plateau", type=int, default=1000,
+                        help="Upper limits of the plateau. "
+                             "Default: %(default)s")
+    parser.add_argument("--sparse", action="store_true",
+                        help="Use the hash set instead of the bitmap")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    if options.sparse:
+        coverage.Coverage.max_bitmap_cells = 0
+    lines = make_lines(options.rovers, options.length, options.plateau)
+    commands = options.rovers * options.length
+
+    for engine in controller.rover.Rover.engines:
+        plain = min(run(lines, engine, False)[0] for _ in range(3))
+        tracked = min(run(lines, engine, True)[0] for _ in range(3))
+        _, control = run(lines, engine, True)
+        print(f"{engine:>9}: {commands / plain:,.0f} cmds/s without map, "
+              f"{commands / tracked:,.0f} cmds/s with map "
+              f"({(tracked / plain - 1) * 100:+.0f}%)")
+    cells = (options.plateau + 1) ** 2
+    print(f"covered {len(control.coverage)} of {cells} cells "
+          f"({len(control.coverage) / cells:.1%})")
+
+
+if __name__ == "__main__":
+    main()
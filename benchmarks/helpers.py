@@ -0,0 +1,14 @@
+'''Helpers shared by the benchmarks'''
+import contextlib
+import sys
+
+
+@contextlib.contextmanager
+def replaced_argv(argv):
+    '''Temporarily replaces sys.argv, e.g. to run a script's main()'''
+    old_argv = sys.argv
+    sys.argv = argv
+    try:
+        yield
+    finally:
+        sys.argv = old_argv
@@ -0,0 +1,91 @@
+'''Input benchmark
+
+Compares reading a command file line by line (:func: `rover_control.
+get_next_line`) against mapping it into memory (``--mmap``), both for the
+reading alone and for processing the whole file.
+
+Usage:
+    python -m benchmarks.input [--rovers N] [--length N] [--engine ENGINE]
+'''
+import argparse
+import contextlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import rover_control
+
+
+def write_file(path, rovers, length, seed=0):
+    '''Writes a command file with many rovers on a big plateau'''
+    rand = random.Random(seed)
+    size = 10 ** 6
+    runs = []
+    for _ in range(0, length, 26):
+        runs.append(rand.choice("LR") + "M" * rand.randint(1, 50))
+    cmds = "".join(runs)[:length]
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write(f"{size} {size}\n")
+        for _ in range(rovers):
+            cmd_file.write(f"{rand.randint(0, size)} {rand.randint(0, size)} "
+                           f"{rand.choice('NESW')}\n{cmds}\n")
+
+
+def timed(func):
+    '''Runs func and returns how long it took, in seconds'''
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def read_lines(path):
+    '''Only reads the lines, like process_from_file does'''
+    for line in rover_control.get_next_line(path):
+        line.strip()
+
+
+def read_mmap(path):
+    '''Only reads the lines, like process_from_file does with mmap'''
+    for _ in rover_control.get_next_line_mmap(path):
+        pass
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=100000,
+                        help="Rovers in the file. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=1000,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--engine", default="runlength",
+                        help="Navigation engine. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    # only measure the input path
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        write_file(path, options.rovers, options.length)
+        size = os.path.getsize(path) / 2 ** 20
+
+        cases = {
+            "read lines": lambda: read_lines(path),
+            "read mmap": lambda: read_mmap(path),
+            "process lines": lambda: rover_control.process_from_file(
+                path, options.engine),
+            "process mmap": lambda: rover_control.process_from_file(
+                path, options.engine, use_mmap=True),
+        }
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                results = {name: timed(case) for name, case in cases.items()}
+
+    for name, elapsed in results.items():
+        print(f"{name:>15}: {elapsed:7.3f} s ({size / elapsed:8.1f} MiB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+'''Logging overhead benchmark
+
+Runs ``rover_control.py`` on a large file under the profiler and reports how
+much of the time is spent inside the logging module.
+
+Usage:
+    python -m benchmarks.log_overhead [--rovers N] [--length N]
+        [--log-level LEVEL] [--engine ENGINE]
+'''
+import argparse
+import contextlib
+import cProfile
+import logging
+import os
+import pstats
+import random
+import sys
+import tempfile
+import time
+
+import rover_control
+from benchmarks.helpers import replaced_argv
+
+
+def write_file(path, rovers, length, seed=0):
+    '''Writes a command file where the rovers rarely reach the edges'''
+    rand = random.Random(seed)
+    size = 10 ** 6
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write(f"{size} {size}\n")
+        for _ in range(rovers):
+            cmds = "".join(rand.choice("LRMM") for _ in range(length))
+            cmd_file.write(f"{rand.randint(1000, size - 1000)} "
+                           f"{rand.randint(1000, size - 1000)} "
+                           f"{rand.choice('NESW')}\n{cmds}\n")
+
+
+def logging_time(stats):
+    '''Sums the time spent in the functions of the logging package'''
+    logging_dir = os.path.dirname(logging.__file__)
+    return sum(
+        tottime
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items()
+        if filename.startswith(logging_dir)
+    )
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=2000,
+                        help="Rovers in the file. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=500,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--log-level", default="warn",
+                        help="rover_control.py log level. "
+                             "Default: %(default)s")
+    parser.add_argument("--engine", default="step",
+                        help="Navigation engine. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        log_file = os.path.join(tmp_dir, "rover.log")
+        write_file(path, options.rovers, options.length)
+        argv = ["rover_control.py", "-f", path, "--log-file", log_file,
+                "--log-level", options.log_level, "--engine", options.engine]
+
+        profiler = cProfile.Profile()
+        with open(os.devnull, "w", encoding="utf-8") as devnull, \
+                contextlib.redirect_stdout(devnull), \
+                contextlib.redirect_stderr(devnull), \
+                replaced_argv(argv):
+            start = time.perf_counter()
+            profiler.runcall(rover_control.main)
+            elapsed = time.perf_counter() - start
+
+    stats = pstats.Stats(profiler)
+    in_logging = logging_time(stats)
+    commands = options.rovers * options.length
+    print(f"wall time: {elapsed:.3f} s ({commands / elapsed:,.0f} cmds/s)")
+    print(f"logging:   {in_logging:.3f} s of {stats.total_tt:.3f} s profiled "
+          f"({100 * in_logging / stats.total_tt:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
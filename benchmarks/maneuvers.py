@@ -0,0 +1,77 @@
+'''Maneuver cache benchmark
+
+Runs a fleet that reuses a small library of canned maneuvers (survey
+patterns and turns in place) with and without a
+:class: `rover.maneuvers.ManeuverCache`, for each engine.
+
+Usage:
+    python -m benchmarks.maneuvers [--rovers N] [--library N]
+'''
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import rover.maneuvers as maneuvers
+import rover.sinks as sinks
+import rover_control
+
+
+def survey(rand):
+    '''A lawnmower pattern, sweeping a rectangle row by row'''
+    width = rand.randint(5, 40)
+    rows = rand.randint(2, 10)
+    pattern = []
+    for row in range(rows):
+        turn = "R" if row % 2 == 0 else "L"
+        pattern.append("M" * width + turn + "M" + turn)
+    return "".join(pattern)
+
+
+def spin(rand):
+    '''Turning in place'''
+    return rand.choice(["RRRR", "LLLL", "RL" * 10, "LLRRLLRR"])
+
+
+def write_file(path, rovers, library, seed=0):
+    '''Writes a command file where every rover runs one of the library'''
+    rand = random.Random(seed)
+    size = 10 ** 6
+    canned = [rand.choice([survey, survey, spin])(rand)
+              for _ in range(library)]
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write(f"{size} {size}\n")
+        for _ in range(rovers):
+            cmd_file.write(f"{rand.randint(0, size)} {rand.randint(0, size)} "
+                           f"{rand.choice('NESW')}\n{rand.choice(canned)}\n")
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=20000,
+                        help="Rovers in the file. Default: %(default)s")
+    parser.add_argument("--library", type=int, default=50,
+                        help="Canned maneuvers. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        write_file(path, options.rovers, options.library)
+        for engine in ("step", "runlength"):
+            for cache in (None, maneuvers.ManeuverCache()):
+                start = time.perf_counter()
+                rover_control.process_from_file(
+                    path, engine, sink=sinks.Sink(), maneuver_cache=cache)
+                elapsed = time.perf_counter() - start
+                info = "no cache" if cache is None else cache.info()
+                print(f"{engine:>9}: {elapsed:7.3f} s "
+                      f"({options.rovers / elapsed:10,.0f} rovers/s) {info}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+'''Memory benchmark
+
+Measures the memory footprint of each rover, by creating many of them and
+placing them on a plateau like :class: `rover.control.Control` does when
+keeping a fleet.
+
+Usage:
+    python -m benchmarks.memory [--rovers N]
+'''
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import rover.location_storage
+import rover.navigation
+import rover.rover
+
+
+def new_location(index):
+    '''A placed LocationStorage'''
+    location = rover.location_storage.LocationStorage()
+    location.boundaries = (10 ** 6, 10 ** 6)
+    location.position = (index, index)
+    return location
+
+
+def new_navigation(index):
+    '''A placed Navigation'''
+    nav = rover.navigation.Navigation()
+    nav.set_boundaries((10 ** 6, 10 ** 6))
+    nav.set_position((index, index))
+    return nav
+
+
+def new_rover(index):
+    '''A placed Rover'''
+    mars_hover = rover.rover.Rover()
+    mars_hover.set_boundaries(10 ** 6, 10 ** 6)
+    mars_hover.set_inital_position(index, index, "N")
+    return mars_hover
+
+
+def footprint(factory, count):
+    '''Creates count objects and returns the memory used by each one
+
+    :returns: The size in bytes of each object
+    :rtype: float
+    '''
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = [factory(index % 10 ** 6) for index in range(count)]
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=10 ** 6,
+                        help="How many rovers to create. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    for name, factory in (("LocationStorage", new_location),
+                          ("Navigation", new_navigation),
+                          ("Rover", new_rover)):
+        size = footprint(factory, options.rovers)
+        total = size * options.rovers / 2 ** 20
+        print(f"{name:>15}: {size:7.1f} bytes/rover "
+              f"({total:8.1f} MiB for {options.rovers} rovers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+'''Metrics overhead benchmark
+
+Processes the same rovers without metrics, with metrics disabled and with
+metrics enabled, see :mod: `rover.metrics`, and prints what was collected.
+
+Usage:
+    python -m benchmarks.metrics [--rovers N] [--length N] [--engine ENGINE]
+'''
+import argparse
+import logging
+import random
+import time
+
+import rover.control as controller
+import rover.metrics as metrics
+import rover.sinks as sinks
+
+
+def make_lines(rovers, length, seed=0):
+    '''Lines of a plateau with many rovers, some going past the edges'''
+    rand = random.Random(seed)
+    size = 100
+    lines = [f"{size} {size}"]
+    for _ in range(rovers):
+        lines.append(f"{rand.randint(0, size)} {rand.randint(0, size)} "
+                     f"{rand.choice('NESW')}")
+        lines.append("".join(rand.choice("LRMMM") for _ in range(length)))
+    return lines
+
+
+def run(lines, engine, run_metrics):
+    '''Processes the lines, returning how long it took'''
+    control = controller.Control(
+        engine, sink=sinks.ListSink(), metrics=run_metrics)
+    start = time.perf_counter()
+    for line in lines:
+        control.process(line)
+    return time.perf_counter() - start
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=100000,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=20,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--engine", default="step",
+                        choices=controller.rover.Rover.engines,
+                        help="Engine of the rovers. Default: %(default)s")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    lines = make_lines(options.rovers, options.length)
+
+    enabled = metrics.Metrics()
+    for name, run_metrics in [("no metrics", None),
+                              ("disabled", metrics.Metrics(enabled=False)),
+                              ("enabled", enabled)]:
+        best = min(run(lines, options.engine, run_metrics) for _ in range(3))
+        print(f"{name:>10}: {best:.3f}s")
+    print(enabled.to_json(), end="")
+
+
+if __name__ == "__main__":
+    main()
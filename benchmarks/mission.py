@@ -0,0 +1,201 @@
+'''Mission generator
+
+Writes big, valid command files for load testing, together with the output
+``rover_control.py`` is expected to print for them, so large runs can be
+checked for correctness:
+
+    python -m benchmarks.mission mission.txt --expected expected.txt \\
+        --rovers 1000000
+    ./rover_control.py -f mission.txt -o output.txt
+    cmp output.txt expected.txt
+
+The file is streamed to disk, a piece of a command line at a time, so neither
+the number of rovers nor the length of the lines is limited by memory, and the
+same seed always writes the same files.
+
+The commands are generated as turns followed by straight runs of moves. The
+expected output is computed by a reference that is independent from the
+:mod: `rover` package: it knows how far each run is from the edge of the
+plateau, so it only has to clamp it. A run either stays inside the plateau or,
+for a ``--out-of-bounds`` fraction of them, goes past the edge, and those
+moves are rejected. Invalid commands (``--invalid``) and malformed coordinates
+lines (``--malformed``), which the controller skips, can be mixed in.
+
+Usage:
+    python -m benchmarks.mission FILE [--expected FILE] [--rovers N]
+        [--plateau X Y] [--length N] [--distribution NAME]
+        [--out-of-bounds F] [--invalid F] [--malformed F] [--seed N]
+'''
+import argparse
+import random
+import sys
+
+# headings clockwise from North, like rover.cardinal, but kept apart on
+# purpose so the reference doesn't share code with what it checks
+NAMES = "NESW"
+STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# longest run of moves that stays inside the plateau
+MAX_RUN = 64
+
+# how many chars of a command line are kept before writing them
+WRITE_SIZE = 2 ** 16
+
+INVALID_COMMANDS = "XTQ?"
+
+
+def malformed_line(rand, boundaries):
+    '''A coordinates line the controller rejects, without changing state'''
+    x_max, y_max = boundaries
+    return rand.choice([
+        "",
+        "1 1",
+        "N N N",
+        f"-1 0 {rand.choice(NAMES)}",
+        f"{x_max + 1} {y_max} {rand.choice(NAMES)}",
+        f"0 0 {rand.choice('XYZ')}",
+    ])
+
+
+def command_length(rand, mean, distribution):
+    '''Draws the length of a command line'''
+    if distribution == "fixed":
+        return mean
+    if distribution == "uniform":
+        return rand.randint(0, 2 * mean)
+    return int(rand.expovariate(1 / mean)) if mean else 0
+
+
+def distance_to_edge(x, y, heading, boundaries):
+    '''How many moves fit between the position and the edge ahead'''
+    x_max, y_max = boundaries
+    return (y_max - y, x_max - x, y, x)[heading]
+
+
+def write_commands(out, rand, length, position, heading, boundaries,
+                   options):
+    '''Writes a command line of length commands and runs it
+
+    :returns: The final position and heading
+    :rtype: tuple
+    '''
+    x, y = position
+    pending = []
+    pending_size = 0
+    written = 0
+    while written < length:
+        turn = rand.choice(("L", "R", "", "LL"))[:length - written]
+        for cmd in turn:
+            heading = (heading + (1 if cmd == "R" else -1)) % 4
+
+        room = distance_to_edge(x, y, heading, boundaries)
+        if rand.random() < options.out_of_bounds:
+            run = room + rand.randint(1, MAX_RUN)
+        else:
+            run = rand.randint(0, min(room, MAX_RUN))
+        run = min(run, length - written - len(turn))
+        moved = min(run, room)
+        step_x, step_y = STEPS[heading]
+        x += step_x * moved
+        y += step_y * moved
+
+        piece = turn + "M" * run
+        if (len(piece) < length - written
+                and rand.random() < options.invalid):
+            piece += rand.choice(INVALID_COMMANDS)
+        pending.append(piece)
+        pending_size += len(piece)
+        written += len(piece)
+        if pending_size >= WRITE_SIZE:
+            out.write("".join(pending))
+            pending.clear()
+            pending_size = 0
+    out.write("".join(pending))
+    out.write("\n")
+    return (x, y), heading
+
+
+def generate(path, expected_path, options):
+    '''Writes the mission and, if expected_path is set, its expected output
+
+    :returns: How many rovers and commands were written
+    :rtype: dict
+    '''
+    rand = random.Random(options.seed)
+    boundaries = tuple(options.plateau)
+    x_max, y_max = boundaries
+    total = 0
+    expected = None
+    if expected_path:
+        expected = open(expected_path, "w", encoding="utf-8")
+    try:
+        with open(path, "w", encoding="utf-8") as out:
+            out.write(f"{x_max} {y_max}\n")
+            for _ in range(options.rovers):
+                if rand.random() < options.malformed:
+                    out.write(malformed_line(rand, boundaries) + "\n")
+                position = (rand.randint(0, x_max), rand.randint(0, y_max))
+                heading = rand.randrange(4)
+                out.write(f"{position[0]} {position[1]} {NAMES[heading]}\n")
+                length = command_length(
+                    rand, options.length, options.distribution)
+                total += length
+                position, heading = write_commands(
+                    out, rand, length, position, heading, boundaries, options)
+                if expected is not None:
+                    expected.write(
+                        f"{position[0]} {position[1]} {NAMES[heading]}\n")
+    finally:
+        if expected is not None:
+            expected.close()
+    return {"rovers": options.rovers, "commands": total}
+
+
+def parse_args(argv):
+    '''Parse the arguments of the generator'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("path", metavar="FILE", help="Mission file to write")
+    parser.add_argument("--expected", metavar="FILE",
+                        help="Also write the expected output to FILE")
+    parser.add_argument("--rovers", type=int, default=1000,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--plateau", type=int, nargs=2, metavar=("X", "Y"),
+                        default=[10 ** 9, 10 ** 9],
+                        help="Upper limits of the plateau. "
+                             "Default: 10^9 10^9")
+    parser.add_argument("--length", type=int, default=100,
+                        help="Mean commands per rover. Default: %(default)s")
+    parser.add_argument("--distribution", default="fixed",
+                        choices=("fixed", "uniform", "exponential"),
+                        help="Distribution of the command lengths. "
+                             "One of: %(choices)s. Default: %(default)s")
+    parser.add_argument("--out-of-bounds", type=float, default=0.0,
+                        metavar="F",
+                        help="Fraction of runs of moves that go past the "
+                             "edge. Default: %(default)s")
+    parser.add_argument("--invalid", type=float, default=0.0, metavar="F",
+                        help="Chance of an invalid command after each run. "
+                             "Default: %(default)s")
+    parser.add_argument("--malformed", type=float, default=0.0, metavar="F",
+                        help="Chance of a malformed coordinates line before "
+                             "each rover. Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the random generator. "
+                             "Default: %(default)s")
+    options = parser.parse_args(argv)
+    if min(options.plateau) < 0:
+        parser.error("--plateau must not be negative")
+    if options.rovers < 0 or options.length < 0:
+        parser.error("--rovers and --length must not be negative")
+    return options
+
+
+def main():
+    '''Parse arguments and write the mission'''
+    options = parse_args(sys.argv[1:])
+    stats = generate(options.path, options.expected, options)
+    print(f"{stats['rovers']} rovers, {stats['commands']} commands")
+
+
+if __name__ == "__main__":
+    main()
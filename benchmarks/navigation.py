@@ -0,0 +1,64 @@
+'''Navigation micro-benchmark
+
+Measures the cost of each command processed by
+:meth:`rover.navigation.Navigation.process_cmd`, plus setting the initial
+orientation.
+
+Usage:
+    python -m benchmarks.navigation [--number N]
+'''
+import argparse
+import sys
+import timeit
+
+import rover.navigation
+
+
+def setup_navigation():
+    '''Creates a navigation system on a plateau big enough to never hit an
+    edge during the benchmark'''
+    nav = rover.navigation.Navigation()
+    nav.set_boundaries((10 ** 9, 10 ** 9))
+    nav.set_position((5 * 10 ** 8, 5 * 10 ** 8))
+    return nav
+
+
+def run(number):
+    '''Runs the benchmark
+
+    :param number: How many times each command is processed
+    :type number: int
+
+    :returns: The cost in nanoseconds of each command
+    :rtype: dict
+    '''
+    nav = setup_navigation()
+    cases = {
+        "L": lambda: nav.process_cmd("L"),
+        "R": lambda: nav.process_cmd("R"),
+        "M": lambda: nav.process_cmd("M"),
+        "orientation W": lambda: nav.set_initial_orientation("W"),
+    }
+    results = {}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=number, repeat=5))
+        results[name] = best / number * 1e9
+    return results
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=200000,
+        help="Times each command is processed. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    for name, cost in run(options.number).items():
+        print(f"{name:>15}: {cost:8.1f} ns/cmd")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+'''Obstacle map benchmark
+
+Loads a map with millions of obstacles, see :mod: `rover.obstacles`, as text
+and in the memory-mapped binary form, then runs a fleet of survey rovers
+with and without the map, with each engine.
+
+Usage:
+    python -m benchmarks.obstacles [--cells N] [--rectangles N]
+        [--plateau N] [--rovers N] [--length N]
+'''
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+import rover.control as controller
+import rover.obstacles as obstacles
+import rover.sinks as sinks
+from benchmarks.coverage import make_lines
+
+
+def write_map(path, cells, rectangles, size, seed=0):
+    '''Scattered rocks and a few craters'''
+    rand = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write("".join(
+            f"{rand.randint(0, size)} {rand.randint(0, size)}\n"
+            for _ in range(cells)))
+        for _ in range(rectangles):
+            x, y = rand.randint(0, size), rand.randint(0, size)
+            stream.write(f"{x} {y} {x + rand.randint(0, 20)} "
+                         f"{y + rand.randint(0, 20)}\n")
+
+
+def run(lines, engine, map_path):
+    '''Processes the lines, returning how long it took'''
+    control = controller.Control(
+        engine, sink=sinks.ListSink(), obstacles=map_path)
+    start = time.perf_counter()
+    for line in lines:
+        control.process(line)
+    return time.perf_counter() - start
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--cells", type=int, default=2000000,
+                        help="How many blocked cells. Default: %(default)s")
+    parser.add_argument("--rectangles", type=int, default=10000,
+                        help="How many blocked rectangles. "
+                             "Default: %(default)s")
+    parser.add_argument("--plateau", type=int, default=4000,
+                        help="Upper limits of the plateau. "
+                             "Default: %(default)s")
+    parser.add_argument("--rovers", type=int, default=1000,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=1000,
+                        help="Commands per rover. Default: %(default)s")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    boundaries = (options.plateau, options.plateau)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        text_path = os.path.join(tmp_dir, "map.txt")
+        binary_path = os.path.join(tmp_dir, "map.bin")
+        write_map(text_path, options.cells, options.rectangles,
+                  options.plateau)
+        obstacles_count = options.cells + options.rectangles
+
+        start = time.perf_counter()
+        obstacle_map = obstacles.load(text_path, boundaries)
+        text_seconds = time.perf_counter() - start
+        obstacle_map.save(binary_path)
+        start = time.perf_counter()
+        obstacles.load(binary_path, boundaries)
+        binary_seconds = time.perf_counter() - start
+        print(f"text map: {text_seconds:.3f}s, "
+              f"{obstacles_count / text_seconds:,.0f} obstacles/s")
+        print(f"binary map: {binary_seconds * 1000:.1f}ms "
+              f"({text_seconds / binary_seconds:,.0f}x faster)")
+
+        lines = make_lines(options.rovers, options.length, options.plateau)
+        commands = options.rovers * options.length
+        for engine in controller.rover.Rover.engines:
+            plain = min(run(lines, engine, None) for _ in range(3))
+            blocked = min(run(lines, engine, binary_path) for _ in range(3))
+            print(f"{engine:>9}: {commands / plain:,.0f} cmds/s without map, "
+                  f"{commands / blocked:,.0f} cmds/s with map "
+                  f"({(blocked / plain - 1) * 100:+.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
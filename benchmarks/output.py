@@ -0,0 +1,102 @@
+'''Output benchmark
+
+Compares printing the final coordinates of each rover against writing them
+in batches with :class: `rover.sinks.BufferedSink`, as ``--output`` does,
+with both going to a file. Processing the whole file is measured as well as
+only writing the results.
+
+Usage:
+    python -m benchmarks.output [--rovers N] [--engine ENGINE]
+'''
+import argparse
+import contextlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import rover.sinks as sinks
+import rover_control
+
+
+def write_file(path, rovers, seed=0):
+    '''Writes a command file with many rovers and short commands'''
+    rand = random.Random(seed)
+    size = 1000
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write(f"{size} {size}\n")
+        for _ in range(rovers):
+            cmds = "".join(rand.choice("LRMM") for _ in range(10))
+            cmd_file.write(f"{rand.randint(0, size)} {rand.randint(0, size)} "
+                           f"{rand.choice('NESW')}\n{cmds}\n")
+
+
+def printed(path, engine, output):
+    '''Processes the file printing each result to stdout, sent to output'''
+    with open(output, "w", encoding="utf-8") as out, \
+            contextlib.redirect_stdout(out):
+        rover_control.process_from_file(path, engine)
+
+
+def buffered(path, engine, output):
+    '''Processes the file writing the results to output in batches'''
+    with open(output, "w", encoding="utf-8") as out:
+        sink = sinks.BufferedSink(out)
+        rover_control.process_from_file(path, engine, sink=sink)
+        sink.close()
+
+
+def write_only(results, sink, output):
+    '''Only writes the results, with stdout sent to output'''
+    with open(output, "w", encoding="utf-8") as out, \
+            contextlib.redirect_stdout(out):
+        if sink is None:
+            sink = sinks.BufferedSink(out)
+        start = time.perf_counter()
+        for result in results:
+            sink.write(result)
+        sink.close()
+        return time.perf_counter() - start
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=10 ** 6,
+                        help="Rovers in the file. Default: %(default)s")
+    parser.add_argument("--engine", default="step",
+                        help="Navigation engine. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    # only measure the output path
+    logging.disable(logging.CRITICAL)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        write_file(path, options.rovers)
+        for name, func in [("print", printed), ("buffered", buffered)]:
+            output = os.path.join(tmp_dir, f"{name}.txt")
+            start = time.perf_counter()
+            func(path, options.engine, output)
+            results[name] = time.perf_counter() - start
+            with open(output, encoding="utf-8") as out:
+                lines = [line.rstrip("\n") for line in out]
+            results[name, "lines"] = len(lines)
+
+        output = os.path.join(tmp_dir, "write.txt")
+        results["print", "write"] = write_only(
+            lines, sinks.CallbackSink(), output)
+        results["buffered", "write"] = write_only(lines, None, output)
+
+    for name in ["print", "buffered"]:
+        elapsed = results[name]
+        print(f"{name:>8}: {elapsed:7.3f} s "
+              f"({options.rovers / elapsed:10,.0f} rovers/s, "
+              f"{results[name, 'lines']} lines), "
+              f"writing only {results[name, 'write']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
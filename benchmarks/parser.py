@@ -0,0 +1,98 @@
+'''Parser benchmark
+
+Compares decoding the coordinates lines of a command file with
+:mod: `rover.parser` against splitting them, like the controller used to do,
+and measures splitting the whole file into rover blocks with
+:func: `rover_control.get_rover_blocks`, which runs every line through
+:meth: `rover.control.Control.process`. Reading the file alone is measured
+too, since it is part of every case.
+
+Usage:
+    python -m benchmarks.parser [--lines N]
+'''
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import rover.cardinal as cardinal
+import rover.parser as parser
+import rover_control
+
+
+def write_file(path, lines, seed=0):
+    '''Writes a command file with lines / 2 short rovers'''
+    rand = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write("1000000 1000000\n")
+        for _ in range(lines // 2):
+            cmd_file.write(f"{rand.randint(0, 10 ** 6)} "
+                           f"{rand.randint(0, 10 ** 6)} "
+                           f"{rand.choice('NESW')}\nLMLMLMLMM\n")
+
+
+def legacy_coordinates(cmd):
+    '''How the controller decoded coordinates before the parser'''
+    try:
+        x, y, orientation = cmd.split(" ")
+        x, y = map(int, (x, y))
+    except ValueError:
+        return None
+    return x, y, cardinal.HEADINGS.get(orientation)
+
+
+def decode(path, decoder):
+    '''Decodes every coordinates line of the file'''
+    with open(path, encoding="utf-8") as cmd_file:
+        next(cmd_file)
+        for index, line in enumerate(cmd_file):
+            if not index & 1:
+                decoder(line.strip())
+
+
+def read_only(path):
+    '''Only reads and strips the lines'''
+    with open(path, encoding="utf-8") as cmd_file:
+        for line in cmd_file:
+            line.strip()
+
+
+def rover_blocks(path):
+    '''Splits the file into rover blocks'''
+    for _ in rover_control.get_rover_blocks(path):
+        pass
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser_ = argparse.ArgumentParser(prog=__name__)
+    parser_.add_argument("--lines", type=int, default=10 ** 7,
+                         help="Lines in the file. Default: %(default)s")
+    options = parser_.parse_args(sys.argv[1:])
+
+    logging.disable(logging.CRITICAL)
+    cases = {
+        "read only": read_only,
+        "legacy split": lambda path: decode(path, legacy_coordinates),
+        "parser": lambda path: decode(path, parser.parse_coordinates),
+        "rover blocks": rover_blocks,
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cmds.txt")
+        write_file(path, options.lines)
+        for name, case in cases.items():
+            start = time.perf_counter()
+            case(path)
+            results[name] = time.perf_counter() - start
+
+    for name, elapsed in results.items():
+        print(f"{name:>13}: {elapsed:7.3f} s "
+              f"({options.lines / elapsed:12,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+'''Path planner benchmark
+
+Plans the commands between random cells of a 10k x 10k plateau, see :mod:
+`rover.planner`, on open ground, among craters and behind walls, and reports
+the plans/s, the length of the plans and how many states were expanded, for
+the shortest plans and with weighted heuristics.
+
+Usage:
+    python -m benchmarks.planner [--plateau N] [--plans N] [--distance N]
+        [--weights W [W ...]]
+'''
+import argparse
+import random
+import time
+
+import rover.obstacles as obstacles
+import rover.planner as planner
+
+
+def craters(boundaries, rand, count, size=40):
+    '''Scattered rectangles of up to size x size cells'''
+    obstacle_map = obstacles.ObstacleMap(boundaries)
+    for _ in range(count):
+        x, y = rand.randint(0, boundaries[0]), rand.randint(0, boundaries[1])
+        obstacle_map.add_rectangle(x, y, x + rand.randint(0, size - 1),
+                                   y + rand.randint(0, size - 1))
+    return obstacle_map
+
+
+def walls(boundaries, rand, count, length=400):
+    '''Thin walls across the plateau, as long as length cells'''
+    obstacle_map = obstacles.ObstacleMap(boundaries)
+    for _ in range(count):
+        x, y = rand.randint(0, boundaries[0]), rand.randint(0, boundaries[1])
+        if rand.random() < 0.5:
+            obstacle_map.add_rectangle(x, y, x + length - 1, y)
+        else:
+            obstacle_map.add_rectangle(x, y, x, y + length - 1)
+    return obstacle_map
+
+
+def pairs(boundaries, obstacle_map, rand, count, distance):
+    '''Free start and goal cells, at most distance apart on each axis'''
+    x_max, y_max = boundaries
+
+    def free_cell(x_range, y_range):
+        while True:
+            x, y = rand.randint(*x_range), rand.randint(*y_range)
+            if not (obstacle_map and obstacle_map.taken(x, y)):
+                return x, y
+
+    result = []
+    for _ in range(count):
+        x, y = free_cell((0, x_max), (0, y_max))
+        goal = free_cell((max(x - distance, 0), min(x + distance, x_max)),
+                         (max(y - distance, 0), min(y + distance, y_max)))
+        result.append(((x, y, rand.randrange(4)), goal))
+    return result
+
+
+def run(boundaries, obstacle_map, plans, weight):
+    '''Plans each pair, returning the time, commands, expanded states and
+    unreachable goals'''
+    plan = planner.Planner(boundaries, obstacle_map)
+    commands = expanded = unreachable = 0
+    start = time.perf_counter()
+    for start_state, goal in plans:
+        result = plan.plan(start_state, goal, weight)
+        if result is None:
+            unreachable += 1
+        else:
+            commands += len(result)
+        expanded += plan.expanded
+    return time.perf_counter() - start, commands, expanded, unreachable
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--plateau", type=int, default=9999,
+                        help="Upper limits of the plateau. "
+                             "Default: %(default)s")
+    parser.add_argument("--plans", type=int, default=5,
+                        help="How many plans for each terrain. "
+                             "Default: %(default)s")
+    parser.add_argument("--distance", type=int, default=2000,
+                        help="How far the goals are, on each axis. "
+                             "Default: %(default)s")
+    parser.add_argument("--weights", type=float, nargs="+",
+                        default=[1, 1.01, 1.05],
+                        help="Weights of the heuristic. Default: %(default)s")
+    options = parser.parse_args()
+    boundaries = (options.plateau, options.plateau)
+    rand = random.Random(0)
+    area = (options.plateau + 1) ** 2
+    terrains = {
+        "open": None,
+        "craters": craters(boundaries, rand, area // 5000),
+        "walls": walls(boundaries, rand, area // 100000),
+    }
+
+    for name, obstacle_map in terrains.items():
+        plans = pairs(boundaries, obstacle_map, rand, options.plans,
+                      options.distance)
+        for weight in options.weights:
+            seconds, commands, expanded, unreachable = run(
+                boundaries, obstacle_map, plans, weight)
+            reached = max(options.plans - unreachable, 1)
+            print(f"{name:>8} x{weight:<5}: "
+                  f"{seconds / options.plans * 1000:,.1f}ms per plan, "
+                  f"{commands / reached:,.0f} commands, "
+                  f"{expanded / options.plans:,.0f} states expanded, "
+                  f"{unreachable} unreachable")
+
+
+if __name__ == "__main__":
+    main()
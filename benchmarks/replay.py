@@ -0,0 +1,60 @@
+'''Replay benchmark
+
+Compares answering "where was the rover after command k?" by navigating the
+prefix again against querying a :class: `rover.replay.ReplayIndex`.
+
+Usage:
+    python -m benchmarks.replay [--length N] [--queries N]
+'''
+import argparse
+import logging
+import random
+import sys
+import time
+
+import rover.rover
+from benchmarks.workloads import straight_runs
+
+
+def new_rover():
+    '''A rover in the middle of a big plateau'''
+    mars_hover = rover.rover.Rover("runlength")
+    mars_hover.set_boundaries(10 ** 6, 10 ** 6)
+    mars_hover.set_inital_position(5 * 10 ** 5, 5 * 10 ** 5, "N")
+    return mars_hover
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--length", type=int, default=10 ** 7,
+                        help="Commands in the string. Default: %(default)s")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="Steps queried. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    logging.disable(logging.CRITICAL)
+    rand = random.Random(0)
+    cmds = straight_runs(rand, options.length)
+    steps = [rand.randint(0, options.length) for _ in range(options.queries)]
+
+    start = time.perf_counter()
+    replayed = [new_rover().navigate(cmds[:step]) for step in steps]
+    replay_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = new_rover().replay_index(cmds)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    queried = [index.location_at(step) for step in steps]
+    query_time = time.perf_counter() - start
+    assert queried == replayed
+
+    print(f"  replay: {replay_time / options.queries * 1e3:10.3f} ms/query")
+    print(f"   index: {query_time / options.queries * 1e6:10.3f} us/query, "
+          f"built in {build_time:.3f} s, "
+          f"{len(index.starts)} checkpoints")
+
+
+if __name__ == "__main__":
+    main()
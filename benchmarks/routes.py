@@ -0,0 +1,75 @@
+'''Fleet routes benchmark
+
+Routes a fleet through random survey targets, see :mod: `rover.routes`, and
+reports the total commands and the longest route, in input order, after the
+greedy assignment and after 2-opt, and how long routing takes with one and
+more processes.
+
+Usage:
+    python -m benchmarks.routes [--rovers N] [--targets N] [--plateau N]
+        [--workers N]
+'''
+import argparse
+import logging
+import random
+import time
+
+import rover.routes as routes
+
+
+def report(name, starts, fleet_routes):
+    '''Print the total and longest open ground cost of the routes'''
+    costs = [routes.route_cost(start, points)
+             for start, points in zip(starts, fleet_routes)]
+    print(f"{name:>12}: {sum(costs):,} commands, longest route "
+          f"{max(costs):,}")
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--rovers", type=int, default=20,
+                        help="How many rovers. Default: %(default)s")
+    parser.add_argument("--targets", type=int, default=5000,
+                        help="How many targets. Default: %(default)s")
+    parser.add_argument("--plateau", type=int, default=9999,
+                        help="Upper limits of the plateau. "
+                             "Default: %(default)s")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="How many processes. Default: %(default)s")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    rand = random.Random(0)
+    size = options.plateau
+    boundaries = (size, size)
+    starts = [(rand.randint(0, size), rand.randint(0, size),
+               rand.randrange(4)) for _ in range(options.rovers)]
+    targets = [(rand.randint(0, size), rand.randint(0, size))
+               for _ in range(options.targets)]
+
+    report("input order", starts,
+           [targets[rover::options.rovers] for rover in range(len(starts))])
+    start = time.perf_counter()
+    assigned = [[targets[index] for index in route]
+                for route in routes.assign(starts, targets)]
+    seconds = time.perf_counter() - start
+    report("greedy", starts, assigned)
+    print(f"{'':>12}  assigned in {seconds:.3f}s")
+    start = time.perf_counter()
+    ordered = [routes.two_opt(start_state, points)
+               for start_state, points in zip(starts, assigned)]
+    seconds = time.perf_counter() - start
+    report("2-opt", starts, ordered)
+    print(f"{'':>12}  ordered in {seconds:.3f}s")
+
+    for workers in sorted({1, options.workers}):
+        start = time.perf_counter()
+        fleet = routes.optimize(boundaries, starts, targets, workers=workers)
+        seconds = time.perf_counter() - start
+        commands = sum(len(commands) for _, commands in fleet)
+        print(f"{workers:>2} processes: routed and planned in {seconds:.3f}s, "
+              f"{commands:,} commands")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+'''Server load test
+
+Starts :mod: `rover.server` in the same event loop and connects many
+clients to it at once. Each client sends a boundary and then one rover at a
+time, the coordinates and the commands, waiting for its final coordinates
+before sending the next, so every rover is a request and its latency is
+measured from sending it to receiving the answer.
+
+With ``--hog N`` another client sends a single command line of N commands
+meanwhile, to show how much a huge line delays everyone else.
+
+Usage:
+    python -m benchmarks.server_load [--clients N] [--rovers N]
+        [--length N] [--hog N] [--unix] [--engine ENGINE] [--read-size N]
+'''
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import rover.control as controller
+import rover.server as server
+
+SIZE = 1000
+
+
+async def connect(address):
+    '''Opens a connection to the server, TCP port or Unix socket path'''
+    if isinstance(address, int):
+        return await asyncio.open_connection("127.0.0.1", address)
+    return await asyncio.open_unix_connection(address)
+
+
+async def client(address, rovers, length, seed):
+    '''Sends the rovers one at a time
+
+    :returns: The latency of each rover, in seconds
+    :rtype: list
+    '''
+    rand = random.Random(seed)
+    reader, writer = await connect(address)
+    writer.write(f"{SIZE} {SIZE}\n".encode("ascii"))
+    latencies = []
+    for _ in range(rovers):
+        cmds = "".join(rand.choice("LRMM") for _ in range(length))
+        request = (f"{rand.randint(0, SIZE)} {rand.randint(0, SIZE)} "
+                   f"{rand.choice('NESW')}\n{cmds}\n").encode("ascii")
+        start = time.perf_counter()
+        writer.write(request)
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+    return latencies
+
+
+async def hog(address, length):
+    '''Sends a single huge command line'''
+    reader, writer = await connect(address)
+    writer.write(f"{SIZE} {SIZE}\n0 0 N\n".encode("ascii"))
+    piece = b"LMRM" * 2 ** 14
+    for _ in range(length // len(piece)):
+        writer.write(piece)
+        await writer.drain()
+    writer.write(b"\n")
+    await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(options, path):
+    '''Serves and runs the clients, returning the latencies and the time'''
+    srv = await server.start(
+        "127.0.0.1", 0, path, engine=options.engine,
+        read_size=options.read_size)
+    address = path if path else srv.sockets[0].getsockname()[1]
+    async with srv:
+        tasks = [hog(address, options.hog)] if options.hog else []
+        start = time.perf_counter()
+        results = await asyncio.gather(*tasks, *(
+            client(address, options.rovers, options.length, seed)
+            for seed in range(options.clients)))
+        elapsed = time.perf_counter() - start
+    latencies = [latency for result in results if result for latency in result]
+    return latencies, elapsed
+
+
+def main():
+    '''Parse arguments and run the load test'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--clients", type=int, default=50,
+                        help="Concurrent clients. Default: %(default)s")
+    parser.add_argument("--rovers", type=int, default=200,
+                        help="Rovers per client. Default: %(default)s")
+    parser.add_argument("--length", type=int, default=50,
+                        help="Commands per rover. Default: %(default)s")
+    parser.add_argument("--hog", type=int, default=0, metavar="N",
+                        help="Also send a line of N commands. "
+                             "Default: %(default)s")
+    parser.add_argument("--unix", action="store_true",
+                        help="Use a Unix socket instead of TCP")
+    parser.add_argument("--engine", default="step",
+                        choices=controller.rover.Rover.engines,
+                        help="Engine of the rovers. Default: %(default)s")
+    parser.add_argument("--read-size", type=int, default=server.READ_SIZE,
+                        metavar="N",
+                        help="Bytes the server reads at a time. "
+                             "Default: %(default)s")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rover.sock") if options.unix else None
+        latencies, elapsed = asyncio.run(run(options, path))
+
+    # every rover is a coordinates line and a commands line
+    lines = 2 * len(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} rovers from {options.clients} clients "
+          f"in {elapsed:.3f}s, {lines / elapsed:,.0f} lines/s")
+    print(f"latency p50 {quantiles[49] * 1000:.2f}ms, "
+          f"p99 {quantiles[98] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
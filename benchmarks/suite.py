@@ -0,0 +1,240 @@
+'''Benchmark suite
+
+Runs every workload of :mod: `benchmarks.workloads` through three paths:
+
+* ``parse``: splits the file into rover blocks
+  (:func: `rover_control.get_rover_blocks`), which drives
+  :meth: `rover.control.Control.process` without navigating;
+* ``navigate``: runs the rovers of the already parsed blocks
+  (:meth: `rover.rover.Rover.navigate`);
+* ``cli``: the whole ``rover_control.py``, logging at the default level and
+  writing the results with ``--output``.
+
+For each one it reports the throughput, rovers/s and the peak memory, traced
+in a separate run so it doesn't slow down the timing. Parsing runs no
+commands, so its throughput is in lines/s, commands/s for the other paths.
+The results can be saved as a baseline and later runs compared against it;
+any throughput or memory worse than the baseline by more than the tolerance
+is flagged as a regression, and the suite exits with 1.
+
+Usage:
+    python -m benchmarks.suite [--engine ENGINE] [--scale F] [--repeat N]
+                               [--only NAME ...] [--save FILE]
+                               [--compare FILE] [--tolerance F]
+'''
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import rover.rover
+import rover_control
+from benchmarks.helpers import replaced_argv
+from benchmarks.workloads import WORKLOADS
+
+PATHS = ("parse", "navigate", "cli")
+
+# what the throughput of each path counts, per second
+RATES = {"parse": "lines", "navigate": "cmds", "cli": "cmds"}
+
+# don't flag memory differences below this, they are noise
+MIN_MEMORY_CHANGE = 2 ** 20
+
+
+def parse_blocks(path):
+    '''Parses the file into (x_max, y_max, x, y, orientation, cmds) tuples'''
+    blocks = []
+    for boundary, coordinates, cmds in rover_control.get_rover_blocks(path):
+        x_max, y_max = map(int, boundary.split(" "))
+        x, y, orientation = coordinates.split(" ")
+        blocks.append((x_max, y_max, int(x), int(y), orientation, cmds))
+    return blocks
+
+
+def navigate(blocks, engine):
+    '''Runs each rover of the blocks'''
+    mars_hover = rover.rover.Rover(engine)
+    boundaries = None
+    for x_max, y_max, x, y, orientation, cmds in blocks:
+        if (x_max, y_max) != boundaries:
+            boundaries = (x_max, y_max)
+            mars_hover.set_boundaries(x_max, y_max)
+        mars_hover.set_inital_position(x, y, orientation)
+        mars_hover.navigate(cmds)
+
+
+def run_cli(path, engine, tmp_dir):
+    '''Runs rover_control.py on the file'''
+    argv = ["rover_control.py", "-f", path, "--engine", engine,
+            "-o", os.path.join(tmp_dir, "output.txt"),
+            "--log-file", os.path.join(tmp_dir, "rover.log")]
+    # only the cli logs, like it would for real
+    logging.disable(logging.NOTSET)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, \
+                contextlib.redirect_stderr(devnull), \
+                replaced_argv(argv):
+            rover_control.main()
+    finally:
+        logging.disable(logging.CRITICAL)
+
+
+def measure(func, repeat):
+    '''Runs func repeat times, and once more tracing its memory
+
+    :returns: The best time in seconds and the peak memory in bytes
+    :rtype: tuple
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_workload(name, engine, scale, repeat, tmp_dir):
+    '''Writes a workload and runs it through every path
+
+    :returns: The results of each path
+    :rtype: dict
+    '''
+    path = os.path.join(tmp_dir, f"{name}.txt")
+    stats = WORKLOADS[name](path, scale)
+    with open(path, "rb") as cmd_file:
+        stats["lines"] = sum(1 for _ in cmd_file)
+    stats["cmds"] = stats["commands"]
+    blocks = parse_blocks(path)
+    cases = {
+        "parse": lambda: sum(1 for _ in rover_control.get_rover_blocks(path)),
+        "navigate": lambda: navigate(blocks, engine),
+        "cli": lambda: run_cli(path, engine, tmp_dir),
+    }
+
+    results = {}
+    for path_name in PATHS:
+        seconds, peak = measure(cases[path_name], repeat)
+        results[path_name] = {
+            "seconds": seconds,
+            "rovers_per_s": stats["rovers"] / seconds,
+            "peak_bytes": peak,
+        }
+        unit = RATES[path_name]
+        results[path_name][f"{unit}_per_s"] = stats[unit] / seconds
+    return results
+
+
+def compare(results, baseline, tolerance):
+    '''Compares the results against a baseline
+
+    :param results: The results, by workload and path
+    :type results: dict
+    :param baseline: Results saved before, in the same format
+    :type baseline: dict
+    :param tolerance: How much worse than the baseline is still fine, e.g.
+        0.1 for 10%
+    :type tolerance: float
+
+    :returns: A description of each regression found
+    :rtype: list
+    '''
+    regressions = []
+    for name, paths in results.items():
+        for path_name, current in paths.items():
+            before = baseline.get(name, {}).get(path_name)
+            if before is None:
+                continue
+            unit = RATES[path_name]
+            rate = f"{unit}_per_s"
+            # baselines saved before the rate changed are not comparable
+            if rate in before and (
+                    current[rate] < before[rate] * (1 - tolerance)):
+                regressions.append(
+                    f"{name} {path_name}: {current[rate]:,.0f} "
+                    f"{unit}/s, was {before[rate]:,.0f}")
+            memory_change = current["peak_bytes"] - before["peak_bytes"]
+            if (memory_change > MIN_MEMORY_CHANGE and current["peak_bytes"]
+                    > before["peak_bytes"] * (1 + tolerance)):
+                regressions.append(
+                    f"{name} {path_name}: peak "
+                    f"{current['peak_bytes'] / 2 ** 20:.1f} MiB, was "
+                    f"{before['peak_bytes'] / 2 ** 20:.1f} MiB")
+    return regressions
+
+
+def main():
+    '''Parse arguments and run the suite'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--engine", default="step",
+                        choices=rover.rover.Rover.engines,
+                        help="Navigation engine. Default: %(default)s")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Size of the workloads. Default: %(default)s")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs of each path, the best one is kept. "
+                             "Default: %(default)s")
+    parser.add_argument("--only", nargs="+", choices=sorted(WORKLOADS),
+                        metavar="NAME", default=list(WORKLOADS),
+                        help="Workloads to run. Default: all of them")
+    parser.add_argument("--save", metavar="FILE",
+                        help="Save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="Compare the results against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="How much worse than the baseline is still "
+                             "fine. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    logging.disable(logging.CRITICAL)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in options.only:
+            results[name] = run_workload(
+                name, options.engine, options.scale, options.repeat, tmp_dir)
+            for path_name, result in results[name].items():
+                unit = RATES[path_name]
+                print(f"{name:>8} {path_name:>8}: "
+                      f"{result['seconds']:8.3f} s "
+                      f"{result[unit + '_per_s']:12,.0f} {unit + '/s':<7} "
+                      f"{result['rovers_per_s']:10,.0f} rovers/s "
+                      f"{result['peak_bytes'] / 2 ** 20:8.1f} MiB peak")
+
+    if options.save:
+        with open(options.save, "w", encoding="utf-8") as baseline_file:
+            json.dump({
+                "python": platform.python_version(),
+                "engine": options.engine,
+                "scale": options.scale,
+                "results": results,
+            }, baseline_file, indent=2)
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if (baseline["engine"], baseline["scale"]) != (
+                options.engine, options.scale):
+            print("warning: the baseline used a different engine or scale")
+        regressions = compare(results, baseline["results"], options.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+'''Trajectory recording benchmark
+
+Measures the overhead of recording every step with a
+:class: `rover.trajectory.TrajectoryRecorder`, on the ``short`` and ``long``
+workloads of :mod: `benchmarks.workloads`.
+
+Usage:
+    python -m benchmarks.trajectory [--scale F]
+'''
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import rover.sinks as sinks
+import rover.trajectory as trajectory
+import rover_control
+from benchmarks.workloads import WORKLOADS
+
+
+def main():
+    '''Parse arguments and run the benchmark'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Size of the workloads. Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in ("short", "long"):
+            path = os.path.join(tmp_dir, f"{name}.txt")
+            stats = WORKLOADS[name](path, options.scale)
+            cases = [(engine, None) for engine in ("step", "runlength")]
+            cases.append(("recorded", os.path.join(tmp_dir, name)))
+            for engine, directory in cases:
+                recorder = None
+                start = time.perf_counter()
+                if directory:
+                    recorder = trajectory.TrajectoryRecorder(directory)
+                rover_control.process_from_file(
+                    path, engine if directory is None else "step",
+                    sink=sinks.Sink(), recorder=recorder)
+                if recorder:
+                    recorder.close()
+                elapsed = time.perf_counter() - start
+                print(f"{name:>5} {engine:>9}: {elapsed:7.3f} s "
+                      f"({stats['commands'] / elapsed:12,.0f} cmds/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+'''Synthetic workloads
+
+Reproducible command files for the benchmarks. Each generator streams the
+file to disk, so the size of a workload is only limited by the disk, and the
+same seed always writes the same file:
+
+* ``short``: many rovers with a few commands each;
+* ``long``: a few rovers with very long command lines;
+* ``boundary``: rovers on a tiny plateau, most moves hit the edge;
+* ``noise``: invalid commands and malformed coordinates mixed in.
+
+Usage:
+    python -m benchmarks.workloads NAME FILE [--scale F] [--seed N]
+'''
+import argparse
+import random
+import sys
+
+
+def write_rovers(path, boundaries, rovers, commands, noise_rate=0.0,
+                 seed=0):
+    '''Writes a command file, one rover at a time
+
+    :param path: The file to write
+    :type path: str
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param rovers: How many rovers
+    :type rovers: int
+    :param commands: Called with the random generator, returns the commands
+        of a rover
+    :type commands: callable
+    :param noise_rate: Chance of a malformed coordinates line before each
+        rover
+    :type noise_rate: float
+    :param seed: Seed of the random generator
+    :type seed: int
+
+    :returns: How many rovers and commands were written
+    :rtype: dict
+    '''
+    rand = random.Random(seed)
+    x_max, y_max = boundaries
+    total = 0
+    with open(path, "w", encoding="utf-8") as cmd_file:
+        cmd_file.write(f"{x_max} {y_max}\n")
+        for _ in range(rovers):
+            if rand.random() < noise_rate:
+                # rejected, the controller keeps waiting for coordinates
+                cmd_file.write(rand.choice(["1 1", "N N N", "-1 0 N"]) + "\n")
+            cmds = commands(rand)
+            total += len(cmds)
+            cmd_file.write(f"{rand.randint(0, x_max)} "
+                           f"{rand.randint(0, y_max)} "
+                           f"{rand.choice('NESW')}\n{cmds}\n")
+    return {"rovers": rovers, "commands": total}
+
+
+def straight_runs(rand, length, alphabet="LR", longest=50):
+    '''Commands made of turns followed by runs of moves'''
+    runs = []
+    size = 0
+    while size < length:
+        run = rand.choice(alphabet) + "M" * rand.randint(1, longest)
+        runs.append(run)
+        size += len(run)
+    return "".join(runs)[:length]
+
+
+def short(path, scale=1.0, seed=0):
+    '''Many rovers with up to 20 commands each'''
+    return write_rovers(
+        path, (10 ** 6, 10 ** 6), int(50000 * scale),
+        lambda rand: "".join(
+            rand.choice("LRMM") for _ in range(rand.randint(1, 20))),
+        seed=seed)
+
+
+def long(path, scale=1.0, seed=0):
+    '''A few rovers with long straight runs on a huge plateau'''
+    return write_rovers(
+        path, (10 ** 9, 10 ** 9), 5,
+        lambda rand: straight_runs(rand, int(200000 * scale)),
+        seed=seed)
+
+
+def boundary(path, scale=1.0, seed=0):
+    '''Rovers on a 5x5 plateau, pushing against the edges'''
+    return write_rovers(
+        path, (5, 5), int(1000 * scale),
+        lambda rand: straight_runs(rand, 100, longest=10),
+        seed=seed)
+
+
+def noise(path, scale=1.0, seed=0):
+    '''Invalid commands and malformed coordinates'''
+    return write_rovers(
+        path, (1000, 1000), int(20000 * scale),
+        lambda rand: "".join(
+            rand.choice("LRMMMXT ") for _ in range(rand.randint(1, 50))),
+        noise_rate=0.1, seed=seed)
+
+
+WORKLOADS = {
+    "short": short,
+    "long": long,
+    "boundary": boundary,
+    "noise": noise,
+}
+
+
+def main():
+    '''Parse arguments and write a workload'''
+    parser = argparse.ArgumentParser(prog=__name__)
+    parser.add_argument("name", choices=sorted(WORKLOADS),
+                        help="Workload to write. One of: %(choices)s")
+    parser.add_argument("path", metavar="FILE", help="File to write")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Size of the workload. Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the random generator. "
+                             "Default: %(default)s")
+    options = parser.parse_args(sys.argv[1:])
+
+    stats = WORKLOADS[options.name](options.path, options.scale, options.seed)
+    print(f"{stats['rovers']} rovers, {stats['commands']} commands")
+
+
+if __name__ == "__main__":
+    main()
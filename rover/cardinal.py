@@ -16,6 +16,9 @@ The idea is to provide easy-to-debug classes as at any point a developer
 can ``print`` or ``type`` the class to inspect the current cardinal point
 it is dealing and possible moves. This information is also helpful when an
 exception occurs as the trace event will tell the class name.
+
+The navigation hot path doesn't use the classes though, it uses the heading
+tables at the end of this module instead.
 '''
 import abc
 
@@ -119,3 +122,26 @@ class West(CardinalPoints):
         '''
         x, y = position
         return x-1, y
+
+
+# Compact representation of the cardinal points used on the navigation hot
+# path. The heading is a small int, the index of the cardinal point in
+# clockwise order starting from North:
+#
+# 0 (N) --> 1 (E) --> 2 (S) --> 3 (W)
+#
+# Turning and moving are just table lookups by heading. The classes above
+# remain the public view of a heading, e.g., ``POINTS[heading]``.
+POINTS = (North(), East(), South(), West())
+SHORT_NAMES = "".join(point.short_name for point in POINTS)
+HEADINGS = {point.short_name: heading for heading, point in enumerate(POINTS)}
+# the input protocol is ASCII, so the names can also arrive as bytes
+HEADINGS.update({name.encode(): heading for name, heading in HEADINGS.items()})
+
+# new heading after turning left or right
+LEFT = (3, 0, 1, 2)
+RIGHT = (1, 2, 3, 0)
+
+# x and y change when moving on each heading
+DX = (0, 1, 0, -1)
+DY = (1, 0, -1, 0)
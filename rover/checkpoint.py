@@ -0,0 +1,266 @@
+'''Controller checkpoints
+
+Saves the state of a :class: `control.Control` while a file is processed,
+so a crash doesn't force running everything again from the first line. A
+checkpoint is two files:
+
+* the snapshot, a small fixed size record with the offset of the next line
+  of the input, the size of the output written so far, the controller state,
+  the plateau and the location of the current rover. It is written to a
+  temporary file and renamed over the previous one, so it is never half
+  written;
+* the fleet journal (``<path>.fleet``), only used when avoiding collisions:
+  the location of every parked rover, as x, y, heading 64 bits ints. It is
+  only appended to, so each checkpoint writes just the rovers parked since
+  the previous one, and the snapshot says how many of them are valid;
+* the coverage map (``<path>.coverage``), only used when tracking coverage:
+  the bitmap of the covered cells or, on plateaus too big for a bitmap,
+  their x, y as 64 bits ints. It is written whole, and renamed into place,
+  right before the snapshot. Covering a cell twice changes nothing, so a map
+  newer than the snapshot is still right once the run is resumed.
+
+Both are little-endian binary files. A rename survives the process crashing,
+not the machine losing power, since nothing is synced to disk.
+'''
+import array
+import collections
+import os
+import struct
+import sys
+
+from . import control as controller
+from . import exceptions as exp
+
+MAGIC = b"ROVERCK1"
+
+# magic, input offset, output offset, state, x_max, y_max, x, y, heading,
+# fleet size
+RECORD = struct.Struct("<8sQQbqqqqbQ")
+
+Snapshot = collections.namedtuple(
+    "Snapshot", "input_offset output_offset state boundaries location fleet")
+
+
+def output_offset(sink):
+    '''How much the sink has written, after flushing it
+
+    :returns: The position of its stream, or 0 if it can't tell, e.g. stdout
+    :rtype: int
+    '''
+    sink.flush()
+    stream = getattr(sink, "stream", None)
+    if stream is None or not stream.seekable():
+        return 0
+    return stream.tell()
+
+
+class Checkpoint:
+    '''Saves and restores the state of a controller
+
+    :param path: The snapshot file, the journal is next to it
+    :type path: str
+    :param every: How many lines to process between checkpoints
+    :type every: int
+    '''
+    def __init__(self, path, every=10000):
+        self.path = path
+        self.journal_path = f"{path}.fleet"
+        self.coverage_path = f"{path}.coverage"
+        self.every = every
+        self.journal = None
+        # parked rovers already in the journal
+        self.saved_fleet = 0
+
+    def load(self):
+        '''Reads the last checkpoint
+
+        :returns: The snapshot, or None if nothing was saved
+        :rtype: :class: `Snapshot`
+
+        :raises: CheckpointError
+        '''
+        try:
+            with open(self.path, "rb") as snapshot_file:
+                record = snapshot_file.read(RECORD.size)
+        except FileNotFoundError:
+            return None
+        if len(record) != RECORD.size:
+            raise exp.CheckpointError(f"{self.path} is truncated")
+        (magic, input_offset, output_position, state, x_max, y_max, x, y,
+         heading, fleet_size) = RECORD.unpack(record)
+        if magic != MAGIC:
+            raise exp.CheckpointError(f"{self.path} is not a checkpoint")
+
+        fleet = array.array("q")
+        if fleet_size:
+            try:
+                with open(self.journal_path, "rb") as journal:
+                    fleet.fromfile(journal, 3 * fleet_size)
+            except (OSError, EOFError) as err:
+                raise exp.CheckpointError(
+                    f"{self.journal_path} doesn't have {fleet_size} rovers: "
+                    f"{err}") from err
+            if sys.byteorder == "big":
+                fleet.byteswap()
+        return Snapshot(input_offset, output_position,
+                        controller.State(state), (x_max, y_max),
+                        (x, y, heading), fleet)
+
+    def open(self, control, resume=False):
+        '''Starts checkpointing the controller
+
+        When resuming, the controller is put back in the state of the last
+        checkpoint and the output of its sink, if it is a file, is cut back to
+        what it was then. Otherwise, any previous checkpoint is discarded.
+
+        :param control: The controller, just created
+        :type control: :class: `control.Control`
+        :param resume: Restore the last checkpoint
+        :type resume: bool
+
+        :returns: The offset of the input to continue from
+        :rtype: int
+
+        :raises: CheckpointError
+        '''
+        snapshot = self.load() if resume else None
+        if snapshot is None:
+            self.journal = open(self.journal_path, "wb")
+            if os.path.exists(self.coverage_path):
+                os.remove(self.coverage_path)
+            self.saved_fleet = 0
+            if resume:
+                self.truncate_output(control.sink, 0)
+            return 0
+
+        self.restore(control, snapshot)
+        if control.coverage is not None:
+            self.load_coverage(control.coverage)
+        self.journal = open(self.journal_path, "ab")
+        # drop the rovers journaled after the snapshot
+        self.saved_fleet = len(snapshot.fleet) // 3
+        self.journal.truncate(len(snapshot.fleet) * snapshot.fleet.itemsize)
+        self.truncate_output(control.sink, snapshot.output_offset)
+        return snapshot.input_offset
+
+    @staticmethod
+    def truncate_output(sink, offset):
+        '''Cuts the stream of the sink, if it is a file, at the offset'''
+        stream = getattr(sink, "stream", None)
+        if stream is not None and stream.seekable():
+            stream.seek(offset)
+            stream.truncate()
+
+    @staticmethod
+    def restore(control, snapshot):
+        '''Puts the controller in the state of the snapshot'''
+        if snapshot.state != controller.State.WAIT_BOUNDARY:
+            control.set_boundaries(*snapshot.boundaries)
+        if snapshot.fleet and control.occupancy is None:
+            raise exp.CheckpointError(
+                "the checkpoint has a fleet, resume avoiding collisions")
+
+        fleet = snapshot.fleet
+        for index in range(0, len(fleet), 3):
+            control.mars_hover = control.deploy_rover()
+            control.mars_hover.place(*fleet[index:index + 3])
+            control.park_rover()
+
+        if snapshot.state == controller.State.WAIT_CMDS:
+            if control.occupancy is not None:
+                control.mars_hover = control.deploy_rover()
+            control.mars_hover.place(*snapshot.location)
+        control.state = snapshot.state
+
+    def load_coverage(self, coverage):
+        '''Marks the cells covered up to the last checkpoint
+
+        :param coverage: The coverage map of the controller
+        :type coverage: :class: `coverage.Coverage`
+
+        :raises: CheckpointError
+        '''
+        try:
+            with open(self.coverage_path, "rb") as coverage_file:
+                data = coverage_file.read()
+        except FileNotFoundError as err:
+            raise exp.CheckpointError(
+                "the checkpoint has no coverage map, resume without "
+                "tracking coverage") from err
+        if coverage.bitmap is not None:
+            if len(data) != len(coverage.bitmap):
+                raise exp.CheckpointError(
+                    f"{self.coverage_path} is for another plateau")
+            coverage.bitmap[:] = data
+            return
+        cells = array.array("q")
+        try:
+            cells.frombytes(data)
+        except ValueError as err:
+            raise exp.CheckpointError(
+                f"{self.coverage_path} is truncated") from err
+        if sys.byteorder == "big":
+            cells.byteswap()
+        coverage.cells.update(zip(cells[::2], cells[1::2]))
+
+    def save_coverage(self, coverage):
+        '''Saves the cells covered so far
+
+        :param coverage: The coverage map of the controller
+        :type coverage: :class: `coverage.Coverage`
+        '''
+        if coverage.bitmap is not None:
+            data = coverage.bitmap
+        else:
+            cells = array.array("q")
+            for cell in coverage.cells:
+                cells.extend(cell)
+            if sys.byteorder == "big":
+                cells.byteswap()
+            data = cells.tobytes()
+        temporary = f"{self.coverage_path}.tmp"
+        with open(temporary, "wb") as coverage_file:
+            coverage_file.write(data)
+        os.replace(temporary, self.coverage_path)
+
+    def save(self, control, input_offset):
+        '''Saves the state of the controller
+
+        :param control: The controller
+        :type control: :class: `control.Control`
+        :param input_offset: Where the next line of the input starts
+        :type input_offset: int
+        '''
+        fleet = control.fleet
+        if len(fleet) > self.saved_fleet:
+            parked = array.array("q")
+            for mars_hover in fleet[self.saved_fleet:]:
+                location = mars_hover.navigation.location
+                parked.extend((location.x, location.y, location.heading))
+            if sys.byteorder == "big":
+                parked.byteswap()
+            parked.tofile(self.journal)
+            self.saved_fleet = len(fleet)
+        self.journal.flush()
+        if control.coverage is not None:
+            self.save_coverage(control.coverage)
+
+        boundaries = control.boundaries or (0, 0)
+        location = control.mars_hover.navigation.location
+        # no rover was placed yet
+        heading = location.heading if location.heading is not None else 0
+        record = RECORD.pack(
+            MAGIC, input_offset, output_offset(control.sink),
+            control.state.value, *boundaries, location.x, location.y, heading,
+            self.saved_fleet)
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as snapshot_file:
+            snapshot_file.write(record)
+        os.replace(temporary, self.path)
+
+    def close(self):
+        '''Stops checkpointing'''
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
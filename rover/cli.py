@@ -0,0 +1,124 @@
+'''Command line helpers
+
+The arguments and the logging set up shared by the scripts, e.g.
+``rover_control.py`` and ``rover_server.py``, so they all take them the same
+way.
+'''
+import logging
+
+from . import rover
+
+LOG_LEVELS = {
+    'critical': logging.CRITICAL,
+    'error': logging.ERROR,
+    'warn': logging.WARN,
+    'info': logging.INFO,
+    'debug': logging.DEBUG,
+}
+
+# how the records are shown on the terminal
+TERMINAL_FORMAT = "[%(levelname)7.7s] %(name)s: %(message)s"
+
+
+def add_log_level(parser, default="warn"):
+    '''Add the --log-level argument, one of :data: `LOG_LEVELS`
+
+    :param parser: The parser of the script
+    :type parser: :class: `argparse.ArgumentParser`
+    :param default: The level by default
+    :type default: str
+    '''
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=default,
+        choices=sorted(LOG_LEVELS),
+        help=("Level to log at. "
+              "One of: %(choices)s. "
+              "Default: %(default)s")
+    )
+
+
+def add_engine(parser):
+    '''Add the --engine argument, see :attr: `rover.Rover.engines`
+
+    :param parser: The parser of the script
+    :type parser: :class: `argparse.ArgumentParser`
+    '''
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="step",
+        choices=rover.Rover.engines,
+        help=("Engine the rovers use to navigate. "
+              "One of: %(choices)s. "
+              "Default: %(default)s")
+    )
+
+
+def add_fleet_options(parser, shared_by=""):
+    '''Add the --avoid-collisions and --maneuver-cache arguments
+
+    :param parser: The parser of the script
+    :type parser: :class: `argparse.ArgumentParser`
+    :param shared_by: Who shares the maneuver cache, for the help
+    :type shared_by: str
+    '''
+    parser.add_argument(
+        "--avoid-collisions",
+        action="store_true",
+        help=("Keep every rover on the plateau and don't let the next ones "
+              "move into them")
+    )
+    parser.add_argument(
+        "--maneuver-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help=("Keep the effect of the last N command strings and apply it at "
+              f"once when the same commands come again{shared_by}. "
+              "Default: no cache")
+    )
+
+
+def add_plateau(parser, help_text="Upper limits of the plateau"):
+    '''Add the required --plateau X Y argument, see :func: `plateau`
+
+    :param parser: The parser of the script
+    :type parser: :class: `argparse.ArgumentParser`
+    :param help_text: The help of the argument
+    :type help_text: str
+    '''
+    parser.add_argument(
+        "--plateau",
+        type=int,
+        nargs=2,
+        required=True,
+        metavar=("X", "Y"),
+        help=help_text
+    )
+
+
+def plateau(parser, options):
+    '''The upper limits of the plateau, exiting if they are negative
+
+    :param parser: The parser of the script
+    :type parser: :class: `argparse.ArgumentParser`
+    :param options: The parsed arguments, see :func: `add_plateau`
+    :type options: :class: `argparse.Namespace`
+
+    :returns: The upper limits (x, y)
+    :rtype: tuple
+    '''
+    if min(options.plateau) < 0:
+        parser.error("--plateau cannot be negative")
+    return tuple(options.plateau)
+
+
+def log_to_terminal(level):
+    '''Log to stderr, see :func: `add_log_level`
+
+    :param level: One of :data: `LOG_LEVELS`
+    :type level: str
+    '''
+    logging.basicConfig(level=LOG_LEVELS[level], format=TERMINAL_FORMAT)
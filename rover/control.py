@@ -2,9 +2,16 @@
 import enum
 import logging
 import pathlib
+import time
 
+from . import cardinal
+from . import coverage
 from . import exceptions as exp
+from . import obstacles as obstacle_map
+from . import occupancy
+from . import parser
 from . import rover
+from . import sinks
 
 
 class State(enum.Enum):
@@ -14,73 +21,199 @@ class State(enum.Enum):
     WAIT_CMDS = 3
 
 
+# phase of each state, see :mod: `metrics`
+PHASES = {
+    State.WAIT_BOUNDARY: "boundary",
+    State.WAIT_COORDINATES: "coordinates",
+    State.WAIT_CMDS: "commands",
+}
+
+# boundary and coordinates lines are short, longer lines are rejected instead
+# of being read into memory
+MAX_LINE_LENGTH = 1024
+
+
 class Control:
-    """Holds status and rovers"""
-    def __init__(self):
+    """Holds status and rovers
+
+    By default, the rovers are independent of each other and the same rover
+    is reused for every set of coordinates and commands. When avoiding
+    collisions, a new rover is deployed for each set instead, and it can't
+    move into the cells where the rovers of the fleet stopped.
+
+    The final coordinates of each rover go to the sink, which prints them by
+    default, see :mod: `sinks`.
+
+    Every rover shares the same maneuver cache, if any, see :mod: `maneuvers`,
+    and the same trajectory recorder, see :mod: `trajectory`, and the same
+    metrics, see :mod: `metrics`. When tracking coverage, they also share a
+    map of the cells they visited, see :mod: `coverage`.
+
+    With an obstacle map, see :mod: `obstacles`, the rovers can't move into
+    the blocked cells either. The map is loaded for each plateau.
+
+    :param engine: The engine the rover uses to navigate, see
+        :class: `rover.Rover`
+    :type engine: str
+    :param avoid_collisions: Keep a fleet of rovers that can't collide
+    :type avoid_collisions: bool
+    :param sink: Where the final coordinates go
+    :type sink: :class: `sinks.Sink`
+    :param maneuvers: Cache of the maneuvers the rovers run
+    :type maneuvers: :class: `maneuvers.ManeuverCache`
+    :param recorder: Records every step of the rovers
+    :type recorder: :class: `trajectory.TrajectoryRecorder`
+    :param metrics: Counts and times the lines and the navigations
+    :type metrics: :class: `metrics.Metrics`
+    :param track_coverage: Keep a map of the cells visited by the rovers
+    :type track_coverage: bool
+    :param obstacles: Path of the obstacle map, as text or in binary form
+    :type obstacles: str
+    """
+    def __init__(self, engine="step", avoid_collisions=False, sink=None,
+                 maneuvers=None, recorder=None, metrics=None,
+                 track_coverage=False, obstacles=None):
         self.state = State.WAIT_BOUNDARY
         self.logger = logging.getLogger(pathlib.PurePath(__file__).name)
-        self.mars_hover = rover.Rover()
+        self.engine = engine
+        self.avoid_collisions = avoid_collisions
+        self.boundaries = None
+        self.occupancy = None
+        self.track_coverage = track_coverage
+        self.coverage = None
+        self.obstacles = obstacles
+        self.blocked = None
+        self.fleet = []
+        # the cmd arriving in pieces, see :meth:`feed`
+        self.partial = None
+        self.skipping = False
+        self.stream = None
+        # whitespace held back from the commands, None at the line's start
+        self.trailing = None
+        # time spent navigating the commands fed so far, for the metrics
+        self.feeding_time = 0.0
+        self.sink = sink if sink is not None else sinks.CallbackSink()
+        self.maneuvers = maneuvers
+        self.recorder = recorder
+        self.metrics = metrics
+        self.mars_hover = rover.Rover(engine)
+        self.mars_hover.set_maneuver_cache(maneuvers)
+        self.mars_hover.set_recorder(recorder)
+        self.mars_hover.set_metrics(metrics)
 
     def process_boundary(self, cmd):
         """Parses the cmd and send to rover to process
 
         :param cmd: Should contain the x, y limits of the plateau
-        :type cmd: str
+        :type cmd: str or bytes-like
 
         :returns: True if the rover could process the cmd; otherwise, False
         """
         self.logger.debug("processing boundary")
-        try:
-            x, y = map(int, cmd.split(" "))
-        except ValueError:
+        code, x, y = parser.parse_boundary(cmd)
+        if code != parser.OK:
             self.logger.error("expected boundary command (x, y)")
             return False
 
         try:
-            self.mars_hover.set_boundaries(x, y)
-        except exp.InvalidBoundary as bd_err:
+            self.set_boundaries(x, y)
+        except (exp.InvalidBoundary, exp.InvalidObstacles) as bd_err:
             self.logger.error(bd_err)
             return False
-
         return True
 
+    def set_boundaries(self, x, y):
+        """Sets the plateau the rovers are deployed to
+
+        :param x: The x limit of the plateau
+        :type x: int
+        :param y: The y limit of the plateau
+        :type y: int
+
+        :raises: InvalidBoundary, InvalidObstacles
+        """
+        self.mars_hover.set_boundaries(x, y)
+        self.boundaries = (x, y)
+        if self.obstacles is not None:
+            self.blocked = obstacle_map.load(self.obstacles, self.boundaries)
+        if self.avoid_collisions:
+            self.occupancy = occupancy.Occupancy(
+                self.boundaries, self.blocked)
+        elif self.blocked:
+            # without a fleet, only the obstacles take cells
+            self.mars_hover.set_occupancy(self.blocked)
+        if self.track_coverage:
+            self.coverage = coverage.Coverage(self.boundaries)
+            self.mars_hover.set_coverage(self.coverage)
+
+    def deploy_rover(self):
+        """Creates a new rover in the plateau, aware of the fleet
+
+        :returns: The new rover
+        :rtype: :class: `rover.Rover`
+        """
+        mars_hover = rover.Rover(self.engine)
+        mars_hover.set_boundaries(*self.boundaries)
+        mars_hover.set_occupancy(self.occupancy)
+        mars_hover.set_coverage(self.coverage)
+        mars_hover.set_maneuver_cache(self.maneuvers)
+        mars_hover.set_recorder(self.recorder)
+        mars_hover.set_metrics(self.metrics)
+        return mars_hover
+
+    def park_rover(self):
+        """Adds the current rover to the fleet, taking its final cell"""
+        if self.occupancy is None:
+            return
+        self.occupancy.add(self.mars_hover.navigation.location.position)
+        self.fleet.append(self.mars_hover)
+
     def process_coordinates(self, cmd):
         """Parses the cmd and send to rover to process
 
         :param cmd: Should contain the x, y position and the orientation
-        :type cmd: str
+        :type cmd: str or bytes-like
 
         :returns: True if the rover could process the cmd; otherwise, False
         """
         self.logger.debug("processing coordinates")
-        try:
-            x, y, orientation = cmd.split(" ")
-            x, y = map(int, (x, y))
-        except ValueError:
+        code, x, y, heading = parser.parse_coordinates(cmd)
+        if code == parser.MALFORMED:
             self.logger.error(
                 "expected coordinates command (x, y, orientation)")
             return False
+        if code == parser.INVALID_HEADING:
+            self.logger.error("Invalid cardinal point")
+            return False
+
+        self.logger.debug(
+            "coordinates %s %s %s", x, y, cardinal.SHORT_NAMES[heading])
 
-        logging.debug("coordinates %s %s %s", x, y, orientation)
+        mars_hover = self.mars_hover
+        if self.occupancy is not None:
+            mars_hover = self.deploy_rover()
 
         try:
-            self.mars_hover.set_inital_position(x, y, orientation)
-        except (exp.InvalidCardinalPoint, exp.BoundaryError) as err:
+            mars_hover.place(x, y, heading)
+        except exp.BoundaryError as err:
             self.logger.error(err)
             return False
 
+        self.mars_hover = mars_hover
         return True
 
     def process_cmds(self, cmd):
         """Parses the cmd and send to rover to process
 
         :param cmd: Should contain the x, y position and the orientation
-        :type cmd: str
+        :type cmd: str or bytes-like
 
         :returns: True if the rover could process the cmd; otherwise, False
         """
         self.logger.debug("processing commands")
-        return self.mars_hover.navigate(cmd)
+        final_coordinates = self.mars_hover.navigate(cmd)
+        self.park_rover()
+        return final_coordinates
 
     def process(self, cmd):
         """Runs cmds in a defined order
@@ -91,8 +224,28 @@ class Control:
         3. navigation commands
         4. Go back to 2.
 
+        The cmd can also be ASCII bytes-like, e.g., a memoryview of a file, so
+        it doesn't have to be decoded.
+
+        :param cmd: The command we want to process
+        :type cmd: str or bytes-like
+        """
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            self.run_state(cmd)
+            return
+
+        state = self.state
+        start = time.perf_counter()
+        self.run_state(cmd)
+        metrics.line(PHASES[state], time.perf_counter() - start,
+                     self.state == state)
+
+    def run_state(self, cmd):
+        """Runs the cmd expected in the current state, see :meth:`process`
+
         :param cmd: The command we want to process
-        :type cmd: str
+        :type cmd: str or bytes-like
         """
         if self.state == State.WAIT_BOUNDARY:
             if self.process_boundary(cmd):
@@ -104,5 +257,98 @@ class Control:
 
         elif self.state == State.WAIT_CMDS:
             final_coordinates = self.process_cmds(cmd)
-            print(final_coordinates)
+            self.sink.write(final_coordinates)
             self.state = State.WAIT_COORDINATES
+
+    def process_chunks(self, chunks):
+        """Runs a cmd that arrives in pieces, see :meth:`process`
+
+        The navigation commands are sent to the rover one chunk at a time, so
+        the memory used doesn't depend on the length of the line. Any other
+        cmd is short and is put together before processing.
+
+        :param chunks: Pieces of the command we want to process
+        :type chunks: iterable
+        """
+        for chunk in chunks:
+            self.feed(chunk)
+        self.end_line()
+
+    def feed(self, chunk):
+        """Adds a piece of the current cmd, see :meth:`process_chunks`
+
+        Unlike :meth:`process_chunks`, the pieces are pushed as they arrive,
+        e.g., from a socket, and :meth:`end_line` must be called once the
+        cmd is complete.
+
+        :param chunk: A piece of the command we want to process
+        :type chunk: str or bytes-like
+        """
+        if self.state == State.WAIT_CMDS:
+            metrics = self.metrics
+            if metrics is None or not metrics.enabled:
+                self.feed_cmds(chunk)
+                return
+            start = time.perf_counter()
+            self.feed_cmds(chunk)
+            self.feeding_time += time.perf_counter() - start
+            return
+
+        if self.skipping:
+            return
+        self.partial = chunk if self.partial is None else self.partial + chunk
+        if len(self.partial) > MAX_LINE_LENGTH:
+            self.logger.error("line too long, expected at most %d chars",
+                              MAX_LINE_LENGTH)
+            # skip the rest of the line
+            self.skipping = True
+            self.partial = None
+
+    def feed_cmds(self, chunk):
+        """Sends a piece of the navigation commands to the rover
+
+        :param chunk: A piece of the commands (L, R, M)
+        :type chunk: str or bytes-like
+        """
+        if self.stream is None:
+            self.logger.debug("processing commands stream")
+            self.stream = self.mars_hover.stream()
+        if self.trailing is None:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self.trailing = chunk[:0]
+        # whitespace is an invalid command unless it ends the line
+        cmds = chunk.rstrip()
+        if not cmds:
+            self.trailing += chunk
+            return
+        if self.trailing:
+            self.stream.feed(self.trailing)
+        self.stream.feed(cmds)
+        self.trailing = chunk[len(cmds):]
+
+    def end_line(self):
+        """Processes the cmd put together by :meth:`feed`"""
+        if self.state == State.WAIT_CMDS:
+            start = time.perf_counter()
+            stream = self.stream or self.mars_hover.stream()
+            self.stream = None
+            self.trailing = None
+            final_coordinates = stream.finish()
+            self.park_rover()
+            self.sink.write(final_coordinates)
+            self.state = State.WAIT_COORDINATES
+            metrics = self.metrics
+            if metrics is not None and metrics.enabled:
+                metrics.line(PHASES[State.WAIT_CMDS], self.feeding_time
+                             + time.perf_counter() - start)
+            self.feeding_time = 0.0
+            return
+
+        cmd = self.partial
+        self.partial = None
+        if self.skipping:
+            self.skipping = False
+            return
+        self.process(cmd.strip() if cmd is not None else "")
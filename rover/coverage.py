@@ -0,0 +1,66 @@
+'''Coverage map
+
+Records which cells of the plateau the rovers visited, to measure the
+surveyed area. Every rover of a fleet can share the same map. It is a
+:class: `grid.CellGrid`, so visiting a cell is setting a bit of a bitmap, or
+adding it to a hash set on huge plateaus, and a straight run along a row
+sets whole bytes at once.
+
+The covered cells are counted when asked for, so visiting doesn't have to
+check whether the cell was already visited.
+
+The map can be exported as the list of covered cells, row by row, or, for a
+bitmap, as a PBM image with North up.
+'''
+import itertools
+
+from . import grid
+
+
+class Coverage(grid.CellGrid):
+    '''Map of the cells visited by rovers
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    '''
+    def __len__(self):
+        '''How many cells were covered'''
+        return self.count_cells()
+
+    # visiting a cell is setting it, the one a run starts from is already
+    # visited
+    visit = grid.CellGrid.set
+    visit_run = grid.CellGrid.set_run
+    covered = grid.CellGrid.set_cells
+
+    def write_cells(self, stream):
+        '''Write the covered cells, one "x y" line each
+
+        :param stream: Text stream to write to
+        :type stream: file-like
+        '''
+        cells = self.covered()
+        while True:
+            batch = list(itertools.islice(cells, 4096))
+            if not batch:
+                return
+            stream.write("".join(f"{x} {y}\n" for x, y in batch))
+
+    def write_pbm(self, stream):
+        '''Write the map as a binary PBM image, covered cells in black
+
+        :param stream: Binary stream to write to
+        :type stream: file-like
+
+        :raises: ValueError if the plateau is too big for a bitmap
+        '''
+        if self.bitmap is None:
+            raise ValueError("the plateau is too big for an image")
+        width = self.width
+        # PBM rows start with the most significant bit, padded to bytes
+        padding = -width % 8
+        stream.write(f"P4\n{width} {self.height}\n".encode("ascii"))
+        for y in range(self.height - 1, -1, -1):
+            bits = f"{self.row(y):0{width}b}"[::-1]
+            stream.write((int(bits, 2) << padding).to_bytes(
+                (width + padding) // 8, "big"))
@@ -6,6 +6,11 @@ class BoundaryError(Exception):
     pass
 
 
+class CollisionError(BoundaryError):
+    """Cell taken by another rover"""
+    pass
+
+
 class InvalidCommand(Exception):
     """Invalid commands sent"""
     pass
@@ -19,3 +24,18 @@ class InvalidCardinalPoint(Exception):
 class InvalidBoundary(Exception):
     """Invalid boundary"""
     pass
+
+
+class InvalidEngine(Exception):
+    """Invalid navigation engine"""
+    pass
+
+
+class CheckpointError(Exception):
+    """Unreadable checkpoint"""
+    pass
+
+
+class InvalidObstacles(Exception):
+    """Invalid obstacle map"""
+    pass
@@ -0,0 +1,158 @@
+'''Fleet simulator
+
+Simulates thousands of rovers at once. Instead of replaying each rover
+through :class: `rover.Rover`, the x, y position and heading of all rovers
+are stored in NumPy arrays and every rover runs its n-th command at the
+same time, one command column per step.
+
+The rovers are sorted by the length of their command strings, so the rovers
+that still have commands to run are always the first ones of the arrays and
+each step only works on that slice. Shorter command strings are padded with
+a no-op command.
+
+Headings are returned as small ints, the same used by the navigation system
+(see :mod: `cardinal`):
+
+0 (N) --> 1 (E) --> 2 (S) --> 3 (W)
+'''
+import numpy as np
+
+from . import cardinal
+from . import exceptions
+
+HEADINGS = cardinal.SHORT_NAMES
+
+# command codes. Padding and invalid commands are no-ops.
+NOOP, LEFT, RIGHT, MOVE = range(4)
+
+# heading change for each command code
+TURNS = np.array((0, -1, 1, 0), dtype=np.int8)
+
+# x and y change for each heading
+DX = np.array(cardinal.DX, dtype=np.int64)
+DY = np.array(cardinal.DY, dtype=np.int64)
+
+# translate an ASCII character into a command code
+CODES = np.full(256, NOOP, dtype=np.uint8)
+CODES[ord("L")] = LEFT
+CODES[ord("R")] = RIGHT
+CODES[ord("M")] = MOVE
+
+# how many command columns are decoded at once, so memory is bounded by
+# number of rovers * BLOCK_SIZE no matter how long the command strings are.
+BLOCK_SIZE = 1024
+
+
+def _parse_starts(boundaries, starts):
+    '''Validates the boundaries and the initial coordinates
+
+    :returns: x, y and heading arrays
+    '''
+    x_max, y_max = boundaries
+    if x_max < 0 or y_max < 0:
+        raise exceptions.InvalidBoundary("Boundary cannot be negative")
+
+    x = np.empty(len(starts), dtype=np.int64)
+    y = np.empty(len(starts), dtype=np.int64)
+    heading = np.empty(len(starts), dtype=np.int8)
+    for index, (start_x, start_y, orientation) in enumerate(starts):
+        if not(0 <= start_x <= x_max and 0 <= start_y <= y_max):
+            raise exceptions.BoundaryError("Outside of boundaries")
+        if orientation not in cardinal.HEADINGS:
+            raise exceptions.InvalidCardinalPoint("Invalid cardinal point")
+        x[index] = start_x
+        y[index] = start_y
+        heading[index] = cardinal.HEADINGS[orientation]
+    return x, y, heading
+
+
+def _decode_block(command_strings, start, size):
+    '''Decodes a block of command columns
+
+    :returns: An array (size, len(command_strings)) of command codes, where
+        each row is a command column.
+    '''
+    raw = "".join(
+        cmds[start:start + size].ljust(size) for cmds in command_strings)
+    buffer = raw.encode("ascii", "replace")
+    codes = CODES[np.frombuffer(buffer, dtype=np.uint8)]
+    return np.ascontiguousarray(codes.reshape(len(command_strings), size).T)
+
+
+def simulate_fleet(boundaries, starts, command_strings):
+    '''Navigate all rovers at once
+
+    The result is the same as running each rover with
+    :meth:`rover.Rover.navigate`: moves that would take a rover out of the
+    plateau are skipped, so are invalid commands.
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param starts: The initial (x, y, orientation) of each rover
+    :type starts: list
+    :param command_strings: A series of commands (L, R, M) for each rover
+    :type command_strings: list
+
+    :returns: x, y and heading arrays with the final location of each rover,
+        in the same order as ``starts``
+    :rtype: tuple
+    '''
+    if len(starts) != len(command_strings):
+        raise ValueError("Expected one command string for each rover")
+
+    x_max, y_max = boundaries
+    x, y, heading = _parse_starts(boundaries, starts)
+
+    lengths = np.fromiter(
+        map(len, command_strings), dtype=np.int64, count=len(command_strings))
+    # longest command strings first (stable, so ties keep the input order)
+    order = np.argsort(-lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    sorted_cmds = [command_strings[index] for index in order]
+    x, y, heading = x[order], y[order], heading[order]
+
+    longest = int(sorted_lengths[0]) if len(sorted_lengths) else 0
+    for block_start in range(0, longest, BLOCK_SIZE):
+        size = min(BLOCK_SIZE, longest - block_start)
+        # rovers that have commands in this block
+        active = int(np.count_nonzero(sorted_lengths > block_start))
+        columns = _decode_block(sorted_cmds[:active], block_start, size)
+        # rovers that have commands in each column of the block
+        remaining = sorted_lengths[:active] - block_start
+        actives = active - np.searchsorted(
+            remaining[::-1], np.arange(1, size + 1), side="left")
+
+        for column, count in zip(columns, actives):
+            codes = column[:count]
+            cur_heading = heading[:count]
+            cur_heading += TURNS[codes]
+            cur_heading &= 3
+            moving = codes == MOVE
+            new_x = x[:count] + DX[cur_heading] * moving
+            new_y = y[:count] + DY[cur_heading] * moving
+            inside = ((new_x >= 0) & (new_x <= x_max)
+                      & (new_y >= 0) & (new_y <= y_max))
+            np.copyto(x[:count], new_x, where=inside)
+            np.copyto(y[:count], new_y, where=inside)
+
+    # undo the sorting
+    final_x = np.empty_like(x)
+    final_y = np.empty_like(y)
+    final_heading = np.empty_like(heading)
+    final_x[order] = x
+    final_y[order] = y
+    final_heading[order] = heading
+    return final_x, final_y, final_heading
+
+
+def format_positions(x, y, heading):
+    '''Formats the result of :func: `simulate_fleet`
+
+    :returns: The location of each rover, as in :meth:`rover.Rover.navigate`
+    :rtype: list
+    '''
+    return [
+        f"{pos_x} {pos_y} {HEADINGS[pos_heading]}"
+        for pos_x, pos_y, pos_heading in zip(
+            x.tolist(), y.tolist(), heading.tolist())
+    ]
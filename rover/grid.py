@@ -0,0 +1,207 @@
+'''Cell grid
+
+A set of cells of the plateau, the storage behind :mod: `coverage`,
+:mod: `occupancy` and :mod: `obstacles`. Checking or setting a cell is O(1)
+no matter how many cells are set:
+
+* small plateaus use a bitmap with one bit per cell, stored row by row, so
+  a run of cells along a row sets whole bytes at once;
+* huge plateaus, e.g. 10^9 x 10^9, where a bitmap wouldn't fit in memory,
+  use a hash set of the cells instead.
+'''
+import itertools
+
+from . import cardinal
+
+# how many bits are set in each byte
+POPCOUNT = bytes(bin(byte).count("1") for byte in range(256))
+
+
+def set_bits(bitmap, start, stop):
+    '''Set the bits from start up to stop (excluded) of a bitmap
+
+    The bits are numbered from the least significant one of the first byte,
+    so a run of cells of a row sets whole bytes at once.
+
+    :param bitmap: The bitmap
+    :type bitmap: bytearray
+    :param start: The first bit
+    :type start: int
+    :param stop: The bit after the last one
+    :type stop: int
+    '''
+    first = start >> 3
+    last = (stop - 1) >> 3
+    if first == last:
+        bitmap[first] |= ((1 << (stop - start)) - 1) << (start & 7)
+        return
+    bitmap[first] |= (0xff << (start & 7)) & 0xff
+    bitmap[first + 1:last] = b"\xff" * (last - first - 1)
+    bitmap[last] |= (1 << (((stop - 1) & 7) + 1)) - 1
+
+
+class CellGrid:
+    '''Set of cells of a plateau, as a bitmap or a hash set
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param bitmap: The bitmap of the cells, e.g. memory-mapped, instead of
+        an empty one
+    :type bitmap: bytes-like
+    '''
+    # plateaus up to this many cells use a bitmap (16 MiB)
+    max_bitmap_cells = 2 ** 27
+
+    def __init__(self, boundaries, bitmap=None):
+        x_max, y_max = boundaries
+        self.width = x_max + 1
+        self.height = y_max + 1
+        cells = self.width * self.height
+        self.cells = None
+        if bitmap is not None:
+            self.bitmap = bitmap
+        elif cells <= self.max_bitmap_cells:
+            self.bitmap = bytearray((cells + 7) // 8)
+        else:
+            self.bitmap = None
+            self.cells = set()
+
+    def __contains__(self, position):
+        '''Whether the cell is set
+
+        :param position: A tuple that describes x and y position, inside of
+            the plateau
+        :type position: tuple
+        '''
+        x, y = position
+        return self.is_set(x, y)
+
+    def count_cells(self):
+        '''How many cells are set
+
+        :rtype: int
+        '''
+        if self.bitmap is None:
+            return len(self.cells)
+        counts = bytes(self.bitmap).translate(POPCOUNT)
+        return sum(bits * counts.count(bits) for bits in range(1, 9))
+
+    def is_set(self, x, y):
+        '''Whether the cell is set, without creating a tuple
+
+        :param x: The x position coordinate, inside of the plateau
+        :type x: int
+        :param y: The y position coordinate, inside of the plateau
+        :type y: int
+        '''
+        if self.bitmap is None:
+            return (x, y) in self.cells
+        index = y * self.width + x
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    def set(self, x, y):
+        '''Set the cell, without creating a tuple for a bitmap
+
+        :param x: The x position coordinate, inside of the plateau
+        :type x: int
+        :param y: The y position coordinate, inside of the plateau
+        :type y: int
+        '''
+        if self.bitmap is None:
+            self.cells.add((x, y))
+            return
+        index = y * self.width + x
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+
+    def clear(self, x, y):
+        '''Clear the cell
+
+        :param x: The x position coordinate, inside of the plateau
+        :type x: int
+        :param y: The y position coordinate, inside of the plateau
+        :type y: int
+        '''
+        if self.bitmap is None:
+            self.cells.discard((x, y))
+            return
+        index = y * self.width + x
+        self.bitmap[index >> 3] &= ~(1 << (index & 7))
+
+    def set_span(self, x_first, x_last, y):
+        '''Set the cells of a row from x_first up to x_last, both included
+
+        :param x_first: The x position coordinate of the first cell
+        :type x_first: int
+        :param x_last: The x position coordinate of the last cell
+        :type x_last: int
+        :param y: The y position coordinate of the row
+        :type y: int
+        '''
+        if x_first > x_last:
+            return
+        if self.bitmap is None:
+            self.cells.update(
+                zip(range(x_first, x_last + 1), itertools.repeat(y)))
+            return
+        start = y * self.width + x_first
+        set_bits(self.bitmap, start, start + x_last - x_first + 1)
+
+    def set_run(self, x, y, heading, moves):
+        '''Set the cells of a straight run, but not the one it starts from
+
+        :param x: The x position coordinate the run starts from
+        :type x: int
+        :param y: The y position coordinate the run starts from
+        :type y: int
+        :param heading: The heading of the run, see :mod: `cardinal`
+        :type heading: int
+        :param moves: How many cells the run goes, all inside the plateau
+        :type moves: int
+        '''
+        step_x = cardinal.DX[heading]
+        step_y = cardinal.DY[heading]
+        if step_x > 0:
+            self.set_span(x + 1, x + moves, y)
+        elif step_x < 0:
+            self.set_span(x - moves, x - 1, y)
+        elif self.bitmap is None:
+            self.cells.update(zip(
+                itertools.repeat(x, moves),
+                range(y + step_y, y + step_y * (moves + 1), step_y)))
+        else:
+            step = step_y * self.width
+            index = y * self.width + x
+            bitmap = self.bitmap
+            for index in range(index + step, index + step * (moves + 1),
+                               step):
+                bitmap[index >> 3] |= 1 << (index & 7)
+
+    def row(self, y):
+        '''The cells of a row of a bitmap as an int, bit x for cell x
+
+        :param y: The y position coordinate of the row
+        :type y: int
+
+        :rtype: int
+        '''
+        start = y * self.width
+        chunk = self.bitmap[start >> 3:((start + self.width) >> 3) + 1]
+        return (int.from_bytes(chunk, "little") >> (start & 7)) \
+            & ((1 << self.width) - 1)
+
+    def set_cells(self):
+        '''The cells that are set, row by row from the bottom
+
+        :yields: The x, y position of each cell
+        '''
+        if self.bitmap is None:
+            yield from sorted(self.cells, key=lambda cell: (cell[1], cell[0]))
+            return
+        width = self.width
+        for byte_index, byte in enumerate(self.bitmap):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    y, x = divmod(byte_index * 8 + bit, width)
+                    yield x, y
@@ -2,45 +2,57 @@
 
 This module stores the run-time information, like the position, boundaries and
 rover orientation.
+
+The orientation is stored as a heading, a small int (see :mod: `cardinal`),
+and its :class: `cardinal.CardinalPoints` view is only looked up on demand.
+
+There can be millions of rovers at once, so the storage is slotted and keeps
+plain ints: x and y position, heading and the limits of the plateau, cached
+when the boundaries are set. The navigation hot path reads and writes them
+directly, while the tuple properties remain for everybody else.
 '''
+from . import cardinal
 
 
 class LocationStorage:
     '''Holds the rover's run-time data'''
+    __slots__ = ("x", "y", "heading", "x_min", "y_min", "x_max", "y_max")
     lower_boundary = (0, 0)
 
     def __init__(self):
-        self._position = self.lower_boundary
-        self._boundaries = (0, 0)
-        self._orientation = None
+        self.x_min, self.y_min = self.lower_boundary
+        self.x, self.y = self.lower_boundary
+        self.x_max, self.y_max = (0, 0)
+        self.heading = None
 
     def __str__(self):
-        x, y = self.position
-        return f"{x} {y} {self.orientation}"
+        return f"{self.x} {self.y} {self.orientation}"
 
     @property
     def position(self):
         '''Stores the rover's position as a tuple'''
-        return self._position
+        return self.x, self.y
 
     @position.setter
     def position(self, new_position):
-        self._position = new_position
+        self.x, self.y = new_position
 
     @property
     def boundaries(self):
         '''Stores the limits the rover can go as a tuple'''
-        return self._boundaries
+        return self.x_max, self.y_max
 
     @boundaries.setter
     def boundaries(self, new_boundaries):
-        self._boundaries = new_boundaries
+        self.x_max, self.y_max = new_boundaries
 
     @property
     def orientation(self):
         '''Stores the current cardinal position as a :class: `cardinal` obj'''
-        return self._orientation
+        if self.heading is None:
+            return None
+        return cardinal.POINTS[self.heading]
 
     @orientation.setter
     def orientation(self, new_orientation):
-        self._orientation = new_orientation
+        self.heading = cardinal.HEADINGS[new_orientation.short_name]
@@ -0,0 +1,167 @@
+'''Log handlers
+
+Logging at debug level traces every step of every rover, so the log handlers
+can easily become the bottleneck. This module moves the handlers out of the
+way:
+
+* the records are put in a queue by a :class: `LightQueueHandler`
+  and handled in a background thread by a :class: `FlushingQueueListener`;
+* :class: `BatchingRotatingFileHandler` and :class: `BatchingStreamHandler`
+  write the records in batches, instead of writing and flushing (and, for the
+  file, checking its size) for each record.
+'''
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+
+
+class BatchingMixin:
+    '''Makes a stream handler write the records in batches
+
+    The records are formatted as they arrive and written once the batch
+    reaches ``batch_size`` chars, or when the handler is flushed.
+
+    :param batch_size: How many chars to keep before writing
+    :type batch_size: int
+    '''
+    def __init__(self, *args, batch_size=2 ** 16, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_size = batch_size
+        self.batch = []
+        self.batch_chars = 0
+
+    def emit(self, record):
+        '''Add the record to the batch, writing it if it is full'''
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:  # pylint:disable=broad-except
+            self.handleError(record)
+            return
+        self.batch.append(msg)
+        self.batch_chars += len(msg)
+        if self.batch_chars >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        '''Write the batch and flush the stream'''
+        self.acquire()
+        try:
+            if self.batch:
+                self.write_batch()
+                self.batch.clear()
+                self.batch_chars = 0
+            super().flush()
+        finally:
+            self.release()
+
+    def write_batch(self):
+        '''Write all records of the batch at once'''
+        self.stream.write("".join(self.batch))
+
+    def close(self):
+        '''Write whatever is left before closing'''
+        self.flush()
+        super().close()
+
+
+class BatchingStreamHandler(BatchingMixin, logging.StreamHandler):
+    '''Stream handler that writes the records in batches'''
+
+
+class BatchingRotatingFileHandler(
+        BatchingMixin, logging.handlers.RotatingFileHandler):
+    '''Rotating file handler that writes the records in batches
+
+    The file is rotated the same way as
+    :class: `logging.handlers.RotatingFileHandler`, but the size of the file
+    is only checked once for each batch.
+    '''
+    def write_batch(self):
+        '''Write the batch, rotating the file whenever it gets too big'''
+        if self.stream is None:
+            self.stream = self._open()
+        # never rotate anything other than regular files (see bpo-45401)
+        rotate = self.maxBytes > 0 and (
+            not os.path.exists(self.baseFilename)
+            or os.path.isfile(self.baseFilename))
+        self.stream.seek(0, 2)
+        size = self.stream.tell()
+        pending = []
+        for msg in self.batch:
+            if rotate and size + len(msg) >= self.maxBytes:
+                self.stream.write("".join(pending))
+                pending.clear()
+                self.doRollover()
+                size = 0
+            pending.append(msg)
+            size += len(msg)
+        self.stream.write("".join(pending))
+
+
+class LightQueueHandler(logging.handlers.QueueHandler):
+    '''Queue handler that does as little as possible before queuing
+
+    The message is merged with its arguments right away, since they may
+    change later, on a copy of the record, since the other handlers of the
+    logger get the original. Formatting is up to the handlers in the
+    background thread.
+    '''
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # tracebacks can't wait, the frames will be gone
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    '''Queue listener that flushes its handlers whenever the queue is empty
+
+    So the batches are written as soon as there is nothing else to do.
+    '''
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+    def stop(self):
+        '''Stop the thread, writing whatever is left in the batches'''
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+def queue_handlers(logger=None):
+    '''Move the logger's handlers to a background thread
+
+    The logger gets a single :class: `LightQueueHandler` instead, and its
+    former handlers are run by a listener, which must be stopped to make sure
+    every record is written.
+
+    :param logger: The logger, by default the root logger
+    :type logger: :class: `logging.Logger`
+
+    :returns: The listener, already started
+    :rtype: :class: `FlushingQueueListener`
+    '''
+    if logger is None:
+        logger = logging.getLogger()
+    handlers = list(logger.handlers)
+    records = queue.SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(LightQueueHandler(records))
+
+    listener = FlushingQueueListener(
+        records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,124 @@
+'''Maneuver cache
+
+Fleets reuse a small library of canned command strings, like survey patterns
+or turning in place, across thousands of rovers. Running the same commands
+over and over again is a waste, since their effect doesn't depend on where
+the rover starts, as long as no move is rejected.
+
+A maneuver is the effect of a command string from a heading on a plateau
+without edges: the net displacement, the final heading and the bounding box
+swept by the path. When the box, placed at the rover's position, fits inside
+the plateau, no move can be rejected and the maneuver is applied at once.
+Otherwise, or when other rovers could be in the way, or when the visited
+cells are recorded, see :mod: `coverage`, the commands are left to the
+engine, which runs them exactly.
+
+The maneuvers are kept in a bounded LRU cache, keyed on the command string
+and the heading.
+'''
+import collections
+import functools
+import logging
+import pathlib
+
+from . import cardinal
+from . import runlength
+
+logger = logging.getLogger(pathlib.PurePath(__file__).name)
+
+Maneuver = collections.namedtuple(
+    "Maneuver", "dx dy heading x_low y_low x_high y_high invalid")
+
+
+def sweep(commands, heading):
+    '''Calculates the maneuver of the commands
+
+    :param commands: A series of commands (L, R, M)
+    :type commands: str or bytes
+    :param heading: The heading it starts from, see :mod: `cardinal`
+    :type heading: int
+
+    :returns: The maneuver, with the displacement and the box relative to
+        the start
+    :rtype: :class: `Maneuver`
+    '''
+    x = y = x_low = y_low = x_high = y_high = invalid = 0
+    for moves, turns, skipped in runlength.compress(commands):
+        if moves:
+            x += cardinal.DX[heading] * moves
+            y += cardinal.DY[heading] * moves
+            # the path is a straight segment, so only its end can be new
+            x_low = min(x_low, x)
+            y_low = min(y_low, y)
+            x_high = max(x_high, x)
+            y_high = max(y_high, y)
+        else:
+            heading = (heading + turns) % 4
+            invalid += skipped
+    return Maneuver(x, y, heading, x_low, y_low, x_high, y_high, invalid)
+
+
+class ManeuverCache:
+    '''Applies cached maneuvers to rovers
+
+    :param maxsize: How many maneuvers to keep
+    :type maxsize: int
+    :param max_length: Longer command strings are never cached, they are
+        hardly repeated and would take too much memory
+    :type max_length: int
+    '''
+    def __init__(self, maxsize=1024, max_length=4096):
+        self.sweep = functools.lru_cache(maxsize)(sweep)
+        self.max_length = max_length
+        # cached maneuvers that didn't fit in the plateau
+        self.fallbacks = 0
+
+    def info(self):
+        '''Hits, misses, fallbacks and size of the cache
+
+        :rtype: dict
+        '''
+        cache_info = self.sweep.cache_info()
+        return {
+            "hits": cache_info.hits,
+            "misses": cache_info.misses,
+            "fallbacks": self.fallbacks,
+            "size": cache_info.currsize,
+        }
+
+    def run(self, navigation, commands):
+        '''Applies the maneuver of the commands, if it is safe
+
+        :param navigation: The navigation system we want to move
+        :type navigation: :class: `navigation.Navigation`
+        :param commands: A series of commands (L, R, M)
+        :type commands: str or bytes-like
+
+        :returns: How many moves were rejected and how many commands were
+            invalid, or None if the commands have to be run exactly
+        :rtype: tuple
+        '''
+        if navigation.occupancy is not None \
+                or navigation.coverage is not None \
+                or len(commands) > self.max_length:
+            return None
+        if not isinstance(commands, (str, bytes)):
+            commands = bytes(commands)
+
+        location = navigation.location
+        maneuver = self.sweep(commands, location.heading)
+        x = location.x
+        y = location.y
+        if not(location.x_min <= x + maneuver.x_low
+               and x + maneuver.x_high <= location.x_max
+               and location.y_min <= y + maneuver.y_low
+               and y + maneuver.y_high <= location.y_max):
+            self.fallbacks += 1
+            return None
+
+        location.x = x + maneuver.dx
+        location.y = y + maneuver.dy
+        location.heading = maneuver.heading
+        if maneuver.invalid:
+            logger.error("skipped %d invalid commands", maneuver.invalid)
+        return 0, maneuver.invalid
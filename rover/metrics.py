@@ -0,0 +1,195 @@
+'''Navigation metrics
+
+Counts what the rovers did and measures where the time went, to tell
+whether a slow replay spends its time on turns, moves, rejected moves or
+logging:
+
+* counters of the lines processed, of the commands by type, of the rejected
+  moves and invalid commands, and of the log records handled;
+* the time spent in each phase: processing boundary, coordinates and
+  commands lines, running the commands with the engine, and handling log
+  records, see :data: `PHASES`.
+
+The commands are counted once for each series, with ``str.count``, not one
+by one, and the phases are timed around a whole line or series of commands,
+so the engines run exactly as fast as without metrics. When the metrics are
+disabled, or not set at all, the only cost is checking for them.
+
+The metrics can be dumped as JSON or in the Prometheus text format, e.g. to
+be picked up by the textfile collector of the node exporter.
+'''
+import json
+import time
+
+COUNTERS = {
+    "boundary_lines": "Boundary lines processed",
+    "coordinates_lines": "Coordinates lines processed",
+    "commands_lines": "Commands lines processed",
+    "skipped_lines": "Boundary or coordinates lines skipped as invalid",
+    "rovers": "Rovers navigated",
+    "commands": "Navigation commands run",
+    "turns": "Turn commands run",
+    "moves": "Move commands run",
+    "rejected_moves": "Moves rejected by an edge or another rover",
+    "invalid_commands": "Invalid navigation commands skipped",
+    "log_records": "Log records handled",
+}
+
+PHASES = {
+    "boundary": "Processing boundary lines",
+    "coordinates": "Processing coordinates lines",
+    "commands": "Processing commands lines, including navigating and "
+                "writing the result",
+    "navigate": "Running navigation commands with the engine",
+    "logging": "Handling log records, wherever they were logged",
+}
+
+# counter of the lines of each phase
+LINE_COUNTERS = {
+    phase: f"{phase}_lines"
+    for phase in ("boundary", "coordinates", "commands")
+}
+
+FORMATS = ("json", "prometheus")
+
+
+class Metrics:
+    '''Counters and phase timings of a run
+
+    :param enabled: Whether to collect them from the start
+    :type enabled: bool
+    '''
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+    def enable(self):
+        '''Start collecting'''
+        self.enabled = True
+
+    def disable(self):
+        '''Stop collecting, what was collected is kept'''
+        self.enabled = False
+
+    def count(self, name, value=1):
+        '''Add to a counter, see :data: `COUNTERS`'''
+        self.counters[name] += value
+
+    def add_time(self, phase, seconds):
+        '''Add to the time of a phase, see :data: `PHASES`'''
+        self.seconds[phase] += seconds
+
+    def line(self, phase, seconds, skipped=False):
+        '''Account for a line processed by the controller
+
+        :param phase: The boundary, coordinates or commands phase
+        :type phase: str
+        :param seconds: How long it took
+        :type seconds: float
+        :param skipped: Whether the line was skipped as invalid
+        :type skipped: bool
+        '''
+        self.seconds[phase] += seconds
+        self.counters[LINE_COUNTERS[phase]] += 1
+        if skipped:
+            self.counters["skipped_lines"] += 1
+
+    def navigated(self, commands, rejected, invalid, seconds):
+        '''Account for a series of commands run by the engine
+
+        :param commands: The series of commands (L, R, M)
+        :type commands: str or bytes-like
+        :param rejected: How many moves were rejected
+        :type rejected: int
+        :param invalid: How many commands were invalid
+        :type invalid: int
+        :param seconds: How long the engine took
+        :type seconds: float
+        '''
+        if isinstance(commands, str):
+            left, right, move = "L", "R", "M"
+        else:
+            commands = bytes(commands)
+            left, right, move = b"L", b"R", b"M"
+        counters = self.counters
+        counters["commands"] += len(commands)
+        counters["turns"] += commands.count(left) + commands.count(right)
+        counters["moves"] += commands.count(move)
+        counters["rejected_moves"] += rejected
+        counters["invalid_commands"] += invalid
+        self.seconds["navigate"] += seconds
+
+    def time_handlers(self, handlers):
+        '''Time the log handlers, as the ``logging`` phase
+
+        Each handler's ``handle`` is wrapped, so it is measured wherever
+        the record comes from, including formatting tracebacks.
+
+        :param handlers: The handlers, e.g. ``logging.getLogger().handlers``
+        :type handlers: iterable
+        '''
+        for handler in handlers:
+            handler.handle = self.timed_handle(handler.handle)
+
+    def timed_handle(self, handle):
+        '''Wraps a handler's handle method, see :meth: `time_handlers`'''
+        def wrapper(record):
+            if not self.enabled:
+                return handle(record)
+            start = time.perf_counter()
+            try:
+                return handle(record)
+            finally:
+                self.seconds["logging"] += time.perf_counter() - start
+                self.counters["log_records"] += 1
+        return wrapper
+
+    def as_dict(self):
+        '''The counters and the seconds of each phase
+
+        :rtype: dict
+        '''
+        return {"counters": dict(self.counters),
+                "seconds": dict(self.seconds)}
+
+    def to_json(self):
+        '''The metrics as a JSON document
+
+        :rtype: str
+        '''
+        return json.dumps(self.as_dict(), indent=2) + "\n"
+
+    def to_prometheus(self, prefix="rover"):
+        '''The metrics in the Prometheus text exposition format
+
+        :param prefix: Prefix of the metric names
+        :type prefix: str
+
+        :rtype: str
+        '''
+        lines = []
+        for name, description in COUNTERS.items():
+            metric = f"{prefix}_{name}_total"
+            lines += [f"# HELP {metric} {description}",
+                      f"# TYPE {metric} counter",
+                      f"{metric} {self.counters[name]}"]
+        metric = f"{prefix}_phase_seconds_total"
+        lines += [f"# HELP {metric} Time spent in each phase",
+                  f"# TYPE {metric} counter"]
+        for phase, seconds in self.seconds.items():
+            lines.append(f'{metric}{{phase="{phase}"}} {seconds!r}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, stream, metrics_format="json"):
+        '''Write the metrics to a text stream
+
+        :param stream: Where to write them
+        :type stream: file-like
+        :param metrics_format: One of :data: `FORMATS`
+        :type metrics_format: str
+        '''
+        if metrics_format == "prometheus":
+            stream.write(self.to_prometheus())
+        else:
+            stream.write(self.to_json())
@@ -2,21 +2,27 @@
 
 This module controls the rover navigation.
 
-The rover's navigation system uses something similar to a double linked list
-where the head is North and, moving right, the tail is West as shown below:
+The rover's heading is a small int and turning or moving are lookups in the
+precomputed tables of :mod: `cardinal`:
 
-(head)N <--> E <--> S <--> W (tail)
+0 (N) --> 1 (E) --> 2 (S) --> 3 (W)
+
+For debugging, the navigation also keeps the cardinal points as something
+similar to a double linked list where the head is North and, moving right,
+the tail is West as shown below:
 
-For each node, it can see left and right what the cardinal point is and if it
-reaches one of the extremes, it just switches between head/tail, depending on
-where it is. It doesn't make a direct link between West and North as it is more
-prone of infinite lookups, so it's better to avoid it.
+(head)N <--> E <--> S <--> W (tail)
 
-For instance:
+It doesn't make a direct link between West and North as it is more prone of
+infinite lookups, so it's better to avoid it. Printing the navigation system
+lists all cardinal points and the rover's orientation is available as a
+:class: `cardinal.CardinalPoints` object.
 
-Rover is facing West and receives a command to turn 90 degrees right. The
-navigation systems knows it has reached the end of the list of cardinal points
-so it resets to head.
+A move out of the plateau or into another rover can be rejected in two ways:
+:meth: `Navigation.move` raises an exception, while :meth:
+`Navigation.try_move` returns a status, see :data: `MOVED`. The commands are
+run with the latter, since raising, catching and logging a traceback costs
+far more than the move itself, and edge-hugging patterns are rejected often.
 '''
 import logging
 import pathlib
@@ -25,6 +31,18 @@ from . import cardinal
 from . import location_storage
 from . import exceptions
 
+# status of a move, see :meth: `Navigation.try_xy`
+MOVED = 0
+OUT_OF_BOUNDS = 1
+TAKEN = 2
+
+# why a move was rejected, and the exception raised for it
+REJECTIONS = {
+    OUT_OF_BOUNDS: ("Outside of boundaries", exceptions.BoundaryError),
+    TAKEN: ("Cell taken by another rover or an obstacle",
+            exceptions.CollisionError),
+}
+
 
 class Navigation():
     '''Controls the hover navigation system'''
@@ -35,6 +53,10 @@ class Navigation():
         self.tail = None
         self.logger = logging.getLogger(pathlib.PurePath(__file__).name)
         self.location = location_storage.LocationStorage()
+        # cells taken by other rovers, see :class: `occupancy.Occupancy`
+        self.occupancy = None
+        # cells visited by the rovers, see :class: `coverage.Coverage`
+        self.coverage = None
         self.set_cardinal_points()
 
     def __str__(self):
@@ -47,18 +69,15 @@ class Navigation():
         return " ".join(all_nodes)
 
     def set_cardinal_points(self):
-        '''Sets the 4 cardinal points into the list'''
-        orientation_guide = (
-            cardinal.North(),
-            cardinal.East(),
-            cardinal.South(),
-            cardinal.West()
-        )
-
-        for cardinal_point in orientation_guide:
+        '''Sets the 4 cardinal points into the list
+
+        The cardinal points are the ones of :data: `cardinal.POINTS`, shared
+        by all rovers, so linking them again leaves the list as it was.
+        '''
+        for cardinal_point in cardinal.POINTS:
             self.add_cardinal_point(cardinal_point)
         # initiate the orientation
-        self.location.orientation = self.head
+        self.location.heading = cardinal.HEADINGS[self.head.short_name]
 
     def add_cardinal_point(self, node):
         '''Add a cardinal point
@@ -85,34 +104,23 @@ class Navigation():
         self.tail.right = None
 
     def set_initial_orientation(self, orientation):
-        '''Initiate the orientation list
-
-        Here the set the rover to face to the given direction by starting at
-        head and moving right until finding the desired orientation.
+        '''Initiate the orientation
 
         :param orientation: The desired cardinal position (N, S, E or W)
-        :type orientation: str
+        :type orientation: str or bytes
         '''
-
-        if orientation not in self.cardinal_points:
+        heading = cardinal.HEADINGS.get(orientation)
+        if heading is None:
             raise exceptions.InvalidCardinalPoint("Invalid cardinal point")
 
-        self.logger.debug("head: %s", self.head)
-        # set current to the head of the list (first cardinal point)
-        current_orientation = self.head
-        # keep going right until you find the element
-        while current_orientation.right:
-            if current_orientation.short_name == orientation:
-                break
-            current_orientation = current_orientation.right
-        self.set_orientation(current_orientation)
+        self.location.heading = heading
         self.logger.debug("initial orientation: %s", self.location.orientation)
 
     def set_orientation(self, new_orientation):
         '''Set the rover's orientation
 
         :param new_orientation: The desired orientation we want to set
-        :type new_orientation: tuple
+        :type new_orientation: :class: `cardinal.CardinalPoints`
         '''
         self.location.orientation = new_orientation
 
@@ -122,13 +130,47 @@ class Navigation():
         :param new_position: The desired position we want to set
         :type new_position: tuple
         '''
-        boundary = self.location.boundaries
-        x_min, y_min = self.location.lower_boundary
-        x_max, y_max = boundary
         x, y = new_position
-        if not(x_min <= x <= x_max and y_min <= y <= y_max):
-            raise exceptions.BoundaryError("Outside of boundaries")
-        self.location.position = new_position
+        self.set_xy(x, y)
+
+    def set_xy(self, x, y):
+        '''Set the rover's position, without creating a tuple
+
+        :param x: The x position coordinate
+        :type x: int
+        :param y: The y position coordinate
+        :type y: int
+
+        :raises: BoundaryError, or CollisionError if the cell is taken
+        '''
+        status = self.try_xy(x, y)
+        if status != MOVED:
+            message, error = REJECTIONS[status]
+            raise error(message)
+
+    def try_xy(self, x, y):
+        '''Set the rover's position if it is allowed, without raising
+
+        :param x: The x position coordinate
+        :type x: int
+        :param y: The y position coordinate
+        :type y: int
+
+        :returns: :data: `MOVED`, or why the position was rejected,
+            :data: `OUT_OF_BOUNDS` or :data: `TAKEN`
+        :rtype: int
+        '''
+        location = self.location
+        if not(location.x_min <= x <= location.x_max
+               and location.y_min <= y <= location.y_max):
+            return OUT_OF_BOUNDS
+        if self.occupancy is not None and self.occupancy.taken(x, y):
+            return TAKEN
+        location.x = x
+        location.y = y
+        if self.coverage is not None:
+            self.coverage.visit(x, y)
+        return MOVED
 
     def set_boundaries(self, new_boundaries):
         '''Set the rover's boundaries (limits)
@@ -143,38 +185,40 @@ class Navigation():
 
     def move_left(self):
         '''Change rover's direction to the left'''
-
-        # get the the current orientation
-        current = self.location.orientation
-
-        # if reached the limit to the left (first cardinal point of the list),
-        # reset to tail (last cardinal point)
-        new_orientation = self.tail if current.left is None else current.left
-        self.set_orientation(new_orientation)
-        self.logger.info("to the left, now %s", self.location.orientation)
+        location = self.location
+        location.heading = cardinal.LEFT[location.heading]
+        self.logger.debug("to the left, now %s", location.orientation)
 
     def move_right(self):
         '''Change rover's direction to the right'''
+        location = self.location
+        location.heading = cardinal.RIGHT[location.heading]
+        self.logger.debug("to the right, now %s", location.orientation)
 
-        # get the the current orientation
-        current = self.location.orientation
+    def move(self):
+        '''Move the rover
 
-        # if reached the limit to the right (last cardinal point of the list),
-        # reset to head (first cardinal point)
-        new_orientation = self.head if current.right is None else current.right
-        self.set_orientation(new_orientation)
-        self.logger.info("to the right, now %s", self.location.orientation)
+        :raises: BoundaryError, or CollisionError if the cell is taken
+        '''
+        status = self.try_move()
+        if status != MOVED:
+            message, error = REJECTIONS[status]
+            raise error(message)
 
-    def move(self):
-        '''Move the rover'''
+    def try_move(self):
+        '''Move the rover if it is allowed, without raising
 
-        position = self.location.position
-        orientation = self.location.orientation
-        new_position = orientation.move(position)
-        self.logger.info("move to %s", new_position)
+        :returns: The status of the move, see :meth:`try_xy`
+        :rtype: int
+        '''
+        location = self.location
+        heading = location.heading
+        x = location.x + cardinal.DX[heading]
+        y = location.y + cardinal.DY[heading]
+        self.logger.debug("move to (%s, %s)", x, y)
 
         # try to set the new position
-        self.set_position(new_position)
+        return self.try_xy(x, y)
 
     def process_cmd(self, command):
         '''Process each command sent by central server'''
@@ -186,3 +230,68 @@ class Navigation():
             self.move()
         else:
             raise exceptions.InvalidCommand("Invalid command")
+
+    def process_cmds(self, commands):
+        '''Process a series of commands without tracing each step
+
+        It is the same as calling :meth:`process_cmd` for each command, but
+        without the per-step debug lines, method calls and exceptions.
+        Rejected moves and invalid commands are skipped, counted and logged
+        as errors once for the whole series.
+
+        :param commands: A series of commands (L, R, M)
+        :type commands: str
+
+        :returns: How many moves were rejected and how many commands were
+            invalid
+        :rtype: tuple
+        '''
+        location = self.location
+        x_min = location.x_min
+        y_min = location.y_min
+        x_max = location.x_max
+        y_max = location.y_max
+        occupancy = self.occupancy
+        # the cells visited along each heading are marked as a run when the
+        # rover turns, see :meth: `coverage.Coverage.visit_run`
+        coverage = self.coverage
+        visit_run = coverage.visit_run if coverage is not None else None
+        moved = 0
+        x = location.x
+        y = location.y
+        heading = location.heading
+        left = cardinal.LEFT
+        right = cardinal.RIGHT
+        step_x = cardinal.DX
+        step_y = cardinal.DY
+        rejected = invalid = 0
+        for command in commands:
+            if command == 'M':
+                new_x = x + step_x[heading]
+                new_y = y + step_y[heading]
+                if (x_min <= new_x <= x_max and y_min <= new_y <= y_max
+                        and not (occupancy and occupancy.taken(new_x, new_y))):
+                    x = new_x
+                    y = new_y
+                    moved += 1
+                else:
+                    rejected += 1
+            elif command in ('L', 'R'):
+                if moved and visit_run is not None:
+                    visit_run(x - step_x[heading] * moved,
+                              y - step_y[heading] * moved, heading, moved)
+                moved = 0
+                heading = left[heading] if command == 'L' else right[heading]
+            else:
+                invalid += 1
+        if moved and visit_run is not None:
+            visit_run(x - step_x[heading] * moved,
+                      y - step_y[heading] * moved, heading, moved)
+        location.x = x
+        location.y = y
+        location.heading = heading
+        if rejected:
+            self.logger.error("rejected %d moves", rejected)
+        if invalid:
+            self.logger.error("skipped %d invalid commands", invalid)
+        return rejected, invalid
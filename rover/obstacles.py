@@ -0,0 +1,253 @@
+'''Obstacle map
+
+Real plateaus have rocks and craters. An obstacle map lists the cells the
+rovers can't drive into, and moving into one is rejected like moving out of
+the plateau or into another rover, see :mod: `occupancy`. Checking a cell is
+O(1) no matter how many obstacles there are. The map is a :class:
+`grid.CellGrid`:
+
+* on a bitmap, a rectangle fills whole bytes of each of its rows at once;
+* on a hash set, only the cells are in the set. The rectangles are indexed
+  by the square buckets of the plateau they overlap, so only the few
+  rectangles of the cell's bucket are checked. The rare rectangles spanning
+  too many buckets are kept aside and always checked.
+
+A map is a text file with one obstacle per line::
+
+    # comments and blank lines are skipped
+    3 4
+    10 10 19 12
+
+where ``x y`` is a cell and ``x0 y0 x1 y1`` the rectangle between two
+opposite corners, both included. Obstacles outside of the plateau are
+clipped to it.
+
+Parsing millions of obstacles takes seconds, so a bitmap can be saved in a
+binary form instead, see :meth: `ObstacleMap.save`, which is memory-mapped
+when loaded: it is ready at once and the pages are read as the rovers need
+them.
+'''
+import mmap
+import struct
+
+from . import exceptions as exp
+from . import grid
+
+MAGIC = b"ROVEROB2"
+
+# the binary form before the header counted the blocked cells
+OLD_MAGICS = (b"ROVEROB1",)
+
+# the header of the binary form: magic, width and height of the plateau and
+# how many cells are blocked
+HEADER = struct.Struct("<8sqqq")
+
+
+class ObstacleMap(grid.CellGrid):
+    '''Cells of the plateau blocked by obstacles
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param bitmap: The blocked cells, as read from the binary form
+    :type bitmap: bytes-like
+    :param blocked: How many cells of the bitmap are blocked, counted if
+        None
+    :type blocked: int
+    '''
+    # rectangles are indexed by buckets of 2 ** bucket_shift cells a side
+    bucket_shift = 10
+    # rectangles spanning more buckets than this are always checked
+    max_buckets = 4096
+
+    def __init__(self, boundaries, bitmap=None, blocked=None):
+        super().__init__(boundaries, bitmap)
+        self.buckets = None
+        self.large = None
+        self.empty = True
+        if bitmap is not None:
+            if blocked is None:
+                blocked = self.count_cells()
+            self.empty = not blocked
+        elif self.bitmap is None:
+            self.buckets = {}
+            self.large = []
+
+    def __bool__(self):
+        '''Whether any cell is blocked'''
+        return not self.empty
+
+    def __contains__(self, position):
+        '''Whether the cell is blocked
+
+        :param position: A tuple that describes x and y position, inside of
+            the plateau
+        :type position: tuple
+        '''
+        x, y = position
+        return self.taken(x, y)
+
+    def taken(self, x, y):
+        '''Whether the cell is blocked, without creating a tuple
+
+        :param x: The x position coordinate, inside of the plateau
+        :type x: int
+        :param y: The y position coordinate, inside of the plateau
+        :type y: int
+        '''
+        if self.bitmap is not None:
+            return self.is_set(x, y)
+        if (x, y) in self.cells:
+            return True
+        shift = self.bucket_shift
+        bucket = self.buckets.get((x >> shift, y >> shift), ())
+        for x_min, y_min, x_max, y_max in bucket:
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return True
+        for x_min, y_min, x_max, y_max in self.large:
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return True
+        return False
+
+    def add_cell(self, x, y):
+        '''Block a cell, ignored if outside of the plateau
+
+        :param x: The x position coordinate
+        :type x: int
+        :param y: The y position coordinate
+        :type y: int
+        '''
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        self.empty = False
+        self.set(x, y)
+
+    def add_rectangle(self, x_from, y_from, x_to, y_to):
+        '''Block the cells of a rectangle, clipped to the plateau
+
+        :param x_from: The x position coordinate of a corner
+        :type x_from: int
+        :param y_from: The y position coordinate of a corner
+        :type y_from: int
+        :param x_to: The x position coordinate of the opposite corner
+        :type x_to: int
+        :param y_to: The y position coordinate of the opposite corner
+        :type y_to: int
+        '''
+        x_min = max(min(x_from, x_to), 0)
+        x_max = min(max(x_from, x_to), self.width - 1)
+        y_min = max(min(y_from, y_to), 0)
+        y_max = min(max(y_from, y_to), self.height - 1)
+        if x_min > x_max or y_min > y_max:
+            return
+        self.empty = False
+        if self.bitmap is not None:
+            for y in range(y_min, y_max + 1):
+                self.set_span(x_min, x_max, y)
+            return
+        self.index_rectangle((x_min, y_min, x_max, y_max))
+
+    def index_rectangle(self, rectangle):
+        '''Add a rectangle to the buckets it overlaps, on a hash set
+
+        :param rectangle: The x_min, y_min, x_max, y_max of the rectangle,
+            inside of the plateau
+        :type rectangle: tuple
+        '''
+        x_min, y_min, x_max, y_max = rectangle
+        shift = self.bucket_shift
+        columns = range(x_min >> shift, (x_max >> shift) + 1)
+        rows = range(y_min >> shift, (y_max >> shift) + 1)
+        if len(columns) * len(rows) > self.max_buckets:
+            self.large.append(rectangle)
+            return
+        buckets = self.buckets
+        for column in columns:
+            for row in rows:
+                buckets.setdefault((column, row), []).append(rectangle)
+
+    def read(self, stream):
+        '''Add the obstacles of a text map
+
+        :param stream: Text or binary stream with one obstacle per line
+        :type stream: file-like
+
+        :raises: InvalidObstacles if a line isn't a cell or a rectangle
+        '''
+        add_cell = self.add_cell
+        for number, line in enumerate(stream, 1):
+            # most lines are cells, check them first
+            try:
+                x, y = map(int, line.split())
+            except ValueError:
+                pass
+            else:
+                add_cell(x, y)
+                continue
+
+            fields = line.split()
+            if not fields or fields[0][:1] in ("#", b"#"):
+                continue
+            try:
+                values = [int(field) for field in fields]
+            except ValueError:
+                values = None
+            if values is None or len(values) != 4:
+                raise exp.InvalidObstacles(
+                    f"line {number}: expected a cell (x y) or a rectangle "
+                    "(x0 y0 x1 y1)")
+            self.add_rectangle(*values)
+
+    def save(self, path):
+        '''Write the map in the binary form, to be memory-mapped by :func:
+        `load`
+
+        :param path: Where to write it
+        :type path: str
+
+        :raises: ValueError if the plateau is too big for a bitmap
+        '''
+        if self.bitmap is None:
+            raise ValueError("the plateau is too big for a bitmap")
+        with open(path, "wb") as stream:
+            stream.write(HEADER.pack(
+                MAGIC, self.width, self.height, self.count_cells()))
+            stream.write(self.bitmap)
+
+
+def load(path, boundaries):
+    '''Load an obstacle map, as text or in the binary form
+
+    :param path: The map file
+    :type path: str
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+
+    :returns: The obstacles
+    :rtype: :class: `ObstacleMap`
+
+    :raises: InvalidObstacles if the map is malformed or, in the binary
+        form, made for another plateau
+    '''
+    with open(path, "rb") as stream:
+        magic = stream.read(len(MAGIC))
+        if magic in OLD_MAGICS:
+            raise exp.InvalidObstacles(
+                "the map is in an old binary form, compile it again")
+        if magic != MAGIC:
+            stream.seek(0)
+            obstacles = ObstacleMap(boundaries)
+            obstacles.read(stream)
+            return obstacles
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < HEADER.size:
+        raise exp.InvalidObstacles("the map is truncated")
+    _, width, height, blocked = HEADER.unpack_from(mapped)
+    x_max, y_max = boundaries
+    if (width, height) != (x_max + 1, y_max + 1):
+        raise exp.InvalidObstacles(
+            f"the map is for a {width - 1} {height - 1} plateau")
+    bitmap = memoryview(mapped)[HEADER.size:]
+    if len(bitmap) != (width * height + 7) // 8:
+        raise exp.InvalidObstacles("the map is truncated")
+    return ObstacleMap(boundaries, bitmap, blocked)
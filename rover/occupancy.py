@@ -0,0 +1,87 @@
+'''Occupancy index
+
+Keeps track of the cells of the plateau taken by rovers, so a rover can't
+drive into another one. It is a :class: `grid.CellGrid`, so checking a cell
+is O(1) no matter how many rovers there are.
+
+The cells blocked by obstacles, see :mod: `obstacles`, are taken too. The
+index only holds the rovers and looks the obstacles up in their own map, so
+a memory-mapped map is never copied, and no rover can take or free the cell
+of an obstacle.
+'''
+from . import exceptions as exp
+from . import grid
+
+
+class Occupancy(grid.CellGrid):
+    '''Index of the cells taken by rovers
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param obstacles: The cells blocked by obstacles, of the same plateau
+    :type obstacles: :class: `obstacles.ObstacleMap`
+    '''
+    def __init__(self, boundaries, obstacles=None):
+        super().__init__(boundaries)
+        self.count = 0
+        self.blocked = bool(obstacles)
+        self.obstacles = obstacles if self.blocked else None
+
+    def __len__(self):
+        '''How many cells were taken by rovers'''
+        return self.count
+
+    def __bool__(self):
+        '''Whether any cell is taken, by rovers or by obstacles'''
+        return self.count > 0 or self.blocked
+
+    def __contains__(self, position):
+        '''Whether the cell is taken
+
+        :param position: A tuple that describes x and y position, inside of
+            the plateau
+        :type position: tuple
+        '''
+        x, y = position
+        return self.taken(x, y)
+
+    def taken(self, x, y):
+        '''Whether the cell is taken, without creating a tuple
+
+        :param x: The x position coordinate, inside of the plateau
+        :type x: int
+        :param y: The y position coordinate, inside of the plateau
+        :type y: int
+        '''
+        return self.is_set(x, y) or (
+            self.obstacles is not None and self.obstacles.taken(x, y))
+
+    def add(self, position):
+        '''Mark the cell as taken by a rover
+
+        :param position: A tuple that describes x and y position, inside of
+            the plateau
+        :type position: tuple
+
+        :raises: CollisionError if the cell is blocked by an obstacle
+        '''
+        x, y = position
+        if self.is_set(x, y):
+            return
+        if self.obstacles is not None and self.obstacles.taken(x, y):
+            raise exp.CollisionError(f"Cell {x} {y} blocked by an obstacle")
+        self.count += 1
+        self.set(x, y)
+
+    def discard(self, position):
+        '''Mark the cell as free, obstacles stay where they are
+
+        :param position: A tuple that describes x and y position, inside of
+            the plateau
+        :type position: tuple
+        '''
+        x, y = position
+        if not self.is_set(x, y):
+            return
+        self.count -= 1
+        self.clear(x, y)
@@ -0,0 +1,71 @@
+'''Command parser
+
+Decodes the boundary and coordinates lines into ints and a heading (see
+:mod: `cardinal`) in a single pass, without splitting them into lists. A
+malformed line is reported with a return code instead of an exception, so
+the controller doesn't pay for a traceback on bad input:
+
+* :data: `OK`: the line was decoded;
+* :data: `MALFORMED`: the line doesn't have the expected fields;
+* :data: `INVALID_HEADING`: the coordinates have an unknown cardinal point.
+
+The lines can be text or ASCII bytes-like, and the fields must be separated
+by single spaces, like ``str.split(" ")`` expects.
+'''
+from . import cardinal
+
+OK = 0
+MALFORMED = 1
+INVALID_HEADING = 2
+
+
+def _with_separator(cmd):
+    '''The cmd as str or bytes, and the matching field separator'''
+    if isinstance(cmd, str):
+        return cmd, " "
+    return bytes(cmd), b" "
+
+
+def parse_boundary(cmd):
+    '''Decodes a boundary line, e.g. "5 5"
+
+    :param cmd: The line
+    :type cmd: str or bytes-like
+
+    :returns: The return code and the x, y limits (0, 0 unless OK)
+    :rtype: tuple
+    '''
+    cmd, space = _with_separator(cmd)
+    x, _, y = cmd.partition(space)
+    if space in y:
+        return MALFORMED, 0, 0
+    try:
+        return OK, int(x), int(y)
+    except ValueError:
+        return MALFORMED, 0, 0
+
+
+def parse_coordinates(cmd):
+    '''Decodes a coordinates line, e.g. "1 2 N"
+
+    :param cmd: The line
+    :type cmd: str or bytes-like
+
+    :returns: The return code, the x, y position and the heading (0, 0, 0
+        unless OK)
+    :rtype: tuple
+    '''
+    cmd, space = _with_separator(cmd)
+    position, _, orientation = cmd.rpartition(space)
+    x, _, y = position.partition(space)
+    if space in y:
+        return MALFORMED, 0, 0, 0
+    try:
+        x = int(x)
+        y = int(y)
+    except ValueError:
+        return MALFORMED, 0, 0, 0
+    heading = cardinal.HEADINGS.get(orientation)
+    if heading is None:
+        return INVALID_HEADING, 0, 0, 0
+    return OK, x, y, heading
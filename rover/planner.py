@@ -0,0 +1,229 @@
+'''Path planner
+
+Finds the shortest series of commands (L, R, M) that drives a rover from a
+start position and heading to a goal cell, optionally facing a given
+heading, around the obstacles of the plateau, see :mod: `obstacles`. Every
+command costs the same, so turning in place counts as much as moving.
+
+The search is A* over (x, y, heading) states:
+
+* a state is a single int, ``(y * width + x) * 4 + heading``, and the queue
+  entries pack the priority, the cost so far and the state into one int as
+  well, so the heap compares ints instead of tuples;
+* only the states reached are kept, in dicts and a set, so the memory
+  depends on how much of the plateau is searched, not on its size;
+* the heuristic is the exact cost on a plateau without obstacles: the
+  Manhattan distance plus the fewest turns to face each direction the goal
+  lies in, in the best order, and then the goal heading. Ties go to the
+  state closest to the goal, so on open ground only the states along one
+  shortest path are expanded, and the search only spreads around obstacles.
+
+Jump point search and bidirectional search don't fit turn costs well: jump
+points prune by symmetry of paths that differ in their turns, and turning
+breaks that symmetry. The exact heuristic gets the same effect on open
+ground. Among obstacles though, once a detour costs a couple of turns, every
+state of the area between the start and the goal facing the goal is as
+promising as any other, and they all have to be expanded to be sure the
+plan is the shortest. A heuristic weighted a bit above 1 picks the ones
+closest to the goal first instead, for plans at most that much longer.
+'''
+import heapq
+import itertools
+
+from . import cardinal
+from . import exceptions as exp
+from . import navigation
+
+# the commands, indexed as in the parents of the states
+COMMANDS = "LRM"
+
+# the priorities are ints, the costs are scaled by this much to weight the
+# heuristic, see :meth: `Planner.plan`
+SCALE = 1024
+
+
+def turns(heading, new_heading):
+    '''The fewest turns from a heading to another one
+
+    :param heading: The current heading, see :mod: `cardinal`
+    :type heading: int
+    :param new_heading: The heading to face
+    :type new_heading: int
+
+    :rtype: int
+    '''
+    return min((heading - new_heading) % 4, (new_heading - heading) % 4)
+
+
+def turn_table(goal_heading=None):
+    '''The fewest turns to reach a goal, if nothing is in the way
+
+    Indexed by ``((sign_x + 1) * 3 + sign_y + 1) * 4 + heading``, where
+    sign_x and sign_y are the signs of the goal's x and y distance.
+
+    :param goal_heading: The heading to end with, any if None
+    :type goal_heading: int
+
+    :rtype: tuple
+    '''
+    table = []
+    ends = range(4) if goal_heading is None else (goal_heading,)
+    for sign_x in (-1, 0, 1):
+        for sign_y in (-1, 0, 1):
+            directions = [
+                heading for heading, step in enumerate(
+                    zip(cardinal.DX, cardinal.DY))
+                if step in ((sign_x, 0), (0, sign_y))]
+            for heading in range(4):
+                table.append(min(
+                    sum(turns(a, b) for a, b in zip(
+                        (heading,) + order, order + (end,)))
+                    for order in itertools.permutations(directions)
+                    for end in ends))
+    return tuple(table)
+
+
+class Planner:
+    '''Plans the commands between two cells of a plateau
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param obstacles: The cells the rovers can't move into, anything with a
+        ``taken(x, y)`` method, e.g. :class: `obstacles.ObstacleMap` or
+        :class: `occupancy.Occupancy`
+    :type obstacles: :class: `obstacles.ObstacleMap`
+    '''
+    def __init__(self, boundaries, obstacles=None):
+        x_max, y_max = boundaries
+        if x_max < 0 or y_max < 0:
+            raise exp.InvalidBoundary("Boundary cannot be negative")
+        self.boundaries = boundaries
+        self.obstacles = obstacles if obstacles else None
+        # how many states the last plan expanded
+        self.expanded = 0
+
+    def check(self, x, y):
+        '''Raise if a rover can't stand in the cell
+
+        :raises: BoundaryError if outside of the plateau, CollisionError if
+            blocked
+        '''
+        x_max, y_max = self.boundaries
+        status = navigation.MOVED
+        if not (0 <= x <= x_max and 0 <= y <= y_max):
+            status = navigation.OUT_OF_BOUNDS
+        elif self.obstacles is not None and self.obstacles.taken(x, y):
+            status = navigation.TAKEN
+        if status != navigation.MOVED:
+            message, error = navigation.REJECTIONS[status]
+            raise error(f"{message}: {x} {y}")
+
+    def plan(self, start, goal, weight=1):
+        '''The shortest commands from the start to the goal
+
+        :param start: The x, y position and heading the rover starts from
+        :type start: tuple
+        :param goal: The x, y position to reach, and optionally the heading
+            to end with
+        :type goal: tuple
+        :param weight: Weight of the heuristic, above 1 the commands may be
+            up to that many times longer than the shortest ones, but far
+            fewer states are expanded when obstacles are in the way
+        :type weight: float
+
+        :returns: The commands, or None if the goal can't be reached
+        :rtype: str
+
+        :raises: BoundaryError or CollisionError if a rover can't stand on
+            the start or the goal
+        '''
+        x, y, heading = start
+        goal_x, goal_y, *goal_heading = goal
+        goal_heading = goal_heading[0] if goal_heading else None
+        self.check(x, y)
+        self.check(goal_x, goal_y)
+
+        x_max, y_max = self.boundaries
+        width = x_max + 1
+        states = width * (y_max + 1) * 4
+        obstacles = self.obstacles
+        table = turn_table(goal_heading)
+        left = cardinal.LEFT
+        right = cardinal.RIGHT
+        step_x = cardinal.DX
+        step_y = cardinal.DY
+        push = heapq.heappush
+        pop = heapq.heappop
+        # the costs are scaled to keep the priorities ints
+        scale = SCALE
+        h_scale = round(weight * SCALE)
+
+        state = (y * width + x) * 4 + heading
+        best = {state: 0}
+        parents = {state: -1}
+        closed = set()
+        # entries are ((priority << 32) - cost) * states + state, so the
+        # lowest priority comes first and, among equal ones, the highest cost
+        queue = [state]
+        while queue:
+            state = pop(queue) % states
+            if state in closed:
+                continue
+            closed.add(state)
+            cell, heading = divmod(state, 4)
+            y, x = divmod(cell, width)
+            if x == goal_x and y == goal_y and goal_heading in (None, heading):
+                self.expanded = len(closed)
+                return self.commands(parents, state)
+
+            cost = best[state] + 1
+            distance_x = goal_x - x
+            distance_y = goal_y - y
+            distance = abs(distance_x) + abs(distance_y)
+            row = (((distance_x > 0) - (distance_x < 0) + 1) * 3
+                   + (distance_y > 0) - (distance_y < 0) + 1) * 4
+            base = cell * 4
+            for new_heading, command in ((left[heading], 0),
+                                         (right[heading], 1)):
+                new_state = base + new_heading
+                if new_state in closed \
+                        or cost >= best.get(new_state, cost + 1):
+                    continue
+                best[new_state] = cost
+                parents[new_state] = state * 3 + command
+                priority = cost * scale \
+                    + (distance + table[row + new_heading]) * h_scale
+                push(queue, ((priority << 32) - cost) * states + new_state)
+
+            new_x = x + step_x[heading]
+            new_y = y + step_y[heading]
+            if not (0 <= new_x <= x_max and 0 <= new_y <= y_max) or (
+                    obstacles is not None and obstacles.taken(new_x, new_y)):
+                continue
+            new_state = state + (step_y[heading] * width + step_x[heading]) * 4
+            if new_state in closed or cost >= best.get(new_state, cost + 1):
+                continue
+            best[new_state] = cost
+            parents[new_state] = state * 3 + 2
+            distance_x = goal_x - new_x
+            distance_y = goal_y - new_y
+            priority = cost * scale + (
+                abs(distance_x) + abs(distance_y) + table[
+                    (((distance_x > 0) - (distance_x < 0) + 1) * 3
+                     + (distance_y > 0) - (distance_y < 0) + 1) * 4
+                    + heading]) * h_scale
+            push(queue, ((priority << 32) - cost) * states + new_state)
+
+        self.expanded = len(closed)
+        return None
+
+    @staticmethod
+    def commands(parents, state):
+        '''Follow the parents back from the goal state'''
+        commands = []
+        parent = parents[state]
+        while parent >= 0:
+            state, command = divmod(parent, 3)
+            commands.append(COMMANDS[command])
+            parent = parents[state]
+        return "".join(reversed(commands))
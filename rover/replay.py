@@ -0,0 +1,139 @@
+'''Replay index
+
+Answers "where was the rover after command k?" for a long command string,
+without running the prefix again. The index is built once, running the
+commands run by run like :mod: `runlength`, and keeps a checkpoint at the
+start of each run:
+
+* a straight run keeps how far the rover actually got (its reach). Once a
+  move is rejected, by an edge or by a cell taken by another rover, every
+  following move of the run is rejected too, so after m moves of the run the
+  rover went min(m, reach) cells ahead;
+* any other run is split into blocks of at most :data: `BLOCK_SIZE`
+  commands, and the turns before k are counted in the block.
+
+A query is a binary search over the checkpoints plus constant work, so it
+takes O(log n) time for n commands. The checkpoints are kept in typed arrays.
+'''
+import array
+import bisect
+
+from . import cardinal
+from . import runlength
+
+BLOCK_SIZE = 64
+
+# reach of a checkpoint that only turns
+TURNS = -1
+
+
+class ReplayIndex:
+    '''Index of the locations of a rover along a command string
+
+    The rover is not moved, the commands are run from its current location.
+
+    :param navigation: The navigation system of the rover
+    :type navigation: :class: `navigation.Navigation`
+    :param commands: A series of commands (L, R, M)
+    :type commands: str or bytes-like
+    '''
+    def __init__(self, navigation, commands):
+        if not isinstance(commands, (str, bytes)):
+            commands = bytes(commands)
+        self.commands = commands
+        if isinstance(commands, str):
+            self.left, self.right = "L", "R"
+        else:
+            self.left, self.right = b"L", b"R"
+
+        self.starts = array.array("q")
+        self.x_positions = array.array("q")
+        self.y_positions = array.array("q")
+        self.headings = array.array("b")
+        self.reaches = array.array("q")
+        self.build(navigation)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def checkpoint(self, start, position, heading, reach):
+        '''Adds a checkpoint at command start'''
+        self.starts.append(start)
+        self.x_positions.append(position[0])
+        self.y_positions.append(position[1])
+        self.headings.append(heading)
+        self.reaches.append(reach)
+
+    def build(self, navigation):
+        '''Runs the commands, keeping a checkpoint at the start of each run'''
+        location = navigation.location
+        lower_boundary = location.lower_boundary
+        boundaries = location.boundaries
+        occupancy = navigation.occupancy
+        position = location.position
+        heading = location.heading
+        runs = (runlength.RUNS if isinstance(self.commands, str)
+                else runlength.BYTES_RUNS)
+
+        for run in runs.finditer(self.commands):
+            start, end = run.span()
+            if run.lastindex:
+                new_position = runlength.advance(
+                    position, heading, end - start, lower_boundary,
+                    boundaries)
+                if occupancy and new_position != position:
+                    new_position = runlength.stop_before_taken(
+                        position, new_position, heading, occupancy)
+                reach = abs(new_position[0] - position[0]) \
+                    + abs(new_position[1] - position[1])
+                self.checkpoint(start, position, heading, reach)
+                position = new_position
+                continue
+
+            for block in range(start, end, BLOCK_SIZE):
+                self.checkpoint(block, position, heading, TURNS)
+                heading = (heading + self.turns(
+                    block, min(block + BLOCK_SIZE, end))) % 4
+
+        # the location after the last command
+        self.checkpoint(len(self.commands), position, heading, 0)
+
+    def turns(self, start, end):
+        '''Net number of right turns between two commands'''
+        text = self.commands[start:end]
+        return text.count(self.right) - text.count(self.left)
+
+    def position_at(self, step):
+        '''The location of the rover after a number of commands
+
+        :param step: How many commands were run, from 0 to all of them
+        :type step: int
+
+        :returns: The x, y position and the heading, see :mod: `cardinal`
+        :rtype: tuple
+        '''
+        if not 0 <= step <= len(self.commands):
+            raise IndexError(f"step {step} out of range")
+        index = bisect.bisect_right(self.starts, step) - 1
+        start = self.starts[index]
+        x = self.x_positions[index]
+        y = self.y_positions[index]
+        heading = self.headings[index]
+        reach = self.reaches[index]
+        if reach == TURNS:
+            return x, y, (heading + self.turns(start, step)) % 4
+        moved = min(step - start, reach)
+        return (x + cardinal.DX[heading] * moved,
+                y + cardinal.DY[heading] * moved, heading)
+
+    def location_at(self, step):
+        '''The location of the rover after a number of commands, as a str
+
+        :param step: How many commands were run, from 0 to all of them
+        :type step: int
+
+        :returns: The location, like :meth: `rover.Rover.navigate`
+        :rtype: str
+        '''
+        x, y, heading = self.position_at(step)
+        return f"{x} {y} {cardinal.SHORT_NAMES[heading]}"
@@ -0,0 +1,406 @@
+'''Fleet routes
+
+Splits many survey targets among the rovers of a fleet and writes the
+commands that drive each rover through its targets, ready to run with
+``rover_control.py``.
+
+The costs are those of :mod: `planner`: every command, turn or move, costs
+one. Routing happens in three steps:
+
+1. assignment, greedy: the rover with the shortest route so far takes the
+   target closest to where it stands, counting the turns from its heading,
+   so the routes grow about as long as each other. The targets are indexed
+   in square buckets, so the closest one is found by looking at the few
+   buckets around the rover instead of every target;
+2. ordering, with 2-opt: a part of a route is reversed whenever that makes
+   it shorter. The legs are costed without the heading the rover arrives
+   with, as the Manhattan distance plus a turn if the leg isn't straight, so
+   a reversal is costed in O(1);
+3. planning: the commands of each leg are planned around the obstacles, see
+   :class: `planner.Planner`.
+
+The rovers are independent once assigned, so the last two steps run in a
+pool of processes, one rover at a time.
+
+Each rover is routed as if it were alone on the plateau, only the obstacles
+are in the way. A rover parked at the end of its route can block the route
+of a rover after it, so the mission has to run without checking collisions,
+i.e. without ``--avoid-collisions``, which would reject those moves.
+'''
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import math
+import pathlib
+
+from . import cardinal
+from . import exceptions as exp
+from . import obstacles as obstacle_map
+from . import planner
+
+logger = logging.getLogger(pathlib.PurePath(__file__).name)
+
+
+def leg_table():
+    '''The fewest turns and the final heading of a leg on open ground
+
+    Indexed like :func: `planner.turn_table`, by the signs of the goal's x
+    and y distance and the heading.
+
+    :rtype: tuple
+    '''
+    table = []
+    for sign_x in (-1, 0, 1):
+        for sign_y in (-1, 0, 1):
+            directions = [
+                heading for heading, step in enumerate(
+                    zip(cardinal.DX, cardinal.DY))
+                if step in ((sign_x, 0), (0, sign_y))]
+            for heading in range(4):
+                table.append(min(
+                    (sum(planner.turns(a, b) for a, b in zip(
+                        (heading,) + order, order)),
+                     order[-1] if order else heading)
+                    for order in itertools.permutations(directions)))
+    return tuple(table)
+
+
+LEGS = leg_table()
+
+
+def leg(x, y, heading, goal_x, goal_y):
+    '''The cost and final heading of the shortest leg on open ground
+
+    :param x: The x position coordinate the leg starts from
+    :type x: int
+    :param y: The y position coordinate the leg starts from
+    :type y: int
+    :param heading: The heading the leg starts with
+    :type heading: int
+    :param goal_x: The x position coordinate of the target
+    :type goal_x: int
+    :param goal_y: The y position coordinate of the target
+    :type goal_y: int
+
+    :returns: The cost and the heading of the rover at the target
+    :rtype: tuple
+    '''
+    distance_x = goal_x - x
+    distance_y = goal_y - y
+    turns, end = LEGS[(((distance_x > 0) - (distance_x < 0) + 1) * 3
+                       + (distance_y > 0) - (distance_y < 0) + 1) * 4
+                      + heading]
+    return abs(distance_x) + abs(distance_y) + turns, end
+
+
+class TargetIndex:
+    '''The targets not assigned yet, in square buckets
+
+    :param targets: The x, y position of each target
+    :type targets: list
+    :param bucket_size: How many cells a side a bucket has
+    :type bucket_size: int
+    '''
+    def __init__(self, targets, bucket_size):
+        self.targets = targets
+        self.size = bucket_size
+        self.buckets = {}
+        for index, (x, y) in enumerate(targets):
+            self.buckets.setdefault(
+                (x // bucket_size, y // bucket_size), set()).add(index)
+
+    def __bool__(self):
+        return bool(self.buckets)
+
+    def take(self, index):
+        '''Remove a target from the index'''
+        x, y = self.targets[index]
+        key = (x // self.size, y // self.size)
+        bucket = self.buckets[key]
+        bucket.discard(index)
+        if not bucket:
+            del self.buckets[key]
+
+    def ring(self, column, row, radius):
+        '''The buckets at a distance radius from a bucket, if any'''
+        if not radius:
+            return [(column, row)]
+        side = range(-radius, radius + 1)
+        return ([(column + i, row - radius) for i in side]
+                + [(column + i, row + radius) for i in side]
+                + [(column - radius, row + j) for j in side[1:-1]]
+                + [(column + radius, row + j) for j in side[1:-1]])
+
+    def nearest(self, x, y, heading):
+        '''The closest target, counting the turns
+
+        :returns: The cost, the index and the final heading of the leg to
+            the closest target, None if there are no targets left
+        :rtype: tuple
+        '''
+        buckets = self.buckets
+        if not buckets:
+            return None
+        targets = self.targets
+        size = self.size
+        # any target is closer than this
+        best = (math.inf, -1, heading)
+        radius = -1
+        keys = None
+        # the buckets further than the radius are at least this far
+        while keys is not buckets and best[0] > radius * size + 1:
+            radius += 1
+            # scanning what is left is cheaper than a ring that big
+            keys = buckets if 8 * radius > len(buckets) \
+                else self.ring(x // size, y // size, radius)
+            for key in keys:
+                for index in buckets.get(key, ()):
+                    cost, end = leg(x, y, heading, *targets[index])
+                    if (cost, index) < best[:2]:
+                        best = (cost, index, end)
+        return best
+
+
+def assign(starts, targets):
+    '''Split the targets among the rovers
+
+    :param starts: The x, y position and heading of each rover
+    :type starts: list
+    :param targets: The x, y position of each target
+    :type targets: list
+
+    :returns: The indexes of the targets of each rover, in the order they
+        were taken
+    :rtype: list
+    '''
+    routes = [[] for _ in starts]
+    if not starts or not targets:
+        return routes
+    x_values = [x for x, _ in targets]
+    y_values = [y for _, y in targets]
+    area = (max(x_values) - min(x_values) + 1) \
+        * (max(y_values) - min(y_values) + 1)
+    # about one target in each bucket
+    index = TargetIndex(targets, max(1, int((area / len(targets)) ** 0.5)))
+
+    positions = list(starts)
+    queue = [(0, rover) for rover in range(len(starts))]
+    while index:
+        cost, rover = heapq.heappop(queue)
+        leg_cost, target, heading = index.nearest(*positions[rover])
+        index.take(target)
+        routes[rover].append(target)
+        positions[rover] = (*targets[target], heading)
+        heapq.heappush(queue, (cost + leg_cost, rover))
+    return routes
+
+
+def route_cost(start, points):
+    '''The cost of a route on open ground, counting the turns
+
+    :param start: The x, y position and heading of the rover
+    :type start: tuple
+    :param points: The x, y position of each target, in order
+    :type points: list
+
+    :rtype: int
+    '''
+    x, y, heading = start
+    total = 0
+    for goal_x, goal_y in points:
+        cost, heading = leg(x, y, heading, goal_x, goal_y)
+        total += cost
+        x, y = goal_x, goal_y
+    return total
+
+
+def two_opt(start, points):
+    '''Shorten a route by reversing parts of it
+
+    :param start: The x, y position and heading of the rover
+    :type start: tuple
+    :param points: The x, y position of each target, in order
+    :type points: list
+
+    :returns: The targets in the new order, or in the same order if that
+        is shorter once the turns at the targets are counted
+    :rtype: list
+    '''
+    route = [start[:2]] + list(points)
+    last = len(route) - 1
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, last):
+            a_x, a_y = route[i - 1]
+            for j in range(i + 1, last + 1):
+                b_x, b_y = route[i]
+                c_x, c_y = route[j]
+                # the legs a-b and c-d become a-c and b-d
+                span_x = abs(a_x - b_x)
+                span_y = abs(a_y - b_y)
+                delta = -(span_x + span_y + (span_x and span_y and 1))
+                span_x = abs(a_x - c_x)
+                span_y = abs(a_y - c_y)
+                delta += span_x + span_y + (span_x and span_y and 1)
+                if j < last:
+                    d_x, d_y = route[j + 1]
+                    span_x = abs(c_x - d_x)
+                    span_y = abs(c_y - d_y)
+                    delta -= span_x + span_y + (span_x and span_y and 1)
+                    span_x = abs(b_x - d_x)
+                    span_y = abs(b_y - d_y)
+                    delta += span_x + span_y + (span_x and span_y and 1)
+                if delta < 0:
+                    route[i:j + 1] = route[j:i - 1:-1]
+                    improved = True
+    route = route[1:]
+    if route_cost(start, route) > route_cost(start, points):
+        return list(points)
+    return route
+
+
+# the planner of a process of the pool, see :func: `init_worker`
+WORKER = {}
+
+
+def init_worker(boundaries, obstacles_path=None):
+    '''Set up the planner of a process, loading the obstacles once
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param obstacles_path: The obstacle map, see :func: `obstacles.load`
+    :type obstacles_path: str
+    '''
+    obstacles = None
+    if obstacles_path is not None:
+        obstacles = obstacle_map.load(obstacles_path, boundaries)
+    WORKER["planner"] = planner.Planner(boundaries, obstacles)
+
+
+def route_commands(start, points, weight=1, route_planner=None):
+    '''Order the targets of a rover and plan the commands through them
+
+    Targets that can't be reached are skipped.
+
+    :param start: The x, y position and heading of the rover
+    :type start: tuple
+    :param points: The x, y position of each target
+    :type points: list
+    :param weight: Weight of the planner's heuristic, see :meth:
+        `planner.Planner.plan`
+    :type weight: float
+    :param route_planner: The planner, the one of the process of the pool
+        if None, see :func: `init_worker`
+    :type route_planner: :class: `planner.Planner`
+
+    :returns: The commands and how many targets were skipped
+    :rtype: tuple
+    '''
+    if route_planner is None:
+        route_planner = WORKER["planner"]
+    x, y, heading = start
+    commands = []
+    skipped = 0
+    for goal_x, goal_y in two_opt(start, points):
+        leg_commands = route_planner.plan(
+            (x, y, heading), (goal_x, goal_y), weight)
+        if leg_commands is None:
+            skipped += 1
+            continue
+        commands.append(leg_commands)
+        heading = (heading + leg_commands.count("R")
+                   - leg_commands.count("L")) % 4
+        x, y = goal_x, goal_y
+    return "".join(commands), skipped
+
+
+def check_cells(cells, boundaries, obstacles, kind):
+    '''The cells a rover can stand in, logging the others
+
+    :returns: The indexes of the valid cells
+    :rtype: list
+    '''
+    check = planner.Planner(boundaries, obstacles).check
+    valid = []
+    for index, cell in enumerate(cells):
+        try:
+            check(*cell[:2])
+        except exp.BoundaryError as err:
+            logger.error("%s %d skipped: %s", kind, index + 1, err)
+            continue
+        valid.append(index)
+    return valid
+
+
+def optimize(boundaries, starts, targets, obstacles_path=None, workers=1,
+             weight=1):
+    '''Route the rovers of a fleet through the targets
+
+    Rovers and targets out of the plateau or on an obstacle are skipped.
+    The other rovers are not in the way of a route, see the module
+    docstring.
+
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param starts: The x, y position and heading of each rover
+    :type starts: list
+    :param targets: The x, y position of each target
+    :type targets: list
+    :param obstacles_path: The obstacle map, see :func: `obstacles.load`
+    :type obstacles_path: str
+    :param workers: How many processes order and plan the routes
+    :type workers: int
+    :param weight: Weight of the planner's heuristic, see :meth:
+        `planner.Planner.plan`
+    :type weight: float
+
+    :returns: The start and the commands of each rover
+    :rtype: list
+
+    :raises: InvalidObstacles if the obstacle map is malformed
+    '''
+    obstacles = None
+    if obstacles_path is not None:
+        obstacles = obstacle_map.load(obstacles_path, boundaries)
+    starts = [starts[index] for index in check_cells(
+        starts, boundaries, obstacles, "rover")]
+    targets = [targets[index] for index in check_cells(
+        targets, boundaries, obstacles, "target")]
+    routes = [[targets[index] for index in route]
+              for route in assign(starts, targets)]
+
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=init_worker,
+                initargs=(boundaries, obstacles_path)) as executor:
+            results = list(executor.map(
+                route_commands, starts, routes,
+                itertools.repeat(weight)))
+    else:
+        route_planner = planner.Planner(boundaries, obstacles)
+        results = [route_commands(start, route, weight, route_planner)
+                   for start, route in zip(starts, routes)]
+
+    skipped = sum(skipped for _, skipped in results)
+    if skipped:
+        logger.warning("%d targets can't be reached, skipped", skipped)
+    return [(start, commands)
+            for start, (commands, _) in zip(starts, results)]
+
+
+def write_mission(stream, boundaries, routes):
+    '''Write the routes as a command file for ``rover_control.py``
+
+    :param stream: Text stream to write to
+    :type stream: file-like
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+    :param routes: The start and the commands of each rover
+    :type routes: list
+    '''
+    stream.write(f"{boundaries[0]} {boundaries[1]}\n")
+    for (x, y, heading), commands in routes:
+        stream.write(f"{x} {y} {cardinal.SHORT_NAMES[heading]}\n"
+                     f"{commands}\n")
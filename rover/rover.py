@@ -5,17 +5,46 @@ and the rover's internal navigation system.
 '''
 import logging
 import pathlib
+import time
 
 from . import exceptions as exp
 from . import navigation
+from . import replay
+from . import runlength
 
 
 class Rover:
-    '''Rover interface module'''
+    '''Rover interface module
 
-    def __init__(self):
+    The rover can run the commands with one of the following engines:
+
+    * ``step``: process one command at a time;
+    * ``runlength``: process the commands in runs, see :mod: `runlength`.
+
+    Tracing each step is expensive, so it is only done by the ``step`` engine
+    when debug logging is enabled, which is checked once for each series of
+    commands. Otherwise, each navigation only logs a summary at info level.
+
+    When not tracing, the rover can also apply cached maneuvers, see
+    :mod: `maneuvers`, and only falls back to its engine when the maneuver
+    doesn't fit in the plateau.
+
+    When recording its trajectory, every step is recorded instead, see
+    :mod: `trajectory`, no matter the engine.
+
+    Whatever runs the commands, it can be measured, see :mod: `metrics`.
+    '''
+    engines = ("step", "runlength")
+
+    def __init__(self, engine="step"):
+        if engine not in self.engines:
+            raise exp.InvalidEngine(f"Invalid engine {engine}")
         self.logger = logging.getLogger(pathlib.PurePath(__file__).name)
         self.navigation = navigation.Navigation()
+        self.engine = engine
+        self.maneuvers = None
+        self.recorder = None
+        self.metrics = None
 
     def set_boundaries(self, x, y):
         '''Set the rover space boundary (limit) into the navigation system
@@ -27,6 +56,52 @@ class Rover:
         '''
         self.navigation.set_boundaries((x, y))
 
+    def set_occupancy(self, occupancy):
+        '''Share the cells taken by other rovers with the navigation system
+
+        Moving into a taken cell is rejected like moving out of the plateau.
+
+        :param occupancy: The cells taken by other rovers, or only by
+            obstacles
+        :type occupancy: :class: `occupancy.Occupancy` or
+            :class: `obstacles.ObstacleMap`
+        '''
+        self.navigation.occupancy = occupancy
+
+    def set_coverage(self, coverage):
+        '''Share a coverage map with the navigation system
+
+        Every cell the rover visits from now on is marked in the map.
+
+        :param coverage: The map, or None to stop marking
+        :type coverage: :class: `coverage.Coverage`
+        '''
+        self.navigation.coverage = coverage
+
+    def set_maneuver_cache(self, maneuvers):
+        '''Share a maneuver cache with the rover
+
+        :param maneuvers: The cache, or None to always run the engine
+        :type maneuvers: :class: `maneuvers.ManeuverCache`
+        '''
+        self.maneuvers = maneuvers
+
+    def set_recorder(self, recorder):
+        '''Record every step of the rover from now on
+
+        :param recorder: The recorder, or None to stop recording
+        :type recorder: :class: `trajectory.TrajectoryRecorder`
+        '''
+        self.recorder = recorder
+
+    def set_metrics(self, metrics):
+        '''Count and time the navigations from now on
+
+        :param metrics: The metrics, or None to stop measuring
+        :type metrics: :class: `metrics.Metrics`
+        '''
+        self.metrics = metrics
+
     def set_inital_position(self, x, y, orientation):
         '''Set the rover's initial position
 
@@ -40,23 +115,213 @@ class Rover:
         self.navigation.set_position((x, y))
         self.navigation.set_initial_orientation(orientation)
 
+    def place(self, x, y, heading):
+        '''Set the rover's initial position and an already decoded heading
+
+        :param x: The x position coordinate
+        :type x: int
+        :param y: The y position coordinate
+        :type y: int
+        :param heading: The heading, see :mod: `cardinal`
+        :type heading: int
+        '''
+        self.navigation.set_xy(x, y)
+        self.navigation.location.heading = heading
+
     def navigate(self, commands):
         '''Navigate the rover according to a list of commands
 
         :param commands: A series of commands (L, R, M)
-        :type commands: str
+        :type commands: str or bytes-like
+
+        :returns: The rover's location after all commands were processed
+        :rtype: str
+        '''
+        if self.recorder is not None:
+            self.recorder.start_rover()
+        rejected, invalid = self.run_commands(commands)
+        location = str(self.navigation.location)
+        self.log_summary(len(commands), rejected, invalid, location)
+        if self.metrics is not None and self.metrics.enabled:
+            self.metrics.count("rovers")
+        return location
+
+    def replay_index(self, commands):
+        '''Index where the rover would be after each of the commands
+
+        The rover doesn't move, see :class: `replay.ReplayIndex`.
+
+        :param commands: A series of commands (L, R, M)
+        :type commands: str or bytes-like
+
+        :returns: The index, to query the location after any command
+        :rtype: :class: `replay.ReplayIndex`
+        '''
+        return replay.ReplayIndex(self.navigation, commands)
+
+    def navigate_chunks(self, chunks):
+        '''Navigate the rover according to a stream of commands
+
+        The commands are processed one chunk at a time, so the whole stream
+        never needs to be in memory.
+
+        :param chunks: Pieces of a series of commands (L, R, M)
+        :type chunks: iterable
 
         :returns: The rover's location after all commands were processed
         :rtype: str
         '''
-        # break the commands into a list
-        cmds = list(commands)
-        for cmd in cmds:
+        stream = self.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        return stream.finish()
+
+    def stream(self):
+        '''Start navigating with commands that will arrive in pieces
+
+        Unlike :meth:`navigate_chunks`, the pieces are pushed to the stream
+        as they arrive, e.g., from a socket.
+
+        :returns: The stream, to feed the pieces and finish the navigation
+        :rtype: :class: `NavigationStream`
+        '''
+        return NavigationStream(self)
+
+    def log_summary(self, commands, rejected, invalid, location):
+        '''Log a structured summary of a navigation
+
+        The summary is also attached to the log record as ``summary``, so
+        handlers can use the fields directly.
+
+        :param commands: How many commands were processed
+        :type commands: int
+        :param rejected: How many moves were rejected
+        :type rejected: int
+        :param invalid: How many commands were invalid
+        :type invalid: int
+        :param location: The rover's final location
+        :type location: str
+        '''
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        summary = {
+            "commands": commands,
+            "rejected": rejected,
+            "invalid": invalid,
+            "location": location,
+        }
+        self.logger.info(
+            "navigation summary: %(commands)d commands, %(rejected)d rejected "
+            "moves, %(invalid)d invalid, now at %(location)s",
+            summary, extra={"summary": summary})
+
+    def tracing(self):
+        '''Whether each step should be traced
+
+        :rtype: bool
+        '''
+        return (self.logger.isEnabledFor(logging.DEBUG)
+                or self.navigation.logger.isEnabledFor(logging.DEBUG))
+
+    def run_commands(self, commands):
+        '''Run the commands, measuring them if there are metrics
+
+        See :meth:`run_engine`.
+        '''
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            return self.run_engine(commands)
+        start = time.perf_counter()
+        rejected, invalid = self.run_engine(commands)
+        metrics.navigated(
+            commands, rejected, invalid, time.perf_counter() - start)
+        return rejected, invalid
+
+    def run_engine(self, commands):
+        '''Run the commands with the rover's engine
+
+        The commands can also be bytes-like. The run-length engine works on
+        them directly, while the step engine decodes them first.
+
+        :param commands: A series of commands (L, R, M)
+        :type commands: str or bytes-like
+
+        :returns: How many moves were rejected and how many commands were
+            invalid
+        :rtype: tuple
+        '''
+        if self.recorder is not None:
+            return self.recorder.navigate(self.navigation, commands)
+
+        if self.maneuvers is not None and not self.tracing():
+            result = self.maneuvers.run(self.navigation, commands)
+            if result is not None:
+                return result
+
+        if self.engine == "runlength":
+            return runlength.navigate(self.navigation, commands)
+
+        if not isinstance(commands, str):
+            commands = str(commands, "ascii", "replace")
+
+        if not self.tracing():
+            return self.navigation.process_cmds(commands)
+
+        rejected = invalid = 0
+        for cmd in commands:
+            if cmd == "M":
+                status = self.navigation.try_move()
+                if status != navigation.MOVED:
+                    self.logger.error(
+                        "move rejected: %s", navigation.REJECTIONS[status][0])
+                    rejected += 1
+                    continue
+                self.logger.debug(self.navigation.location)
+                continue
             try:
                 self.navigation.process_cmd(cmd)
-            except (exp.BoundaryError, exp.InvalidCommand) as err:
-                logging.exception(err)
+            except exp.InvalidCommand:
+                invalid += 1
                 continue
-            self.logger.info(self.navigation.location)
+            self.logger.debug(self.navigation.location)
+        if invalid:
+            self.logger.error("skipped %d invalid commands", invalid)
+        return rejected, invalid
 
-        return str(self.navigation.location)
+
+class NavigationStream:
+    '''Navigation of a rover with commands that arrive in pieces
+
+    :param rover: The rover to navigate
+    :type rover: :class: `Rover`
+    '''
+    def __init__(self, rover):
+        self.rover = rover
+        self.total = self.rejected = self.invalid = 0
+        if rover.recorder is not None:
+            rover.recorder.start_rover()
+
+    def feed(self, chunk):
+        '''Process a piece of the commands
+
+        :param chunk: A piece of a series of commands (L, R, M)
+        :type chunk: str or bytes-like
+        '''
+        rejected, invalid = self.rover.run_commands(chunk)
+        self.total += len(chunk)
+        self.rejected += rejected
+        self.invalid += invalid
+
+    def finish(self):
+        '''All commands were processed
+
+        :returns: The rover's location
+        :rtype: str
+        '''
+        location = str(self.rover.navigation.location)
+        self.rover.log_summary(
+            self.total, self.rejected, self.invalid, location)
+        metrics = self.rover.metrics
+        if metrics is not None and metrics.enabled:
+            metrics.count("rovers")
+        return location
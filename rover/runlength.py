@@ -0,0 +1,169 @@
+'''Run-length navigation engine
+
+Processing the commands one at a time (see :meth:`navigation.Navigation.
+process_cmd`) is easy to follow, but too slow for command strings with
+millions of commands. This engine compresses the commands into runs instead:
+
+* a run of ``M`` is a straight segment, so the final position is calculated
+  at once by clamping the segment to the plateau;
+* any other run only changes the orientation, so it is folded into a net
+  number of right turns. Invalid commands are counted and skipped.
+
+The result is exactly the same as processing step by step: a move that would
+take the rover out of the plateau is skipped and the rover keeps going, i.e.,
+moving against an edge leaves the rover on the edge. The same goes for cells
+taken by other rovers, though each cell of the segment has to be checked.
+'''
+import logging
+import pathlib
+import re
+
+from . import cardinal
+
+# a run is either a straight segment (first group) or a sequence of anything
+# else. The commands can also be bytes-like, e.g., a memoryview of a file.
+RUNS = re.compile(r"(M+)|[^M]+")
+BYTES_RUNS = re.compile(rb"(M+)|[^M]+")
+
+logger = logging.getLogger(pathlib.PurePath(__file__).name)
+
+
+def compress(commands):
+    '''Compress the commands into runs
+
+    :param commands: A series of commands (L, R, M)
+    :type commands: str or bytes-like
+
+    :yields: a tuple (moves, turns, invalid) for each run. ``moves`` is the
+        length of a straight segment, ``turns`` the net number of 90 degrees
+        right turns (0 to 3) and ``invalid`` how many invalid commands were
+        found in the run.
+    '''
+    if isinstance(commands, str):
+        runs, left, right = RUNS, "L", "R"
+    else:
+        runs, left, right = BYTES_RUNS, b"L", b"R"
+
+    for run in runs.finditer(commands):
+        if run.lastindex:
+            # no need to copy a straight segment, only its length matters
+            start, end = run.span()
+            yield end - start, 0, 0
+            continue
+        text = run.group()
+        lefts = text.count(left)
+        rights = text.count(right)
+        yield 0, (rights - lefts) % 4, len(text) - lefts - rights
+
+
+def advance(position, heading, moves, lower_boundary, boundaries):
+    '''Calculates the final position of a straight segment
+
+    Since every move in the segment goes in the same direction, once a move
+    is rejected all the following ones are rejected as well. So either the
+    first move is rejected and the rover stays put, or the rover goes as far
+    as it can until reaching the edge of the plateau.
+
+    :param position: A tuple that describes x and y position
+    :type position: tuple
+    :param heading: The heading of the rover, see :mod: `cardinal`
+    :type heading: int
+    :param moves: How many moves there are in the segment
+    :type moves: int
+    :param lower_boundary: The lower limits (x, y) of the plateau
+    :type lower_boundary: tuple
+    :param boundaries: The upper limits (x, y) of the plateau
+    :type boundaries: tuple
+
+    :returns: The new calculated position
+    :rtype: tuple
+    '''
+    x, y = position
+    x_min, y_min = lower_boundary
+    x_max, y_max = boundaries
+    step_x = cardinal.DX[heading]
+    step_y = cardinal.DY[heading]
+    if not(x_min <= x + step_x <= x_max and y_min <= y + step_y <= y_max):
+        return position
+
+    if step_x > 0:
+        return min(x + moves, x_max), y
+    if step_x < 0:
+        return max(x - moves, x_min), y
+    if step_y > 0:
+        return x, min(y + moves, y_max)
+    return x, max(y - moves, y_min)
+
+
+def stop_before_taken(position, new_position, heading, occupancy):
+    '''Stops a straight segment right before the first taken cell
+
+    :param position: Where the segment starts
+    :type position: tuple
+    :param new_position: Where the segment ends, see :func: `advance`
+    :type new_position: tuple
+    :param heading: The heading of the rover, see :mod: `cardinal`
+    :type heading: int
+    :param occupancy: The cells taken by other rovers
+    :type occupancy: :class: `occupancy.Occupancy`
+
+    :returns: The new calculated position
+    :rtype: tuple
+    '''
+    step_x = cardinal.DX[heading]
+    step_y = cardinal.DY[heading]
+    x, y = position
+    while (x, y) != new_position:
+        if occupancy.taken(x + step_x, y + step_y):
+            break
+        x += step_x
+        y += step_y
+    return x, y
+
+
+def navigate(navigation, commands):
+    '''Process all commands at once, run by run
+
+    :param navigation: The navigation system we want to move
+    :type navigation: :class: `navigation.Navigation`
+    :param commands: A series of commands (L, R, M)
+    :type commands: str or bytes-like
+
+    :returns: How many moves were rejected and how many commands were invalid
+    :rtype: tuple
+    '''
+    location = navigation.location
+    lower_boundary = location.lower_boundary
+    boundaries = location.boundaries
+    position = location.position
+    heading = location.heading
+    occupancy = navigation.occupancy
+    coverage = navigation.coverage
+    rejected = invalid = 0
+
+    for moves, turns, skipped in compress(commands):
+        if moves:
+            new_position = advance(
+                position, heading, moves, lower_boundary, boundaries)
+            if occupancy and new_position != position:
+                new_position = stop_before_taken(
+                    position, new_position, heading, occupancy)
+            # the segment is along one axis, so this is how far it went
+            reach = abs(new_position[0] - position[0]) \
+                + abs(new_position[1] - position[1])
+            rejected += moves - reach
+            if coverage is not None and reach:
+                coverage.visit_run(*position, heading, reach)
+            position = new_position
+        else:
+            # headings are in clockwise order, so turning right is adding
+            heading = (heading + turns) % 4
+            invalid += skipped
+
+    location.position = position
+    location.heading = heading
+    if rejected:
+        logger.error("rejected %d moves", rejected)
+    if invalid:
+        logger.error("skipped %d invalid commands", invalid)
+    return rejected, invalid
@@ -0,0 +1,126 @@
+'''Rover command server
+
+Serves the line protocol of ``rover_control.py`` over TCP or a Unix socket,
+with asyncio. Each connection gets its own :class: `control.Control`, so a
+client sends the boundary, then coordinates and commands for as many rovers
+as it wants, and receives the final coordinates of each rover, one per line,
+as soon as its commands line ends.
+
+The socket is read ``read_size`` bytes at a time and each read is pushed to
+the controller with :meth: `control.Control.feed`, so a huge command line is
+navigated as it arrives, with memory bounded by ``read_size``. After each
+read the handler yields to the event loop, so a client sending a huge line
+can't starve the others, and it waits for the results to be sent before
+reading more, so a client that doesn't read its results is throttled.
+
+Every connection shares the same maneuver cache, if any, see
+:mod: `maneuvers`. The event loop runs in a single thread, so it is safe.
+'''
+import asyncio
+import functools
+import logging
+import pathlib
+
+from . import control as controller
+from . import sinks
+
+logger = logging.getLogger(pathlib.PurePath(__file__).name)
+
+READ_SIZE = 2 ** 13
+
+
+async def send_results(writer, sink):
+    '''Sends the results kept by the sink, waiting for the client to read'''
+    if sink.results:
+        sink.results.append("")
+        writer.write("\n".join(sink.results).encode("ascii"))
+        sink.results.clear()
+    await writer.drain()
+
+
+async def handle_client(reader, writer, engine="step",
+                        avoid_collisions=False, maneuvers=None,
+                        read_size=READ_SIZE):
+    '''Runs the commands of a connection until the client closes it
+
+    :param reader: Where the commands come from
+    :type reader: :class: `asyncio.StreamReader`
+    :param writer: Where the final coordinates go
+    :type writer: :class: `asyncio.StreamWriter`
+    :param engine: The engine the rovers use, see :class: `rover.Rover`
+    :type engine: str
+    :param avoid_collisions: Keep a fleet of rovers that can't collide
+    :type avoid_collisions: bool
+    :param maneuvers: Cache of the maneuvers the rovers run
+    :type maneuvers: :class: `maneuvers.ManeuverCache`
+    :param read_size: How many bytes to read at a time
+    :type read_size: int
+    '''
+    peer = writer.get_extra_info("peername") or "unix socket"
+    logger.info("client connected: %s", peer)
+    sink = sinks.ListSink()
+    control = controller.Control(engine, avoid_collisions, sink=sink,
+                                 maneuvers=maneuvers)
+    pending = False
+    try:
+        while True:
+            data = await reader.read(read_size)
+            if not data:
+                break
+            *lines, rest = data.split(b"\n")
+            for line in lines:
+                control.feed(line)
+                control.end_line()
+            if lines:
+                pending = False
+            if rest:
+                control.feed(rest)
+                pending = True
+            await send_results(writer, sink)
+            # let the other clients run, however long this line is
+            await asyncio.sleep(0)
+
+        if pending:
+            # the last line doesn't end with a newline
+            control.end_line()
+        await send_results(writer, sink)
+    except ConnectionError as err:
+        logger.warning("client %s went away: %s", peer, err)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+        logger.info("client disconnected: %s", peer)
+
+
+async def start(host=None, port=None, path=None, **options):
+    '''Starts serving on a TCP port or, if path is set, on a Unix socket
+
+    :param host: The interface to listen on, all of them by default
+    :type host: str
+    :param port: The TCP port, 0 picks a free one
+    :type port: int
+    :param path: The path of the Unix socket
+    :type path: str
+    :param options: Passed to :func: `handle_client`
+
+    :returns: The server, already serving
+    :rtype: :class: `asyncio.Server`
+    '''
+    handler = functools.partial(handle_client, **options)
+    if path is not None:
+        server = await asyncio.start_unix_server(handler, path)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    for sock in server.sockets:
+        logger.info("listening on %s", sock.getsockname())
+    return server
+
+
+async def serve(host=None, port=None, path=None, **options):
+    '''Serves forever, see :func: `start`'''
+    server = await start(host, port, path, **options)
+    async with server:
+        await server.serve_forever()
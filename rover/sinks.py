@@ -0,0 +1,84 @@
+'''Result sinks
+
+Where :class: `control.Control` sends the final coordinates of each rover.
+Printing every result is fine for a handful of rovers, but with millions of
+them the output should be written in batches:
+
+* :class: `BufferedSink` joins the results and writes them to a stream once
+  ``flush_size`` chars are pending;
+* :class: `ListSink` keeps them in memory;
+* :class: `CallbackSink` hands each one to a function, ``print`` by default.
+
+Every sink has ``write``, ``flush`` and ``close``. Whoever creates the sink
+is in charge of flushing or closing it once the rovers are done.
+'''
+import sys
+
+
+class Sink:
+    '''Base sink, discards the results'''
+    def write(self, result):
+        '''Receive the final coordinates of a rover
+
+        :param result: The rover's location, e.g. "1 3 N"
+        :type result: str
+        '''
+
+    def flush(self):
+        '''Deliver whatever is pending'''
+
+    def close(self):
+        '''Deliver whatever is pending, no more results will come'''
+        self.flush()
+
+
+class BufferedSink(Sink):
+    '''Writes the results to a stream, one per line, in batches
+
+    :param stream: Text stream to write to, by default the current stdout
+    :type stream: file-like
+    :param flush_size: How many chars to keep before writing
+    :type flush_size: int
+    '''
+    def __init__(self, stream=None, flush_size=2 ** 16):
+        self.stream = stream
+        self.flush_size = flush_size
+        self.pending = []
+        self.pending_chars = 0
+
+    def write(self, result):
+        self.pending.append(result)
+        self.pending_chars += len(result) + 1
+        if self.pending_chars >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.pending:
+            self.pending.append("")
+            stream.write("\n".join(self.pending))
+            self.pending.clear()
+            self.pending_chars = 0
+        stream.flush()
+
+
+class ListSink(Sink):
+    '''Keeps the results in memory, see ``results``'''
+    def __init__(self):
+        self.results = []
+
+    def write(self, result):
+        self.results.append(result)
+
+
+class CallbackSink(Sink):
+    '''Calls a function with each result as soon as it arrives
+
+    :param callback: Called with the result, by default ``print``
+    :type callback: callable
+    '''
+    def __init__(self, callback=print):
+        self.callback = callback
+
+    def write(self, result):
+        self.callback(result)
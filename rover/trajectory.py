@@ -0,0 +1,339 @@
+'''Trajectory recorder
+
+Records the location of the rovers after every command: x, y, heading (see
+:mod: `cardinal`) and whether the command was a rejected move. The steps are
+appended to typed arrays and written in batches to a directory, one column
+per file:
+
+* ``x.npy`` and ``y.npy``: 64 bits ints;
+* ``heading.npy`` and ``rejected.npy``: 8 bits ints;
+* ``offsets.npy``: where the steps of each rover start, plus the total, so
+  the steps of rover i are ``offsets[i]:offsets[i + 1]``.
+
+The files are plain NumPy ``.npy`` files, written without NumPy, so they
+can be memory-mapped later with ``numpy.load(path, mmap_mode="r")``, or read
+with :func: `load_column`.
+
+Short command strings are run one command at a time, appending each step
+right away. Longer ones are run run by run, like :mod: `runlength`, and the
+steps of a straight run are generated in bulk, so recording costs little more
+than navigating.
+'''
+import array
+import ast
+import itertools
+import logging
+import os
+import pathlib
+import sys
+
+from . import cardinal
+from . import runlength
+
+logger = logging.getLogger(pathlib.PurePath(__file__).name)
+
+# NumPy dtypes of the array typecodes, always little-endian
+DTYPES = {
+    "q": "<i8",
+    "b": "|i1",
+}
+TYPECODES = {dtype: typecode for typecode, dtype in DTYPES.items()}
+
+MAGIC = b"\x93NUMPY\x01\x00"
+# room for any shape, so the header can be rewritten in place
+HEADER_SIZE = 128
+
+
+def npy_header(typecode, length):
+    '''The header of a one dimension .npy file
+
+    :param typecode: The typecode of the array, see :data: `DTYPES`
+    :type typecode: str
+    :param length: How many items there are
+    :type length: int
+
+    :rtype: bytes
+    '''
+    header = (f"{{'descr': '{DTYPES[typecode]}', 'fortran_order': False, "
+              f"'shape': ({length},), }}")
+    size = HEADER_SIZE - len(MAGIC) - 2
+    header = header.ljust(size - 1) + "\n"
+    return MAGIC + size.to_bytes(2, "little") + header.encode("ascii")
+
+
+class NpyColumn:
+    '''A .npy file of unknown length, written in batches
+
+    :param path: The file to write
+    :type path: str
+    :param typecode: The typecode of the items, see :data: `DTYPES`
+    :type typecode: str
+    '''
+    def __init__(self, path, typecode):
+        self.typecode = typecode
+        self.length = 0
+        self.file = open(path, "wb")
+        self.file.write(npy_header(typecode, 0))
+
+    def write(self, values):
+        '''Append the values
+
+        :param values: The values, with the same typecode
+        :type values: :class: `array.array`
+        '''
+        if sys.byteorder == "big" and values.itemsize > 1:
+            # .npy files here are always little-endian
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        values.tofile(self.file)
+        self.length += len(values)
+
+    def close(self):
+        '''Write the final length in the header and close the file'''
+        self.file.seek(0)
+        self.file.write(npy_header(self.typecode, self.length))
+        self.file.close()
+
+
+def load_column(path):
+    '''Read a .npy file written by :class: `NpyColumn`
+
+    :param path: The file
+    :type path: str
+
+    :rtype: :class: `array.array`
+    '''
+    with open(path, "rb") as npy_file:
+        magic = npy_file.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a .npy file")
+        size = int.from_bytes(npy_file.read(2), "little")
+        header = ast.literal_eval(npy_file.read(size).decode("ascii"))
+        column = array.array(TYPECODES[header["descr"]])
+        column.fromfile(npy_file, header["shape"][0])
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+class TrajectoryRecorder:
+    '''Runs the commands of the rovers, recording every step
+
+    :param directory: Where to write the columns, created if needed
+    :type directory: str
+    :param flush_size: How many steps to keep before writing them
+    :type flush_size: int
+    '''
+    columns = (("x", "q"), ("y", "q"), ("heading", "b"), ("rejected", "b"))
+
+    # longer command strings are recorded run by run
+    step_limit = 256
+
+    def __init__(self, directory, flush_size=2 ** 16):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_size = flush_size
+        self.files = {
+            name: NpyColumn(os.path.join(directory, f"{name}.npy"), typecode)
+            for name, typecode in self.columns
+        }
+        self.x = array.array("q")
+        self.y = array.array("q")
+        self.heading = array.array("b")
+        self.rejected = array.array("b")
+        self.offsets = array.array("q")
+        self.steps = 0
+
+    def start_rover(self):
+        '''The next steps belong to a new rover'''
+        self.offsets.append(self.steps)
+
+    def flush(self):
+        '''Write the steps kept so far'''
+        for name, _ in self.columns:
+            column = getattr(self, name)
+            self.files[name].write(column)
+            del column[:]
+
+    def close(self):
+        '''Write everything and close the files'''
+        self.flush()
+        for npy_file in self.files.values():
+            npy_file.close()
+        offsets = NpyColumn(os.path.join(self.directory, "offsets.npy"), "q")
+        offsets.write(self.offsets + array.array("q", [self.steps]))
+        offsets.close()
+
+    def record_straight(self, x, y, heading, moves, reach):
+        '''Record a straight run, in batches of at most flush_size steps
+
+        The rover moves reach cells ahead, any move after that is rejected.
+        '''
+        step_x = cardinal.DX[heading]
+        step_y = cardinal.DY[heading]
+        done = 0
+        while done < moves:
+            size = min(moves - done, self.flush_size)
+            moved = min(max(reach - done, 0), size)
+            for column, start, delta in ((self.x, x, step_x),
+                                         (self.y, y, step_y)):
+                start += delta * min(done, reach)
+                if delta:
+                    column.extend(range(
+                        start + delta, start + delta * (moved + 1), delta))
+                else:
+                    column.extend(itertools.repeat(start, moved))
+                column.extend(
+                    itertools.repeat(start + delta * moved, size - moved))
+            self.heading.extend(itertools.repeat(heading, size))
+            self.rejected.frombytes(bytes(moved) + b"\x01" * (size - moved))
+            done += size
+            self.steps += size
+            if len(self.x) >= self.flush_size:
+                self.flush()
+
+    def record_turns(self, x, y, heading, text):
+        '''Record a run of anything but moves
+
+        :returns: The heading after the run
+        :rtype: int
+        '''
+        left, right = ("L", "R") if isinstance(text, str) else b"LR"
+        headings = self.heading
+        for command in text:
+            if command == left:
+                heading = cardinal.LEFT[heading]
+            elif command == right:
+                heading = cardinal.RIGHT[heading]
+            headings.append(heading)
+        size = len(text)
+        self.x.extend(itertools.repeat(x, size))
+        self.y.extend(itertools.repeat(y, size))
+        self.rejected.frombytes(bytes(size))
+        self.steps += size
+        if len(self.x) >= self.flush_size:
+            self.flush()
+        return heading
+
+    def navigate_steps(self, navigation, commands):
+        '''Process the commands one at a time, recording every step
+
+        See :meth: `navigate`.
+        '''
+        if not isinstance(commands, str):
+            commands = str(commands, "ascii", "replace")
+        location = navigation.location
+        x_min, y_min = location.lower_boundary
+        x_max = location.x_max
+        y_max = location.y_max
+        occupancy = navigation.occupancy
+        coverage = navigation.coverage
+        visit = coverage.visit if coverage is not None else None
+        x = location.x
+        y = location.y
+        heading = location.heading
+        left = cardinal.LEFT
+        right = cardinal.RIGHT
+        step_x = cardinal.DX
+        step_y = cardinal.DY
+        append_x = self.x.append
+        append_y = self.y.append
+        append_heading = self.heading.append
+        append_rejected = self.rejected.append
+        rejected = invalid = 0
+
+        for command in commands:
+            was_rejected = 0
+            if command == "M":
+                new_x = x + step_x[heading]
+                new_y = y + step_y[heading]
+                if (x_min <= new_x <= x_max and y_min <= new_y <= y_max
+                        and not (occupancy and occupancy.taken(new_x, new_y))):
+                    x = new_x
+                    y = new_y
+                    if visit:
+                        visit(x, y)
+                else:
+                    was_rejected = 1
+                    rejected += 1
+            elif command == "L":
+                heading = left[heading]
+            elif command == "R":
+                heading = right[heading]
+            else:
+                invalid += 1
+            append_x(x)
+            append_y(y)
+            append_heading(heading)
+            append_rejected(was_rejected)
+
+        self.steps += len(commands)
+        if len(self.x) >= self.flush_size:
+            self.flush()
+        location.x = x
+        location.y = y
+        location.heading = heading
+        if rejected:
+            logger.error("rejected %d moves", rejected)
+        if invalid:
+            logger.error("skipped %d invalid commands", invalid)
+        return rejected, invalid
+
+    def navigate(self, navigation, commands):
+        '''Process all commands, recording every step
+
+        :param navigation: The navigation system we want to move
+        :type navigation: :class: `navigation.Navigation`
+        :param commands: A series of commands (L, R, M)
+        :type commands: str or bytes-like
+
+        :returns: How many moves were rejected and how many commands were
+            invalid
+        :rtype: tuple
+        '''
+        if len(commands) <= self.step_limit:
+            return self.navigate_steps(navigation, commands)
+
+        if isinstance(commands, str):
+            runs, valid = runlength.RUNS, ("L", "R")
+        else:
+            runs, valid = runlength.BYTES_RUNS, (b"L", b"R")
+        location = navigation.location
+        lower_boundary = location.lower_boundary
+        boundaries = location.boundaries
+        occupancy = navigation.occupancy
+        coverage = navigation.coverage
+        position = location.position
+        heading = location.heading
+        rejected = invalid = 0
+
+        for run in runs.finditer(commands):
+            start, end = run.span()
+            if run.lastindex:
+                moves = end - start
+                new_position = runlength.advance(
+                    position, heading, moves, lower_boundary, boundaries)
+                if occupancy and new_position != position:
+                    new_position = runlength.stop_before_taken(
+                        position, new_position, heading, occupancy)
+                reach = abs(new_position[0] - position[0]) \
+                    + abs(new_position[1] - position[1])
+                self.record_straight(*position, heading, moves, reach)
+                rejected += moves - reach
+                if coverage is not None and reach:
+                    coverage.visit_run(*position, heading, reach)
+                position = new_position
+                continue
+
+            text = run.group()
+            heading = self.record_turns(*position, heading, text)
+            invalid += len(text) - text.count(valid[0]) \
+                - text.count(valid[1])
+
+        location.position = position
+        location.heading = heading
+        if rejected:
+            logger.error("rejected %d moves", rejected)
+        if invalid:
+            logger.error("skipped %d invalid commands", invalid)
+        return rejected, invalid
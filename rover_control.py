@@ -5,13 +5,27 @@ Usage:
     ./rover_control.py
 '''
 import argparse
+import collections
+import concurrent.futures
+import itertools
 import logging
 import logging.config
 import logging.handlers
+import mmap
 import pathlib
 import sys
 
-import rover.control as controller
+from rover import checkpoint as checkpoints
+from rover import cli
+from rover import control as controller
+from rover import log_handlers
+from rover import maneuvers
+from rover import metrics
+from rover import sinks
+from rover import trajectory
+
+# what str.strip() removes from a line, for ASCII input
+WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
 
 
 def get_next_line(filename):
@@ -22,49 +36,344 @@ def get_next_line(filename):
 
     :yields: each line of the file
     '''
-    with open(filename, "r") as cmd_file:
+    with open(filename, "r", encoding="utf-8") as cmd_file:
         yield from cmd_file
 
 
-def process_from_file(filename):
-    '''Process commands from a file'''
+def read_line_chunks(cmd_file, read_size):
+    '''Reads a file one line at a time, in chunks of at most read_size
+
+    Each line is yielded as an iterator of its chunks, so a line never needs
+    to be in memory all at once. Whatever is left of a line when the next one
+    is requested is skipped.
+
+    :param cmd_file: The file object we want to read
+    :type cmd_file: file
+    :param read_size: The maximum size of each chunk
+    :type read_size: int
+
+    :yields: an iterator of the chunks of each line
+    '''
+    def line_chunks(chunk):
+        while True:
+            yield chunk
+            if chunk.endswith("\n"):
+                return
+            chunk = cmd_file.readline(read_size)
+            if not chunk:
+                return
+
+    while True:
+        chunk = cmd_file.readline(read_size)
+        if not chunk:
+            return
+        line = line_chunks(chunk)
+        yield line
+        for _ in line:
+            pass
+
+
+def get_next_line_chunks(filename, read_size):
+    '''Opens a file in read mode and yield all lines in chunks
+
+    :param filename: The name of the file
+    :type filename: str
+    :param read_size: The maximum size of each chunk
+    :type read_size: int
+
+    :yields: an iterator of the chunks of each line, see
+        :func: `read_line_chunks`
+    '''
+    with open(filename, "r", encoding="utf-8") as cmd_file:
+        yield from read_line_chunks(cmd_file, read_size)
+
+
+def get_next_line_mmap(filename):
+    '''Maps a file into memory and yield all lines, one at a time.
+
+    The lines are not copied nor decoded, each one is a memoryview of the
+    mapped file, already stripped. A line is only valid until the next one is
+    requested.
+
+    :param filename: The name of the file
+    :type filename: str
+
+    :yields: a memoryview of each line of the file
+    '''
+    with open(filename, "rb") as cmd_file:
+        # an empty file can't be mapped
+        if not pathlib.Path(filename).stat().st_size:
+            return
+        with mmap.mmap(cmd_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield from _split_lines(mapped, view)
+            finally:
+                # the map can only be closed once all views are released
+                view.release()
+
+
+def _split_lines(mapped, view):
+    '''Yields a stripped view of each line of a mapped file'''
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.find(b"\n", start)
+        if end == -1:
+            end = size
+        first, last = start, end
+        while first < last and mapped[first] in WHITESPACE:
+            first += 1
+        while last > first and mapped[last - 1] in WHITESPACE:
+            last -= 1
+        with view[first:last] as line:
+            yield line
+        start = end + 1
+
+
+def process_with_checkpoints(rover_control, filename, checkpoint,
+                             resume=False):
+    '''Process the lines of a file as bytes, saving checkpoints
+
+    A checkpoint is saved every ``checkpoint.every`` lines and once the file
+    is done, with the offset of the next line, so processing can resume
+    there.
+
+    :param rover_control: The controller
+    :type rover_control: :class: `rover.control.Control`
+    :param filename: The name of the file
+    :type filename: str
+    :param checkpoint: Where the checkpoints are saved
+    :type checkpoint: :class: `rover.checkpoint.Checkpoint`
+    :param resume: Continue from the last checkpoint
+    :type resume: bool
+    '''
+    offset = checkpoint.open(rover_control, resume)
+    try:
+        with open(filename, "rb") as cmd_file:
+            cmd_file.seek(offset)
+            pending = checkpoint.every
+            for line in cmd_file:
+                rover_control.process(line.strip())
+                offset += len(line)
+                pending -= 1
+                if not pending:
+                    checkpoint.save(rover_control, offset)
+                    pending = checkpoint.every
+        checkpoint.save(rover_control, offset)
+    finally:
+        checkpoint.close()
+
+
+def process_from_file(filename, engine="step", *, read_size=None,
+                      use_mmap=False, avoid_collisions=False, sink=None,
+                      maneuver_cache=None, recorder=None, checkpoint=None,
+                      resume=False, run_metrics=None, track_coverage=False,
+                      obstacles=None):
+    '''Process commands from a file
+
+    The options after the engine are keyword-only.
+
+    :param filename: The name of the file
+    :type filename: str
+    :param engine: The engine the rover uses to navigate
+    :type engine: str
+    :param read_size: If set, read the lines in chunks of this size instead
+        of one whole line at a time
+    :type read_size: int
+    :param use_mmap: Map the file into memory and process the lines as bytes
+    :type use_mmap: bool
+    :param avoid_collisions: Don't let rovers move into each other
+    :type avoid_collisions: bool
+    :param sink: Where the final coordinates go, printed by default
+    :type sink: :class: `rover.sinks.Sink`
+    :param maneuver_cache: Cache of the maneuvers the rovers run
+    :type maneuver_cache: :class: `rover.maneuvers.ManeuverCache`
+    :param recorder: Records every step of the rovers
+    :type recorder: :class: `rover.trajectory.TrajectoryRecorder`
+    :param checkpoint: If set, save checkpoints while processing
+    :type checkpoint: :class: `rover.checkpoint.Checkpoint`
+    :param resume: Continue from the last checkpoint
+    :type resume: bool
+    :param run_metrics: Counts and times the lines and the navigations
+    :type run_metrics: :class: `rover.metrics.Metrics`
+    :param track_coverage: Keep a map of the cells visited by the rovers
+    :type track_coverage: bool
+    :param obstacles: Path of the map of the cells the rovers can't move into
+    :type obstacles: str
+
+    :returns: The controller, e.g. to get its coverage map, or None if the
+        file was not found
+    :rtype: :class: `rover.control.Control`
+    '''
     file = pathlib.Path(filename)
     if not file.is_file():
         logger = logging.getLogger("process_from_file")
         logger.warning("File %s not found, please check the path", filename)
-        return
+        return None
+
+    rover_control = controller.Control(
+        engine, avoid_collisions, sink, maneuvers=maneuver_cache,
+        recorder=recorder, metrics=run_metrics,
+        track_coverage=track_coverage, obstacles=obstacles)
+    if checkpoint is not None:
+        process_with_checkpoints(rover_control, filename, checkpoint, resume)
+    elif use_mmap:
+        for line in get_next_line_mmap(filename):
+            rover_control.process(line)
+    elif read_size:
+        for line in get_next_line_chunks(filename, read_size):
+            rover_control.process_chunks(line)
+    else:
+        for line in get_next_line(filename):
+            rover_control.process(line.strip())
+    return rover_control
+
+
+def get_rover_blocks(filename):
+    '''Split the file into independent rover blocks
+
+    Once the plateau boundary is set, each rover only depends on its initial
+    coordinates and commands. The file is split following the same sequence
+    as :meth:`rover.control.Control.process`, so invalid lines are skipped the
+    same way, but the commands are not processed.
 
+    :param filename: The name of the file
+    :type filename: str
+
+    :yields: a tuple (boundary, coordinates, commands) for each rover
+    '''
     rover_control = controller.Control()
+    boundary = coordinates = None
     for line in get_next_line(filename):
-        rover_control.process(line.strip())
+        cmd = line.strip()
+        state = rover_control.state
+        if state == controller.State.WAIT_CMDS:
+            yield boundary, coordinates, cmd
+            rover_control.state = controller.State.WAIT_COORDINATES
+            continue
+
+        rover_control.process(cmd)
+        if rover_control.state == state:
+            continue
+        if state == controller.State.WAIT_BOUNDARY:
+            boundary = cmd
+        else:
+            coordinates = cmd
+
+
+def process_blocks(blocks, engine="step"):
+    '''Process a chunk of rover blocks
+
+    :param blocks: The rover blocks, see :func: `get_rover_blocks`
+    :type blocks: list
+    :param engine: The engine the rover uses to navigate
+    :type engine: str
+
+    :returns: The final coordinates of each rover
+    :rtype: list
+    '''
+    rover_control = controller.Control(engine)
+    results = []
+    for boundary, coordinates, cmds in blocks:
+        rover_control.process_boundary(boundary)
+        rover_control.process_coordinates(coordinates)
+        results.append(rover_control.process_cmds(cmds))
+    return results
+
+
+def process_from_file_parallel(filename, workers, engine="step",
+                               chunk_size=1000, sink=None):
+    '''Process commands from a file, running the rovers in parallel
+
+    The rovers are sent in chunks to a pool of processes and the results are
+    sent to the sink in the same order as the input, so the output is the
+    same as :func: `process_from_file`. Only a few chunks are in flight at
+    any time to keep memory bounded on big files.
+
+    :param filename: The name of the file
+    :type filename: str
+    :param workers: How many processes to use
+    :type workers: int
+    :param engine: The engine the rover uses to navigate
+    :type engine: str
+    :param chunk_size: How many rovers are sent to a process at once
+    :type chunk_size: int
+    :param sink: Where the final coordinates go, printed by default
+    :type sink: :class: `rover.sinks.Sink`
+    '''
+    file = pathlib.Path(filename)
+    if not file.is_file():
+        logger = logging.getLogger("process_from_file")
+        logger.warning("File %s not found, please check the path", filename)
+        return
+
+    if sink is None:
+        sink = sinks.CallbackSink()
+    blocks = get_rover_blocks(filename)
+    pending = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        while True:
+            chunk = list(itertools.islice(blocks, chunk_size))
+            if chunk:
+                pending.append(
+                    executor.submit(process_blocks, chunk, engine))
+            # keep all processes busy, but don't read the whole file ahead
+            while pending and (not chunk or len(pending) >= 2 * workers):
+                for final_coordinates in pending.popleft().result():
+                    sink.write(final_coordinates)
+            if not chunk:
+                break
+
+
+def write_coverage(coverage, path):
+    '''Write the coverage map to a file
+
+    :param coverage: The map, None if the plateau was never set
+    :type coverage: :class: `rover.coverage.Coverage`
+    :param path: The file, an image if it ends with .pbm, otherwise the
+        list of covered cells
+    :type path: str
+    '''
+    logger = logging.getLogger("rover_control")
+    if coverage is None:
+        logger.warning("no plateau, no coverage to write")
+        return
+    logger.info("coverage: %d of %d cells", len(coverage),
+                coverage.width * coverage.height)
+    if path.endswith(".pbm"):
+        with open(path, "wb") as image:
+            coverage.write_pbm(image)
+        return
+    with open(path, "w", encoding="utf-8") as cells:
+        coverage.write_cells(cells)
 
 
 def main():
     '''Parse arguments and control rover'''
     argv = sys.argv[1:]
     parser = argparse.ArgumentParser(prog=__file__)
-    logging_name_map = {
-        'critical': logging.CRITICAL,
-        'error': logging.ERROR,
-        'warn': logging.WARN,
-        'info': logging.INFO,
-        'debug': logging.DEBUG,
-    }
-    logging_names = logging_name_map.keys()
 
     parser.set_defaults(
-        log_level="warn",
         log_file="/tmp/rover.log",
-        cmd_file="cmds_exemple.txt"
-    )
-    parser.add_argument(
-        "--log-level",
-        type=str,
-        choices=sorted(logging_names),
-        help=("Level to log at. "
-              "One of: %(choices)s."
-              "Default: %(default)s")
+        cmd_file="cmds_exemple.txt",
+        workers=1,
+        chunk_size=1000,
+        read_size=None,
+        use_mmap=False,
+        trajectory=None,
+        async_log=False,
+        output=None,
+        checkpoint=None,
+        checkpoint_every=10000,
+        resume=False,
+        metrics=None,
+        metrics_format="json",
+        coverage=None,
+        obstacles=None
     )
+    cli.add_log_level(parser)
 
     parser.add_argument(
         "--log-file",
@@ -81,13 +390,150 @@ def main():
         help=("File with commands to process"
               "Default: %(default)s")
     )
+    cli.add_engine(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help=("Process the rovers in parallel using N processes. "
+              "Default: %(default)s")
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="N",
+        help=("How many rovers are sent to a process at once. "
+              "Default: %(default)s")
+    )
+    parser.add_argument(
+        "--read-size",
+        type=int,
+        metavar="N",
+        help=("Stream each line in chunks of N chars, so long command lines "
+              "use constant memory. Default: read whole lines")
+    )
+    parser.add_argument(
+        "--mmap",
+        dest="use_mmap",
+        action="store_true",
+        help=("Map the file into memory and process the lines as bytes, "
+              "without decoding them. Best used with --engine runlength")
+    )
+    cli.add_fleet_options(parser)
+    parser.add_argument(
+        "--trajectory",
+        metavar="DIR",
+        help=("Record the location of the rovers after every command in DIR, "
+              "one .npy file per column")
+    )
+    parser.add_argument(
+        "--async-log",
+        action="store_true",
+        help=("Handle the logs in a background thread and write the log file "
+              "in batches. Recommended for info and debug levels")
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help=("File to write the final coordinates to. "
+              "Default: standard output")
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help=("Save the state of the controller to FILE while processing, "
+              "see --resume")
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        metavar="N",
+        help=("Lines to process between checkpoints. "
+              "Default: %(default)s")
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=("Continue from the last --checkpoint, e.g. after a crash, "
+              "with the same arguments. The --output file is cut back to "
+              "the checkpoint, standard output may repeat some results")
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help=("Count the commands by type, the rejected moves and the "
+              "invalid commands, time each phase and write it all to FILE. "
+              "With --resume, only the lines after the checkpoint count")
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=metrics.FORMATS,
+        help=("Format of the --metrics file. "
+              "One of: %(choices)s. "
+              "Default: %(default)s")
+    )
+    parser.add_argument(
+        "--coverage",
+        metavar="FILE",
+        help=("Map the cells visited by the rovers and write the covered "
+              "ones to FILE, one \"x y\" line each, or as an image if FILE "
+              "ends with .pbm")
+    )
+    parser.add_argument(
+        "--obstacles",
+        metavar="FILE",
+        help=("Map of the cells the rovers can't move into, one \"x y\" "
+              "cell or \"x0 y0 x1 y1\" rectangle per line, or in the binary "
+              "form written by rover_obstacles.py")
+    )
     options = parser.parse_args(argv)
+    if options.workers < 1:
+        parser.error("--workers must be at least 1")
+    if options.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if options.read_size is not None and options.read_size < 1:
+        parser.error("--read-size must be at least 1")
+    if options.read_size and options.workers > 1:
+        parser.error("--read-size can't be used with --workers")
+    if options.use_mmap and (options.read_size or options.workers > 1):
+        parser.error("--mmap can't be used with --read-size or --workers")
+    if options.async_log and options.workers > 1:
+        parser.error("--async-log can't be used with --workers")
+    if options.maneuver_cache < 0:
+        parser.error("--maneuver-cache must not be negative")
+    if options.maneuver_cache and options.workers > 1:
+        parser.error("--maneuver-cache can't be used with --workers")
+    if options.trajectory and options.workers > 1:
+        parser.error("--trajectory can't be used with --workers")
+    if options.avoid_collisions and options.workers > 1:
+        parser.error("--avoid-collisions can't be used with --workers, "
+                     "the rovers are not independent")
+    if options.metrics and options.workers > 1:
+        parser.error("--metrics can't be used with --workers")
+    if options.coverage and options.workers > 1:
+        parser.error("--coverage can't be used with --workers")
+    if options.obstacles and options.workers > 1:
+        parser.error("--obstacles can't be used with --workers")
+    if options.resume and not options.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if options.checkpoint_every < 1:
+        parser.error("--checkpoint-every must be at least 1")
+    if options.checkpoint and (options.workers > 1 or options.read_size
+                               or options.use_mmap or options.trajectory):
+        parser.error("--checkpoint can't be used with --workers, "
+                     "--read-size, --mmap or --trajectory")
 
     log_file = options.log_file
+    file_handler = "logging.handlers.RotatingFileHandler"
+    stream_handler = "logging.StreamHandler"
+    if options.async_log:
+        file_handler = "rover.log_handlers.BatchingRotatingFileHandler"
+        stream_handler = "rover.log_handlers.BatchingStreamHandler"
 
     logging.config.dictConfig({
         "version": 1,
-        "disable_existing_logs": False,
+        "disable_existing_loggers": False,
         "formatters": {
             "standard": {
                 "format":
@@ -95,18 +541,17 @@ def main():
                 "datefmt": "%Y-%m-%d %H:%M:%S"
             },
             "terminal": {
-                "format":
-                "[%(levelname)7.7s] %(name)s: %(message)s",
+                "format": cli.TERMINAL_FORMAT,
             },
         },
         "handlers": {
             "stream": {
-                "class": "logging.StreamHandler",
+                "class": stream_handler,
                 "level": "DEBUG",
                 "formatter": "terminal"
             },
             "file": {
-                "class": "logging.handlers.RotatingFileHandler",
+                "class": file_handler,
                 "filename": log_file,
                 "level": "INFO",
                 "formatter": "standard",
@@ -118,15 +563,77 @@ def main():
         "loggers": {
             "": {
                 "handlers": ["file", "stream"],
-                "level": logging_name_map[options.log_level]
+                "level": cli.LOG_LEVELS[options.log_level]
             }
         }
 
     })
 
-    mainlog = logging.getLogger("rover_control")
-    mainlog.info("start rover!")
-    process_from_file(options.cmd_file)
+    listener = None
+    if options.async_log:
+        # the log formats only use the logger name, level and time, so don't
+        # collect anything else for each record (see the logging HOWTO)
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        logging._srcfile = None  # pylint:disable=protected-access
+        listener = log_handlers.queue_handlers()
+    run_metrics = None
+    if options.metrics:
+        run_metrics = metrics.Metrics()
+        run_metrics.time_handlers(logging.getLogger().handlers)
+
+    # when resuming, the checkpoint says how much of the output to keep
+    output = None
+    if options.output is not None:
+        output = open(options.output, "a" if options.resume else "w",
+                      encoding="utf-8")
+    # the results are written in batches, not printed one by one
+    sink = sinks.BufferedSink(output)
+    maneuver_cache = None
+    if options.maneuver_cache:
+        maneuver_cache = maneuvers.ManeuverCache(options.maneuver_cache)
+    recorder = None
+    if options.trajectory:
+        recorder = trajectory.TrajectoryRecorder(options.trajectory)
+    checkpoint = None
+    if options.checkpoint:
+        checkpoint = checkpoints.Checkpoint(
+            options.checkpoint, options.checkpoint_every)
+    try:
+        mainlog = logging.getLogger("rover_control")
+        mainlog.info("start rover!")
+        if options.workers > 1:
+            process_from_file_parallel(
+                options.cmd_file, options.workers, options.engine,
+                options.chunk_size, sink)
+        else:
+            rover_control = process_from_file(
+                options.cmd_file, options.engine,
+                read_size=options.read_size, use_mmap=options.use_mmap,
+                avoid_collisions=options.avoid_collisions, sink=sink,
+                maneuver_cache=maneuver_cache, recorder=recorder,
+                checkpoint=checkpoint, resume=options.resume,
+                run_metrics=run_metrics,
+                track_coverage=bool(options.coverage),
+                obstacles=options.obstacles)
+            if options.coverage and rover_control is not None:
+                write_coverage(rover_control.coverage, options.coverage)
+        if maneuver_cache is not None:
+            mainlog.info("maneuver cache: %s", maneuver_cache.info())
+    finally:
+        sink.close()
+        if recorder is not None:
+            recorder.close()
+        if output is not None:
+            output.close()
+        if listener is not None:
+            # write every record still in the queue
+            listener.stop()
+        if run_metrics is not None:
+            with open(options.metrics, "w",
+                      encoding="utf-8") as metrics_file:
+                run_metrics.dump(metrics_file, options.metrics_format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+'''Compile an obstacle map to its binary form
+
+Parsing a text map with millions of obstacles takes seconds each time
+rover_control.py starts. The binary form is the bitmap of the blocked cells
+of one plateau, memory-mapped when loaded, so it is ready at once.
+
+Usage:
+    ./rover_obstacles.py MAP OUTPUT --plateau X Y
+'''
+import argparse
+import sys
+
+from rover import cli
+from rover import exceptions
+from rover import obstacles
+
+
+def main():
+    '''Parse arguments and compile the map'''
+    parser = argparse.ArgumentParser(prog=__file__)
+    parser.add_argument(
+        "map",
+        metavar="MAP",
+        help="Text map, one \"x y\" cell or \"x0 y0 x1 y1\" rectangle per line"
+    )
+    parser.add_argument(
+        "output",
+        metavar="OUTPUT",
+        help="Where to write the binary form"
+    )
+    cli.add_plateau(parser, "Upper limits of the plateau the map is for")
+    options = parser.parse_args(sys.argv[1:])
+    boundaries = cli.plateau(parser, options)
+
+    try:
+        obstacle_map = obstacles.load(options.map, boundaries)
+        obstacle_map.save(options.output)
+    except (OSError, ValueError, exceptions.InvalidObstacles) as err:
+        parser.error(str(err))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+'''Route a fleet of rovers through survey targets
+
+Splits the targets among the rovers and writes a command file with the
+commands that drive each rover through its targets, around the obstacles,
+ready to run with rover_control.py:
+
+    ./rover_routes.py --plateau 999 999 --rovers rovers.txt \\
+        --targets targets.txt -o mission.txt
+    ./rover_control.py -f mission.txt
+
+The rovers file has the position and heading of a rover per line, e.g.
+"1 2 N", and the targets file a "x y" position per line.
+
+Each rover is routed as if the other ones weren't on the plateau, so run
+the mission without --avoid-collisions: a rover parked at the end of its
+route could block the rovers after it.
+
+Usage:
+    ./rover_routes.py --plateau X Y --rovers FILE --targets FILE
+        [--obstacles FILE] [--workers N] [--weight W] [-o FILE]
+'''
+import argparse
+import sys
+
+from rover import cli
+from rover import exceptions
+from rover import parser as rover_parser
+from rover import routes
+
+
+def read_cells(filename, parse):
+    '''Read a cell per line, skipping blank lines
+
+    :param filename: The name of the file
+    :type filename: str
+    :param parse: Parses a line, see :mod: `rover.parser`
+    :type parse: callable
+
+    :returns: The parsed cells
+    :rtype: list
+
+    :raises: ValueError on a malformed line
+    '''
+    cells = []
+    with open(filename, "r", encoding="utf-8") as cells_file:
+        for number, line in enumerate(cells_file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            code, *cell = parse(line)
+            if code != rover_parser.OK:
+                raise ValueError(f"{filename}:{number}: malformed line")
+            cells.append(tuple(cell))
+    return cells
+
+
+def main():
+    '''Parse arguments and write the routes'''
+    parser = argparse.ArgumentParser(prog=__file__)
+    cli.add_log_level(parser)
+    cli.add_plateau(parser)
+    parser.add_argument(
+        "--rovers",
+        required=True,
+        metavar="FILE",
+        help="Position and heading of each rover, e.g. \"1 2 N\""
+    )
+    parser.add_argument(
+        "--targets",
+        required=True,
+        metavar="FILE",
+        help="Position of each target, e.g. \"3 4\""
+    )
+    parser.add_argument(
+        "--obstacles",
+        metavar="FILE",
+        help="Map of the cells the rovers can't move into"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help=("Order and plan the routes using N processes. "
+              "Default: %(default)s")
+    )
+    parser.add_argument(
+        "--weight",
+        type=float,
+        default=1,
+        metavar="W",
+        help=("Weight of the planner's heuristic, above 1 plans faster but "
+              "up to W times longer. Default: %(default)s")
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help=("Write the command file to FILE, to run without "
+              "--avoid-collisions since each rover is routed as if it were "
+              "alone. Default: standard output")
+    )
+    options = parser.parse_args(sys.argv[1:])
+    boundaries = cli.plateau(parser, options)
+    if options.workers < 1:
+        parser.error("--workers must be at least 1")
+    if options.weight < 1:
+        parser.error("--weight must be at least 1")
+
+    cli.log_to_terminal(options.log_level)
+    try:
+        starts = read_cells(options.rovers, rover_parser.parse_coordinates)
+        targets = read_cells(options.targets, rover_parser.parse_boundary)
+        fleet_routes = routes.optimize(
+            boundaries, starts, targets, options.obstacles, options.workers,
+            options.weight)
+    except (OSError, ValueError, exceptions.InvalidObstacles) as err:
+        parser.error(str(err))
+
+    if options.output is None:
+        routes.write_mission(sys.stdout, boundaries, fleet_routes)
+        return
+    with open(options.output, "w", encoding="utf-8") as output:
+        routes.write_mission(output, boundaries, fleet_routes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+'''Serve the Mars Rover controller over a socket
+
+Each connection is an independent controller: send the boundary, then the
+coordinates and commands of each rover, one per line, like the files of
+rover_control.py, and read the final coordinates back, one line per rover.
+
+Usage:
+    ./rover_server.py [--host HOST] [--port N | --unix PATH]
+'''
+import argparse
+import asyncio
+import sys
+
+from rover import cli
+from rover import maneuvers
+from rover import server
+
+
+def main():
+    '''Parse arguments and serve'''
+    parser = argparse.ArgumentParser(prog=__file__)
+    cli.add_log_level(parser)
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to listen on. Default: %(default)s"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=7878,
+        help="TCP port to listen on. Default: %(default)s"
+    )
+    parser.add_argument(
+        "--unix",
+        metavar="PATH",
+        help="Listen on a Unix socket at PATH instead of a TCP port"
+    )
+    cli.add_engine(parser)
+    parser.add_argument(
+        "--read-size",
+        type=int,
+        default=server.READ_SIZE,
+        metavar="N",
+        help=("Read N bytes of a connection at a time before letting the "
+              "others run. Default: %(default)s")
+    )
+    cli.add_fleet_options(parser, ", shared by all connections")
+    options = parser.parse_args(sys.argv[1:])
+    if options.read_size < 1:
+        parser.error("--read-size must be at least 1")
+    if options.maneuver_cache < 0:
+        parser.error("--maneuver-cache must not be negative")
+
+    cli.log_to_terminal(options.log_level)
+    maneuver_cache = None
+    if options.maneuver_cache:
+        maneuver_cache = maneuvers.ManeuverCache(options.maneuver_cache)
+
+    try:
+        asyncio.run(server.serve(
+            options.host, options.port, options.unix, engine=options.engine,
+            avoid_collisions=options.avoid_collisions,
+            maneuvers=maneuver_cache, read_size=options.read_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
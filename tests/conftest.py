@@ -0,0 +1,56 @@
+'''Fixtures shared by the tests'''
+import pytest
+
+import rover.grid as grid
+import rover.rover
+
+
+@pytest.fixture
+def new_rover():
+    """Helper that instantiates Rovers ready to navigate"""
+    def factory(boundaries, initial_coord, engine="step", taken=None,
+                cache=None):
+        new = rover.rover.Rover(engine)
+        new.set_boundaries(*boundaries)
+        new.set_inital_position(*initial_coord)
+        new.set_occupancy(taken)
+        new.set_maneuver_cache(cache)
+        return new
+    return factory
+
+
+@pytest.fixture(params=["bitmap", "set"])
+def storage(request, monkeypatch):
+    """Run the test with the bitmaps and with the hash sets of the grids
+
+    Every :class: `rover.grid.CellGrid` uses a hash set with "set". A test
+    can switch only some classes instead with an indirect ``(storage,
+    classes)`` param.
+    """
+    kind, classes = request.param, (grid.CellGrid,)
+    if isinstance(kind, tuple):
+        kind, classes = kind
+    if kind == "set":
+        for cls in classes:
+            monkeypatch.setattr(cls, "max_bitmap_cells", 0)
+    return kind
+
+
+@pytest.fixture
+def walk():
+    """Helper that runs commands one step at a time, the reference for the
+    engines"""
+    def steps(boundaries, start, cmds, blocked=()):
+        x_max, y_max = boundaries
+        x, y, heading = start
+        for cmd in cmds:
+            if cmd == "M":
+                new_x = x + (0, 1, 0, -1)[heading]
+                new_y = y + (1, 0, -1, 0)[heading]
+                if 0 <= new_x <= x_max and 0 <= new_y <= y_max \
+                        and (new_x, new_y) not in blocked:
+                    x, y = new_x, new_y
+            elif cmd in "LR":
+                heading = (heading + (1 if cmd == "R" else -1)) % 4
+            yield x, y, heading
+    return steps
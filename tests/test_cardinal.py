@@ -81,3 +81,14 @@ def test_base_class_expection():
     """
     with pytest.raises(TypeError):
         cardinal.CardinalPoints()
+
+
+@pytest.mark.parametrize("heading", range(4))
+def test_heading_tables(heading):
+    """The heading tables agree with the cardinal point classes"""
+    point = cardinal.POINTS[heading]
+    assert cardinal.HEADINGS[point.short_name] == heading
+    assert cardinal.SHORT_NAMES[heading] == point.short_name
+    assert point.move((0, 0)) == (cardinal.DX[heading], cardinal.DY[heading])
+    assert cardinal.LEFT[cardinal.RIGHT[heading]] == heading
+    assert cardinal.RIGHT[heading] == (heading + 1) % 4
@@ -0,0 +1,162 @@
+# pylint:disable=redefined-outer-name
+'''Test the controller checkpoints'''
+import random
+
+import pytest
+
+import rover.checkpoint as checkpoints
+import rover.control
+import rover.exceptions as exp
+import rover.sinks as sinks
+import rover_control
+
+
+class CrashingSink(sinks.BufferedSink):
+    """Sink that crashes after some results, like a killed process"""
+    def __init__(self, stream, crash_after):
+        super().__init__(stream, flush_size=16)
+        self.crash_after = crash_after
+
+    def write(self, result):
+        if not self.crash_after:
+            raise RuntimeError("crash")
+        self.crash_after -= 1
+        super().write(result)
+
+
+@pytest.fixture
+def cmd_file(tmp_path):
+    """Helper that writes a file with valid and invalid lines"""
+    rand = random.Random(1)
+    lines = ["MMM", "9 9"]
+    for _ in range(60):
+        lines.append(rand.choice([
+            f"{rand.randint(0, 9)} {rand.randint(0, 9)} {rand.choice('NESW')}",
+            "1 1",
+        ]))
+        lines.append("".join(
+            rand.choice("LRMMX") for _ in range(rand.randint(0, 30))))
+    path = tmp_path / "cmds.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def process(cmd_file, path, avoid_collisions, sink, every=1, *, resume=False,
+            track_coverage=False):
+    """Processes the file with checkpoints"""
+    return rover_control.process_from_file(
+        cmd_file, avoid_collisions=avoid_collisions, sink=sink,
+        checkpoint=checkpoints.Checkpoint(path, every), resume=resume,
+        track_coverage=track_coverage)
+
+
+@pytest.mark.parametrize("avoid_collisions", [False, True])
+@pytest.mark.parametrize("every,crash_after", [
+    (1, 0),
+    (1, 10),
+    (7, 10),
+    (1000, 10),
+])
+def test_resume(cmd_file, tmp_path, avoid_collisions, every, crash_after):
+    """Resuming after a crash writes exactly what a single run does"""
+    expected = sinks.ListSink()
+    rover_control.process_from_file(
+        cmd_file, avoid_collisions=avoid_collisions, sink=expected)
+
+    path = str(tmp_path / "checkpoint")
+    output = tmp_path / "out.txt"
+    with open(output, "w", encoding="utf-8") as stream:
+        with pytest.raises(RuntimeError):
+            process(cmd_file, path, avoid_collisions,
+                    CrashingSink(stream, crash_after), every)
+    with open(output, "a", encoding="utf-8") as stream:
+        sink = sinks.BufferedSink(stream)
+        process(cmd_file, path, avoid_collisions, sink, every, resume=True)
+        sink.close()
+    assert output.read_text() == "".join(
+        f"{result}\n" for result in expected.results)
+
+    # everything was done already
+    with open(output, "a", encoding="utf-8") as stream:
+        sink = sinks.BufferedSink(stream)
+        process(cmd_file, path, avoid_collisions, sink, every, resume=True)
+        sink.close()
+    assert output.read_text().count("\n") == len(expected.results)
+
+
+@pytest.mark.usefixtures("storage")
+@pytest.mark.parametrize("crash_after", [0, 1, 10])
+def test_resume_coverage(cmd_file, tmp_path, crash_after):
+    """The cells covered before the crash are still in the map"""
+    expected = rover_control.process_from_file(
+        cmd_file, sink=sinks.ListSink(), track_coverage=True)
+
+    path = str(tmp_path / "checkpoint")
+    with pytest.raises(RuntimeError):
+        process(cmd_file, path, False, CrashingSink(None, crash_after),
+                track_coverage=True)
+    resumed = process(cmd_file, path, False, sinks.ListSink(), resume=True,
+                      track_coverage=True)
+    assert list(resumed.coverage.covered()) == list(
+        expected.coverage.covered())
+
+    # a checkpoint without the map can't be resumed tracking coverage
+    process(cmd_file, path, False, sinks.ListSink())
+    with pytest.raises(exp.CheckpointError, match="coverage"):
+        process(cmd_file, path, False, sinks.ListSink(), resume=True,
+                track_coverage=True)
+
+
+def test_resume_without_checkpoint(cmd_file, tmp_path):
+    """Without a checkpoint, resuming starts from the beginning"""
+    expected = sinks.ListSink()
+    rover_control.process_from_file(cmd_file, sink=expected)
+    sink = sinks.ListSink()
+    process(cmd_file, str(tmp_path / "checkpoint"), False, sink, resume=True)
+    assert sink.results == expected.results
+
+
+def test_restore_state(tmp_path):
+    """The controller goes back to the state and rover it had"""
+    path = str(tmp_path / "checkpoint")
+    control = rover.control.Control(avoid_collisions=True)
+    checkpoint = checkpoints.Checkpoint(path)
+    checkpoint.open(control)
+    for cmd in ["5 5", "1 2 N", "M", "3 3 E"]:
+        control.process(cmd)
+    checkpoint.save(control, 42)
+    checkpoint.close()
+
+    restored = rover.control.Control(avoid_collisions=True)
+    checkpoint = checkpoints.Checkpoint(path)
+    assert checkpoint.open(restored, resume=True) == 42
+    checkpoint.close()
+    assert restored.state == rover.control.State.WAIT_CMDS
+    assert restored.boundaries == (5, 5)
+    assert str(restored.mars_hover.navigation.location) == "3 3 E"
+    assert [str(mars_hover.navigation.location)
+            for mars_hover in restored.fleet] == ["1 3 N"]
+    assert restored.occupancy.taken(1, 3)
+
+
+def test_fleet_needs_collisions(tmp_path):
+    """A fleet can only be restored when avoiding collisions"""
+    path = str(tmp_path / "checkpoint")
+    control = rover.control.Control(avoid_collisions=True)
+    checkpoint = checkpoints.Checkpoint(path)
+    checkpoint.open(control)
+    for cmd in ["5 5", "1 2 N", "M"]:
+        control.process(cmd)
+    checkpoint.save(control, 0)
+    checkpoint.close()
+    with pytest.raises(exp.CheckpointError):
+        checkpoints.Checkpoint(path).open(rover.control.Control(), True)
+
+
+@pytest.mark.parametrize("content", [b"", b"ROVERCK1", b"x" * 100])
+def test_bad_checkpoint(tmp_path, content):
+    """A file that isn't a checkpoint is reported"""
+    path = tmp_path / "checkpoint"
+    path.write_bytes(content)
+    with pytest.raises(exp.CheckpointError):
+        checkpoints.Checkpoint(str(path)).load()
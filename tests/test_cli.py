@@ -0,0 +1,41 @@
+# pylint:disable=redefined-outer-name
+'''Test the command line helpers shared by the scripts'''
+import argparse
+import logging
+
+import pytest
+
+from rover import cli
+
+
+@pytest.fixture
+def parser():
+    """Helper that instantiates a parser with the shared arguments"""
+    new = argparse.ArgumentParser()
+    cli.add_log_level(new)
+    cli.add_engine(new)
+    cli.add_fleet_options(new)
+    cli.add_plateau(new)
+    return new
+
+
+def test_defaults(parser):
+    """Every script gets the same defaults"""
+    options = parser.parse_args(["--plateau", "5", "5"])
+    assert cli.LOG_LEVELS[options.log_level] == logging.WARN
+    assert options.engine == "step"
+    assert not options.avoid_collisions
+    assert options.maneuver_cache == 0
+    assert cli.plateau(parser, options) == (5, 5)
+
+
+@pytest.mark.parametrize("argv", [
+    ["--plateau", "5"],
+    ["--plateau", "-1", "5"],
+    ["--plateau", "5", "5", "--log-level", "verbose"],
+    ["--plateau", "5", "5", "--engine", "warp"],
+])
+def test_invalid(parser, argv):
+    """Invalid arguments exit with a usage error"""
+    with pytest.raises(SystemExit):
+        cli.plateau(parser, parser.parse_args(argv))
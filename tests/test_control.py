@@ -1,5 +1,7 @@
 # pylint:disable=redefined-outer-name
 '''Test Control class'''
+import logging
+
 import pytest
 
 import rover.control
@@ -80,3 +82,89 @@ def test_wrong_process_seq(controller, possible_states):
     assert controller.state == possible_states.WAIT_CMDS
     controller.process("LLRMM")
     assert controller.state == possible_states.WAIT_COORDINATES
+
+
+def test_process_chunks(controller, possible_states, capsys):
+    """Check a sequence of commands that arrive in pieces"""
+    controller.process_chunks(["5", " 5\n"])
+    assert controller.state == possible_states.WAIT_COORDINATES
+    controller.process_chunks(["1 " * rover.control.MAX_LINE_LENGTH])
+    assert controller.state == possible_states.WAIT_COORDINATES
+    controller.process_chunks(["1 2", " N\n"])
+    assert controller.state == possible_states.WAIT_CMDS
+    controller.process_chunks(["LMLM", "LMLMM\n"])
+    assert controller.state == possible_states.WAIT_COORDINATES
+    assert capsys.readouterr().out == "1 3 N\n"
+
+
+def test_feed(controller, possible_states, capsys):
+    """Pieces can be pushed as they arrive, the line ends later"""
+    for chunk in [b"5 5", b"1 2 N", b"LMLMLMLMM", b"3 3 E"]:
+        controller.feed(chunk[:2])
+        controller.feed(chunk[2:])
+        controller.end_line()
+    assert controller.state == possible_states.WAIT_CMDS
+    # an empty commands line still reports the location
+    controller.end_line()
+    assert controller.state == possible_states.WAIT_COORDINATES
+    assert capsys.readouterr().out == "1 3 N\n3 3 E\n"
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 100])
+def test_feed_whitespace(controller, caplog, size):
+    """Only the edges of the line are stripped, whatever the pieces"""
+    line = b" \tMM L  M X \r\n"
+    controller.process("5 5")
+    with caplog.at_level(logging.INFO):
+        for _ in range(2):
+            controller.process("1 2 N")
+            for start in range(0, len(line), size):
+                controller.feed(line[start:start + size])
+            controller.end_line()
+        controller.process("1 2 N")
+        controller.process(line.strip())
+    summaries = [record.summary for record in caplog.records
+                 if hasattr(record, "summary")]
+    assert summaries == [{
+        "commands": 9,
+        "rejected": 0,
+        "invalid": 5,
+        "location": "0 4 W",
+    }] * 3
+
+
+def test_feed_too_long(controller, possible_states):
+    """A line too long is skipped until it ends, in any number of pieces"""
+    controller.process("5 5")
+    for _ in range(3):
+        controller.feed("1" * rover.control.MAX_LINE_LENGTH)
+    controller.end_line()
+    assert controller.state == possible_states.WAIT_COORDINATES
+    controller.feed("1 2 N")
+    controller.end_line()
+    assert controller.state == possible_states.WAIT_CMDS
+
+
+@pytest.mark.parametrize("cmd", [b"5 5", memoryview(b"5 5")])
+def test_bytes_process_seq(controller, capsys, cmd):
+    """Commands can also be ASCII bytes-like"""
+    controller.process(cmd)
+    controller.process(memoryview(b"1 2 N"))
+    controller.process(memoryview(b"LMLMLMLMM"))
+    assert capsys.readouterr().out == "1 3 N\n"
+
+
+@pytest.mark.parametrize("engine", ["step", "runlength"])
+def test_avoid_collisions(possible_states, capsys, engine):
+    """Rovers stop before moving into another rover"""
+    controller = rover.control.Control(engine, avoid_collisions=True)
+    for cmd in ["5 5",
+                "1 2 N", "MR",
+                "1 0 N", "MMMM",
+                "1 3 S", "L",
+                "0 3 E", "MMM"]:
+        controller.process(cmd)
+    assert controller.state == possible_states.WAIT_COORDINATES
+    assert capsys.readouterr().out == "1 3 E\n1 2 N\n0 3 E\n"
+    assert len(controller.fleet) == 3
+    assert len(controller.occupancy) == 3
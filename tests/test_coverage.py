@@ -0,0 +1,102 @@
+# pylint:disable=redefined-outer-name
+'''Test the coverage map'''
+import io
+import random
+
+import pytest
+
+import rover.control
+import rover.coverage as coverage
+import rover.maneuvers as maneuvers
+import rover.sinks as sinks
+import rover.trajectory as trajectory
+
+
+@pytest.mark.usefixtures("storage")
+@pytest.mark.parametrize("heading", range(4))
+@pytest.mark.parametrize("moves", [1, 3, 7, 8, 9, 14])
+def test_visit_run(heading, moves):
+    """A straight run marks every cell it goes through"""
+    cover = coverage.Coverage((29, 29))
+    cover.visit_run(14, 14, heading, moves)
+    step = ((0, 1), (1, 0), (0, -1), (-1, 0))[heading]
+    expected = [(14 + step[0] * i, 14 + step[1] * i)
+                for i in range(1, moves + 1)]
+    assert len(cover) == moves
+    assert sorted(cover.covered(), key=lambda c: (c[1], c[0])) == sorted(
+        expected, key=lambda c: (c[1], c[0]))
+    assert (14, 14) not in cover
+
+
+@pytest.mark.usefixtures("storage")
+@pytest.mark.parametrize("engine", rover.control.rover.Rover.engines)
+@pytest.mark.parametrize("extra", [None, "maneuvers", "trajectory"])
+@pytest.mark.parametrize("seed", range(3))
+def test_engines(walk, tmp_path, engine, extra, seed):
+    """Every way of running the commands marks the same cells"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 12), rand.randint(0, 12))
+    cmds = "".join(rand.choice("LRMMMMX")
+                   for _ in range(rand.randint(50, 400)))
+    start = (rand.randint(0, boundaries[0]), rand.randint(0, boundaries[1]),
+             rand.randrange(4))
+
+    options = {}
+    if extra == "maneuvers":
+        options["maneuvers"] = maneuvers.ManeuverCache()
+    elif extra == "trajectory":
+        options["recorder"] = trajectory.TrajectoryRecorder(str(tmp_path))
+    control = rover.control.Control(
+        engine, sink=sinks.ListSink(), track_coverage=True, **options)
+    control.process(f"{boundaries[0]} {boundaries[1]}")
+    control.process(f"{start[0]} {start[1]} {'NESW'[start[2]]}")
+    control.process(cmds)
+    assert set(control.coverage.covered()) == {start[:2]} | {
+        (x, y) for x, y, _ in walk(boundaries, start, cmds)}
+
+
+@pytest.mark.usefixtures("storage")
+def test_fleet_shares_map():
+    """The rovers of a fleet mark the same map"""
+    control = rover.control.Control(
+        avoid_collisions=True, sink=sinks.ListSink(), track_coverage=True)
+    for line in ["5 5", "1 2 N", "LMLMLMLMM", "3 3 E", "MMRMMRMRRM"]:
+        control.process(line)
+    assert len(control.coverage) == 11
+    assert {(1, 3), (5, 1)} <= set(control.coverage.covered())
+
+
+def test_no_coverage():
+    """Coverage is only tracked when asked for"""
+    control = rover.control.Control()
+    control.process("5 5")
+    assert control.coverage is None
+    assert control.mars_hover.navigation.coverage is None
+
+
+def test_write(storage):
+    """The map is written row by row, as cells or as an image"""
+    cover = coverage.Coverage((9, 1))
+    for x, y in [(0, 0), (9, 0), (3, 1)]:
+        cover.visit(x, y)
+    cells = io.StringIO()
+    cover.write_cells(cells)
+    assert cells.getvalue() == "0 0\n9 0\n3 1\n"
+
+    image = io.BytesIO()
+    if storage == "set":
+        with pytest.raises(ValueError):
+            cover.write_pbm(image)
+        return
+    cover.write_pbm(image)
+    assert image.getvalue() == b"P4\n10 2\n" + bytes(
+        [0b00010000, 0, 0b10000000, 0b01000000])
+
+
+def test_huge_plateau():
+    """Huge plateaus don't allocate a bitmap"""
+    cover = coverage.Coverage((10 ** 9, 10 ** 9))
+    assert cover.bitmap is None
+    cover.visit_run(10 ** 9, 0, 3, 5)
+    assert len(cover) == 5
+    assert (10 ** 9 - 5, 0) in cover
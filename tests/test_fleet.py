@@ -0,0 +1,77 @@
+'''Test the fleet simulator'''
+import random
+
+import pytest
+
+import rover.exceptions as exceptions
+import rover.rover
+
+np = pytest.importorskip("numpy")
+fleet = pytest.importorskip("rover.fleet")
+
+
+def navigate(boundaries, start, cmds):
+    """Helper that navigates a single rover"""
+    new_rover = rover.rover.Rover()
+    new_rover.set_boundaries(*boundaries)
+    new_rover.set_inital_position(*start)
+    return new_rover.navigate(cmds)
+
+
+def test_challenge_input():
+    """The fleet simulator gives the challenge's expected output"""
+    final = fleet.simulate_fleet(
+        (5, 5), [(1, 2, "N"), (3, 3, "E")], ["LMLMLMLMM", "MMRMMRMRRM"])
+    assert fleet.format_positions(*final) == ["1 3 N", "5 1 E"]
+
+
+def test_result_arrays():
+    """Final locations are returned as arrays, in the input order"""
+    x, y, heading = fleet.simulate_fleet(
+        (5, 5), [(0, 0, "N"), (5, 5, "S"), (2, 2, "E")], ["", "MMMMMMMM", "L"])
+    assert x.tolist() == [0, 5, 2]
+    assert y.tolist() == [0, 0, 2]
+    assert heading.tolist() == [0, 2, 0]
+
+
+def test_empty_fleet():
+    """No rovers, no work"""
+    assert [len(array) for array in fleet.simulate_fleet((5, 5), [], [])] == \
+        [0, 0, 0]
+
+
+@pytest.mark.parametrize("boundaries,start,exp", [
+    ((-1, 5), (0, 0, "N"), exceptions.InvalidBoundary),
+    ((5, 5), (6, 0, "N"), exceptions.BoundaryError),
+    ((5, 5), (0, 0, "T"), exceptions.InvalidCardinalPoint),
+    ((5, 5), (0, 0, ""), exceptions.InvalidCardinalPoint),
+])
+def test_invalid_fleet(boundaries, start, exp):
+    """Invalid set up is rejected like it is by the Rover"""
+    with pytest.raises(exp):
+        fleet.simulate_fleet(boundaries, [start], ["M"])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_rover(seed, monkeypatch):
+    """Randomized check against Rover.navigate"""
+    # small blocks so the commands span a few of them
+    monkeypatch.setattr(fleet, "BLOCK_SIZE", 16)
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 6), rand.randint(0, 6))
+    starts = []
+    command_strings = []
+    for _ in range(rand.randint(1, 60)):
+        starts.append((
+            rand.randint(0, boundaries[0]),
+            rand.randint(0, boundaries[1]),
+            rand.choice("NESW"),
+        ))
+        command_strings.append("".join(
+            rand.choice("MMMLRX") for _ in range(rand.randint(0, 80))))
+
+    final = fleet.simulate_fleet(boundaries, starts, command_strings)
+    assert fleet.format_positions(*final) == [
+        navigate(boundaries, start, cmds)
+        for start, cmds in zip(starts, command_strings)
+    ]
@@ -0,0 +1,64 @@
+# pylint:disable=redefined-outer-name
+'''Test the cell grid shared by the maps'''
+import random
+
+import pytest
+
+from rover import grid
+
+
+def test_popcount():
+    """The table counts the bits of every byte"""
+    assert [grid.POPCOUNT[byte] for byte in (0, 1, 0x80, 0x55, 0xff)] == [
+        0, 1, 1, 4, 8]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_set(storage, seed):
+    """Setting and clearing cells, one at a time or in runs"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 20), rand.randint(0, 20))
+    cells = grid.CellGrid(boundaries)
+    assert (cells.bitmap is None) == (storage == "set")
+    expect = set()
+    for _ in range(50):
+        x = rand.randint(0, boundaries[0])
+        y = rand.randint(0, boundaries[1])
+        action = rand.choice(["set", "clear", "span", "run"])
+        if action == "set":
+            cells.set(x, y)
+            expect.add((x, y))
+        elif action == "clear":
+            cells.clear(x, y)
+            expect.discard((x, y))
+        elif action == "span":
+            x_last = rand.randint(x, boundaries[0])
+            cells.set_span(x, x_last, y)
+            expect.update((cell, y) for cell in range(x, x_last + 1))
+        else:
+            heading = rand.randrange(4)
+            step_x = (0, 1, 0, -1)[heading]
+            step_y = (1, 0, -1, 0)[heading]
+            moves = 0
+            while (0 <= x + step_x * (moves + 1) <= boundaries[0]
+                   and 0 <= y + step_y * (moves + 1) <= boundaries[1]):
+                moves += 1
+            moves = rand.randint(0, moves)
+            cells.set_run(x, y, heading, moves)
+            expect.update((x + step_x * step, y + step_y * step)
+                          for step in range(1, moves + 1))
+        assert cells.count_cells() == len(expect)
+    assert list(cells.set_cells()) == sorted(
+        expect, key=lambda cell: (cell[1], cell[0]))
+    assert all(cells.is_set(x, y) == ((x, y) in expect)
+               for x in range(boundaries[0] + 1)
+               for y in range(boundaries[1] + 1))
+
+
+def test_given_bitmap():
+    """A bitmap, e.g. memory-mapped, is used as it is"""
+    bitmap = memoryview(bytearray(b"\x05\x00"))
+    cells = grid.CellGrid((3, 3), bitmap)
+    assert cells.bitmap is bitmap
+    assert (0, 0) in cells and (2, 0) in cells and (1, 0) not in cells
+    assert cells.count_cells() == 2
@@ -46,3 +46,26 @@ def test_orientation(orientation_class, expect, location):
     """Test whether can set the orientation"""
     location.orientation = orientation_class()
     assert str(location.orientation) == expect
+
+
+@pytest.mark.parametrize("heading,expect", [
+    (0, 'N'),
+    (1, 'E'),
+    (2, 'S'),
+    (3, 'W'),
+])
+def test_heading(heading, expect, location):
+    """Test the orientation is a view of the heading"""
+    location.heading = heading
+    assert str(location.orientation) == expect
+
+
+def test_slots(location):
+    """The storage is slotted and keeps plain ints"""
+    location.boundaries = (7, 8)
+    location.position = (1, 2)
+    assert (location.x_min, location.y_min) == location.lower_boundary
+    assert (location.x_max, location.y_max) == (7, 8)
+    assert (location.x, location.y) == (1, 2)
+    with pytest.raises(AttributeError):
+        location.speed = 1
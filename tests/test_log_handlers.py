@@ -0,0 +1,118 @@
+# pylint:disable=redefined-outer-name
+'''Test the batching and queue log handlers'''
+import io
+import logging
+import time
+
+import pytest
+
+import rover.log_handlers as log_handlers
+
+
+@pytest.fixture
+def logger():
+    """Helper that gives an isolated logger"""
+    new = logging.getLogger("test_log_handlers")
+    new.propagate = False
+    new.setLevel(logging.DEBUG)
+    yield new
+    for handler in list(new.handlers):
+        new.removeHandler(handler)
+        handler.close()
+
+
+def test_stream_batches(logger):
+    """Records are only written once the batch is full or flushed"""
+    stream = io.StringIO()
+    handler = log_handlers.BatchingStreamHandler(stream, batch_size=10)
+    logger.addHandler(handler)
+
+    logger.info("1234")
+    assert stream.getvalue() == ""
+    logger.info("%d", 56789)
+    assert stream.getvalue() == "1234\n56789\n"
+    logger.info("end")
+    assert stream.getvalue() == "1234\n56789\n"
+    handler.flush()
+    assert stream.getvalue() == "1234\n56789\nend\n"
+
+
+def test_file_rotation(tmp_path, logger):
+    """The file is rotated within a batch, never past maxBytes"""
+    log_file = tmp_path / "rover.log"
+    handler = log_handlers.BatchingRotatingFileHandler(
+        log_file, maxBytes=40, backupCount=5, batch_size=1000)
+    logger.addHandler(handler)
+
+    for i in range(10):
+        logger.info("message %d", i)
+    handler.close()
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) > 1
+    assert all(path.stat().st_size < 40 for path in files)
+    lines = []
+    for path in [log_file.with_suffix(f".log.{i}") for i in range(5, 0, -1)]:
+        if path.exists():
+            lines += path.read_text().splitlines()
+    lines += log_file.read_text().splitlines()
+    assert lines == [f"message {i}" for i in range(10)]
+
+
+def test_queue_handlers(logger):
+    """Every record gets to the former handlers once the listener stops"""
+    stream = io.StringIO()
+    handler = log_handlers.BatchingStreamHandler(stream)
+    handler.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    listener = log_handlers.queue_handlers(logger)
+    assert [type(h) for h in logger.handlers] == [
+        log_handlers.LightQueueHandler]
+    mutable = [1]
+    logger.debug("hidden")
+    logger.info("args %s", mutable)
+    mutable.append(2)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "args [1]"
+    assert lines[1] == "failed"
+    assert "ValueError: boom" in lines[-1]
+    assert "hidden" not in stream.getvalue()
+
+
+def test_prepare_copies(logger):
+    """The other handlers of the logger get the record untouched"""
+    records = []
+    handler = log_handlers.LightQueueHandler(records)
+    handler.enqueue = records.append
+    logger.addHandler(handler)
+    original = logger.makeRecord(
+        logger.name, logging.ERROR, __file__, 1, "args %s", ([1],),
+        (ValueError, ValueError("boom"), None))
+    logger.handle(original)
+    assert original.msg == "args %s"
+    assert original.args == ([1],)
+    assert original.exc_info[0] is ValueError
+    assert records[0] is not original
+    assert records[0].msg == "args [1]"
+    assert records[0].args is None
+    assert records[0].exc_info is None
+
+
+def test_listener_flushes(logger):
+    """The batch is written as soon as the queue is empty"""
+    stream = io.StringIO()
+    logger.addHandler(log_handlers.BatchingStreamHandler(stream))
+    listener = log_handlers.queue_handlers(logger)
+    logger.info("soon")
+    deadline = time.monotonic() + 5
+    while not stream.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stream.getvalue() == "soon\n"
+    listener.stop()
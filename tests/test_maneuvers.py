@@ -0,0 +1,77 @@
+# pylint:disable=redefined-outer-name
+'''Test the maneuver cache'''
+import random
+
+import pytest
+
+import rover.maneuvers as maneuvers
+import rover.occupancy as occupancy
+
+
+@pytest.mark.parametrize("cmds,heading,expect", [
+    ("", 0, (0, 0, 0, 0, 0, 0, 0, 0)),
+    ("MMRMM", 0, (2, 2, 1, 0, 0, 2, 2, 0)),
+    ("LMLMLMLMM", 0, (0, 1, 0, -1, -1, 0, 1, 0)),
+    ("MMX", 2, (0, -2, 2, 0, -2, 0, 0, 1)),
+    (b"RRMM", 1, (-2, 0, 3, -2, 0, 0, 0, 0)),
+])
+def test_sweep(cmds, heading, expect):
+    """The displacement, heading and swept box of the commands"""
+    assert maneuvers.sweep(cmds, heading) == expect
+
+
+def test_counters(new_rover):
+    """Repeated commands are hits, maneuvers that don't fit fall back"""
+    cache = maneuvers.ManeuverCache()
+    test_rover = new_rover((5, 5), (1, 2, "N"), cache=cache)
+    assert test_rover.navigate("LMLMLMLMM") == "1 3 N"
+    test_rover.set_inital_position(1, 2, "N")
+    assert test_rover.navigate("LMLMLMLMM") == "1 3 N"
+    # sweeps to x = -1, so the engine takes over
+    test_rover.set_inital_position(0, 2, "N")
+    assert test_rover.navigate("LMLMLMLMM") == "1 3 N"
+    assert cache.info() == {
+        "hits": 2, "misses": 1, "fallbacks": 1, "size": 1}
+
+
+def test_lru(new_rover):
+    """Only the last maxsize maneuvers are kept"""
+    cache = maneuvers.ManeuverCache(maxsize=2)
+    test_rover = new_rover((9, 9), (5, 5, "N"), cache=cache)
+    for cmds in ["M", "L", "R", "M"]:
+        test_rover.navigate(cmds)
+    assert cache.info()["misses"] == 4
+    assert cache.info()["size"] == 2
+
+
+def test_skipped(new_rover):
+    """Long commands and fleets are always run by the engine"""
+    cache = maneuvers.ManeuverCache(max_length=4)
+    test_rover = new_rover((9, 9), (5, 5, "N"), cache=cache)
+    assert test_rover.navigate("MMMMM") == "5 9 N"
+    test_rover.set_occupancy(occupancy.Occupancy((9, 9)))
+    assert test_rover.navigate("RM") == "6 9 E"
+    assert cache.info()["misses"] == 0
+
+
+@pytest.mark.parametrize("engine", ["step", "runlength"])
+@pytest.mark.parametrize("seed", range(20))
+def test_same_as_engine(engine, seed, new_rover):
+    """Randomized check with a library of maneuvers near the edges"""
+    rand = random.Random(seed)
+    library = ["".join(rand.choice("MMMLRX") for _ in range(rand.randint(
+        0, 12))) for _ in range(5)]
+    cache = maneuvers.ManeuverCache(maxsize=3)
+    boundaries = (rand.randint(0, 8), rand.randint(0, 8))
+    for _ in range(50):
+        initial_coord = (
+            rand.randint(0, boundaries[0]),
+            rand.randint(0, boundaries[1]),
+            rand.choice("NESW"),
+        )
+        cmds = rand.choice(library)
+        exact = new_rover(boundaries, initial_coord, engine)
+        cached = new_rover(boundaries, initial_coord, engine,
+                           cache=cache)
+        assert cached.navigate(cmds) == exact.navigate(cmds)
+    assert cache.info()["hits"]
@@ -0,0 +1,110 @@
+'''Test the navigation metrics'''
+import json
+import logging
+
+import pytest
+
+import rover.control
+import rover.metrics as metrics
+import rover.sinks as sinks
+import rover_control
+
+LINES = ["5 5", "1 2 N", "LMLMLMLMM", "9 9 N", "3 3 E", "MMRMMRMRRMX",
+         "0 0 S", "M"]
+
+
+@pytest.mark.parametrize("engine", rover.control.rover.Rover.engines)
+@pytest.mark.parametrize("encode", [False, True])
+@pytest.mark.parametrize("chunked", [False, True])
+def test_counters(engine, encode, chunked):
+    """Lines and commands are counted by type, whole or fed in pieces"""
+    run_metrics = metrics.Metrics()
+    control = rover.control.Control(
+        engine, sink=sinks.ListSink(), metrics=run_metrics)
+    for line in LINES:
+        if encode:
+            line = line.encode()
+        if chunked:
+            control.process_chunks(
+                [line[start:start + 4] for start in range(0, len(line), 4)])
+        else:
+            control.process(line)
+    assert run_metrics.counters == {
+        "boundary_lines": 1,
+        "coordinates_lines": 4,
+        "commands_lines": 3,
+        "skipped_lines": 1,
+        "rovers": 3,
+        "commands": 21,
+        "turns": 8,
+        "moves": 12,
+        "rejected_moves": 1,
+        "invalid_commands": 1,
+        "log_records": 0,
+    }
+    assert all(seconds > 0 for phase, seconds in run_metrics.seconds.items()
+               if phase != "logging")
+
+
+def test_disabled():
+    """Nothing is collected while disabled, and it can be turned back on"""
+    run_metrics = metrics.Metrics(enabled=False)
+    control = rover.control.Control(sink=sinks.ListSink(), metrics=run_metrics)
+    control.process("5 5")
+    assert run_metrics.as_dict() == metrics.Metrics().as_dict()
+    run_metrics.enable()
+    control.process("1 2 N")
+    control.process_chunks(["LMLM", "LMLMM"])
+    assert run_metrics.counters["coordinates_lines"] == 1
+    assert run_metrics.counters["commands_lines"] == 1
+    assert run_metrics.counters["commands"] == 9
+    assert run_metrics.counters["rovers"] == 1
+
+
+def test_time_handlers():
+    """The log handlers are timed and their records counted"""
+    handled = []
+    handler = logging.Handler()
+    handler.emit = handled.append
+    run_metrics = metrics.Metrics()
+    run_metrics.time_handlers([handler])
+    logger = logging.getLogger("test_time_handlers")
+    logger.addHandler(handler)
+    try:
+        logger.error("one")
+        run_metrics.disable()
+        logger.error("two")
+    finally:
+        logger.removeHandler(handler)
+    assert len(handled) == 2
+    assert run_metrics.counters["log_records"] == 1
+    assert run_metrics.seconds["logging"] > 0
+
+
+def test_formats():
+    """The metrics are dumped as JSON or Prometheus text"""
+    run_metrics = metrics.Metrics()
+    run_metrics.count("rovers", 3)
+    run_metrics.add_time("navigate", 0.5)
+    assert json.loads(run_metrics.to_json()) == run_metrics.as_dict()
+    text = run_metrics.to_prometheus()
+    assert "# TYPE rover_rovers_total counter\nrover_rovers_total 3\n" in text
+    assert 'rover_phase_seconds_total{phase="navigate"} 0.5\n' in text
+
+
+@pytest.mark.parametrize("metrics_format", metrics.FORMATS)
+def test_metrics_file(tmp_path, monkeypatch, capsys, metrics_format):
+    """rover_control.py writes the metrics to a file"""
+    cmd_file = tmp_path / "cmds.txt"
+    cmd_file.write_text("\n".join(LINES) + "\n")
+    path = tmp_path / "metrics"
+    monkeypatch.setattr("sys.argv", [
+        "rover_control.py", "-f", str(cmd_file), "--metrics", str(path),
+        "--metrics-format", metrics_format,
+        "--log-file", str(tmp_path / "rover.log")])
+    rover_control.main()
+    assert capsys.readouterr().out == "1 3 N\n5 1 E\n0 0 S\n"
+    if metrics_format == "json":
+        assert json.loads(path.read_text())["counters"]["rovers"] == 3
+    else:
+        assert "rover_rovers_total 3\n" in path.read_text()
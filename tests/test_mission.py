@@ -0,0 +1,34 @@
+'''Test the mission generator against rover_control'''
+import pytest
+
+import rover.sinks
+import rover_control
+from benchmarks import mission
+
+
+@pytest.mark.parametrize("engine", ["step", "runlength"])
+@pytest.mark.parametrize("seed", range(3))
+def test_expected_output(tmp_path, engine, seed):
+    """The reference and the rovers end up in the same locations"""
+    path = tmp_path / "mission.txt"
+    expected = tmp_path / "expected.txt"
+    options = mission.parse_args([
+        str(path), "--rovers", "200", "--plateau", "9", "4",
+        "--length", "60", "--distribution", "exponential",
+        "--out-of-bounds", "0.3", "--invalid", "0.1", "--malformed", "0.2",
+        "--seed", str(seed)])
+    stats = mission.generate(path, expected, options)
+
+    sink = rover.sinks.ListSink()
+    rover_control.process_from_file(path, engine, sink=sink)
+    assert len(sink.results) == stats["rovers"]
+    assert sink.results == expected.read_text().splitlines()
+
+
+def test_reproducible(tmp_path):
+    """The same seed writes the same file"""
+    options = mission.parse_args(["unused", "--rovers", "50", "--seed", "7"])
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    mission.generate(first, None, options)
+    mission.generate(second, None, options)
+    assert first.read_bytes() == second.read_bytes()
@@ -3,6 +3,7 @@
 import pytest
 
 import rover.navigation
+import rover.occupancy
 import rover.cardinal as cardinal
 import rover.exceptions as exceptions
 
@@ -156,6 +157,34 @@ def test_invalid_moves(navigation, position, orientation):
     nav.set_initial_orientation(orientation)
     with pytest.raises(exceptions.BoundaryError):
         nav.move()
+    assert nav.try_move() == rover.navigation.OUT_OF_BOUNDS
+    assert nav.location.position == position
+
+
+def test_try_move_taken(navigation):
+    """A move into a taken cell is rejected with its own status"""
+    nav = navigation
+    nav.occupancy = rover.occupancy.Occupancy((5, 5))
+    nav.occupancy.add((1, 2))
+    nav.set_position((1, 1))
+    nav.set_initial_orientation("N")
+    assert nav.try_move() == rover.navigation.TAKEN
+    with pytest.raises(exceptions.CollisionError):
+        nav.move()
+    nav.move_right()
+    assert nav.try_move() == rover.navigation.MOVED
+    assert nav.location.position == (2, 1)
+
+
+def test_process_cmds_logs_once(navigation, caplog):
+    """Rejected moves and invalid commands are logged once per series"""
+    nav = navigation
+    nav.set_position((0, 0))
+    nav.set_initial_orientation("S")
+    assert nav.process_cmds("M" * 100 + "XX" + "LM") == (100, 2)
+    assert nav.location.position == (1, 0)
+    assert caplog.messages == [
+        "rejected 100 moves", "skipped 2 invalid commands"]
 
 
 @pytest.mark.parametrize("func,cmd", [
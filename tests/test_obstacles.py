@@ -0,0 +1,208 @@
+'''Test the obstacle map'''
+import io
+import random
+
+import pytest
+
+import rover.control
+import rover.exceptions as exceptions
+import rover.maneuvers as maneuvers
+import rover.obstacles as obstacles
+import rover.occupancy as occupancy
+import rover.sinks as sinks
+import rover.trajectory as trajectory
+
+
+@pytest.fixture
+def small_buckets(monkeypatch):
+    """Index the rectangles of the hash sets in buckets of a few cells"""
+    monkeypatch.setattr(obstacles.ObstacleMap, "bucket_shift", 2)
+    monkeypatch.setattr(obstacles.ObstacleMap, "max_buckets", 4)
+
+
+def blocked_cells(obstacle_map):
+    """Every blocked cell of the plateau"""
+    return {(x, y) for x in range(obstacle_map.width)
+            for y in range(obstacle_map.height) if (x, y) in obstacle_map}
+
+
+@pytest.mark.usefixtures("storage", "small_buckets")
+def test_read():
+    """Cells and rectangles are blocked, clipped to the plateau"""
+    obstacle_map = obstacles.ObstacleMap((19, 9))
+    assert not obstacle_map
+    obstacle_map.read(io.StringIO(
+        "# rocks\n3 4\n\n  18 0 \n25 25\n"
+        "9 9 7 8\n-5 0 0 1\n17 7 30 30\n"))
+    assert obstacle_map
+    expected = {(3, 4), (18, 0), (7, 8), (8, 8), (9, 8), (7, 9), (8, 9),
+                (9, 9), (0, 0), (0, 1)}
+    expected |= {(x, y) for x in range(17, 20) for y in range(7, 10)}
+    assert blocked_cells(obstacle_map) == expected
+
+
+@pytest.mark.parametrize("line", ["3", "3 4 5", "3 a", "1 2 3 4 5"])
+def test_read_malformed(line):
+    """Lines that aren't cells or rectangles are rejected"""
+    obstacle_map = obstacles.ObstacleMap((9, 9))
+    with pytest.raises(exceptions.InvalidObstacles, match="line 2"):
+        obstacle_map.read(io.BytesIO(b"1 1\n" + line.encode() + b"\n"))
+
+
+@pytest.mark.parametrize("width", [1, 7, 8, 9, 30])
+def test_rectangle_rows(width):
+    """Rectangles fill exactly their cells of each row"""
+    obstacle_map = obstacles.ObstacleMap((width + 3, 3))
+    obstacle_map.add_rectangle(1, 1, width, 2)
+    assert blocked_cells(obstacle_map) == {
+        (x, y) for x in range(1, width + 1) for y in (1, 2)}
+
+
+def test_binary_form(tmp_path):
+    """The binary form is memory-mapped back to the same map"""
+    text = tmp_path / "map.txt"
+    text.write_text("3 4\n10 10 19 12\n")
+    obstacle_map = obstacles.load(str(text), (29, 19))
+    binary = tmp_path / "map.bin"
+    obstacle_map.save(str(binary))
+
+    mapped = obstacles.load(str(binary), (29, 19))
+    assert isinstance(mapped.bitmap, memoryview)
+    assert mapped
+    assert blocked_cells(mapped) == blocked_cells(obstacle_map)
+
+    # the header tells whether any cell is blocked, the bitmap isn't read
+    _, _, _, blocked = obstacles.HEADER.unpack_from(binary.read_bytes())
+    assert blocked == len(blocked_cells(obstacle_map))
+    empty = tmp_path / "empty.bin"
+    obstacles.ObstacleMap((29, 19)).save(str(empty))
+    assert not obstacles.load(str(empty), (29, 19))
+
+    with pytest.raises(exceptions.InvalidObstacles, match="29 19"):
+        obstacles.load(str(binary), (19, 29))
+    binary.write_bytes(binary.read_bytes()[:-1])
+    with pytest.raises(exceptions.InvalidObstacles, match="truncated"):
+        obstacles.load(str(binary), (29, 19))
+    binary.write_bytes(b"ROVEROB1" + binary.read_bytes()[8:])
+    with pytest.raises(exceptions.InvalidObstacles, match="compile it again"):
+        obstacles.load(str(binary), (29, 19))
+
+
+def test_huge_plateau(tmp_path):
+    """Huge plateaus index the rectangles instead of using a bitmap"""
+    obstacle_map = obstacles.ObstacleMap((10 ** 9, 10 ** 9))
+    assert obstacle_map.bitmap is None
+    obstacle_map.add_cell(5, 5)
+    obstacle_map.add_rectangle(2000, 0, 2100, 10)
+    obstacle_map.add_rectangle(0, 10 ** 8, 10 ** 9, 10 ** 8)
+    assert len(obstacle_map.buckets) == 2
+    assert len(obstacle_map.large) == 1
+    for cell in [(5, 5), (2048, 10), (2000, 0), (10 ** 9, 10 ** 8)]:
+        assert cell in obstacle_map
+    for cell in [(5, 6), (2101, 5), (2048, 11), (0, 10 ** 8 + 1)]:
+        assert cell not in obstacle_map
+    with pytest.raises(ValueError):
+        obstacle_map.save(str(tmp_path / "map.bin"))
+
+
+@pytest.mark.usefixtures("storage", "small_buckets")
+def test_occupancy():
+    """The rovers of a fleet and the obstacles take cells"""
+    obstacle_map = obstacles.ObstacleMap((9, 9))
+    obstacle_map.add_rectangle(2, 2, 3, 3)
+    index = occupancy.Occupancy((9, 9), obstacle_map)
+    assert index
+    assert len(index) == 0
+    assert obstacle_map is index.obstacles
+    index.add((5, 5))
+    assert {(2, 2), (3, 3), (5, 5)} <= {
+        (x, y) for x in range(10) for y in range(10) if (x, y) in index}
+    assert (4, 4) not in index
+    assert not occupancy.Occupancy((9, 9), obstacles.ObstacleMap((9, 9)))
+
+
+@pytest.mark.usefixtures("small_buckets")
+@pytest.mark.parametrize("storage", [
+    "bitmap", "set", ("set", (occupancy.Occupancy,)),
+    ("set", (obstacles.ObstacleMap,))], indirect=True)
+def test_occupancy_keeps_obstacles(storage):
+    """Rovers can't take or free the cells of the obstacles, whatever holds
+    each of them"""
+    obstacle_map = obstacles.ObstacleMap((9, 9))
+    obstacle_map.add_rectangle(2, 2, 3, 3)
+    index = occupancy.Occupancy((9, 9), obstacle_map)
+    assert storage != "set" or None in (index.bitmap, obstacle_map.bitmap)
+
+    with pytest.raises(exceptions.CollisionError):
+        index.add((2, 3))
+    index.discard((3, 2))
+    assert len(index) == 0
+    assert (2, 3) in index and (3, 2) in index
+    index.add((5, 5))
+    index.discard((5, 5))
+    assert len(index) == 0
+    assert (5, 5) not in index
+
+
+@pytest.mark.usefixtures("storage", "small_buckets")
+@pytest.mark.parametrize("engine", rover.control.rover.Rover.engines)
+@pytest.mark.parametrize("extra", [None, "maneuvers", "trajectory"])
+@pytest.mark.parametrize("avoid_collisions", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_engines(walk, tmp_path, engine, extra, avoid_collisions, seed):
+    """Every way of running the commands stops before the obstacles"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(3, 12), rand.randint(3, 12))
+    lines = []
+    for _ in range(rand.randint(1, 6)):
+        x_min, y_min = rand.randint(0, 12), rand.randint(0, 12)
+        lines.append(f"{x_min} {y_min} {x_min + rand.randint(0, 2)} "
+                     f"{y_min + rand.randint(0, 2)}\n")
+    for _ in range(rand.randint(1, 10)):
+        lines.append(f"{rand.randint(0, 12)} {rand.randint(0, 12)}\n")
+    map_file = tmp_path / "map.txt"
+    map_file.write_text("".join(lines))
+    blocked = blocked_cells(obstacles.load(str(map_file), boundaries))
+    free = [(x, y) for x in range(boundaries[0] + 1)
+            for y in range(boundaries[1] + 1) if (x, y) not in blocked]
+    start = (*rand.choice(free), rand.randrange(4))
+    cmds = "".join(rand.choice("LRMMMMX")
+                   for _ in range(rand.randint(50, 400)))
+
+    options = {}
+    if extra == "maneuvers":
+        options["maneuvers"] = maneuvers.ManeuverCache()
+    elif extra == "trajectory":
+        options["recorder"] = trajectory.TrajectoryRecorder(str(tmp_path))
+    sink = sinks.ListSink()
+    control = rover.control.Control(
+        engine, avoid_collisions, sink=sink, obstacles=str(map_file),
+        **options)
+    control.process(f"{boundaries[0]} {boundaries[1]}")
+    control.process(f"{start[0]} {start[1]} {'NESW'[start[2]]}")
+    control.process(cmds)
+    *_, (x, y, heading) = walk(boundaries, start, cmds, blocked)
+    assert sink.results == [f"{x} {y} {'NESW'[heading]}"]
+
+
+@pytest.mark.parametrize("avoid_collisions", [False, True])
+def test_start_blocked(tmp_path, avoid_collisions):
+    """A rover can't be placed on an obstacle"""
+    map_file = tmp_path / "map.txt"
+    map_file.write_text("1 2\n")
+    sink = sinks.ListSink()
+    control = rover.control.Control(
+        avoid_collisions=avoid_collisions, sink=sink,
+        obstacles=str(map_file))
+    for line in ["5 5", "1 2 N", "M", "1 1 N", "MM"]:
+        control.process(line)
+    assert sink.results == ["1 1 N"]
+
+
+def test_invalid_map(tmp_path):
+    """The boundary is rejected with a malformed map"""
+    map_file = tmp_path / "map.txt"
+    map_file.write_text("1 2 3\n")
+    control = rover.control.Control(
+        sink=sinks.ListSink(), obstacles=str(map_file))
+    assert not control.process_boundary("5 5")
@@ -0,0 +1,43 @@
+# pylint:disable=redefined-outer-name
+'''Test the occupancy index'''
+import pytest
+
+import rover.occupancy as occupancy
+
+
+@pytest.fixture(params=["bitmap", "set"])
+def index(request, monkeypatch):
+    """Helper that instantiates both kinds of index"""
+    if request.param == "set":
+        monkeypatch.setattr(occupancy.Occupancy, "max_bitmap_cells", 0)
+    return occupancy.Occupancy((9, 4))
+
+
+def test_kind(index):
+    """Small plateaus use a bitmap unless told otherwise"""
+    assert (index.bitmap is None) == (index.max_bitmap_cells == 0)
+
+
+def test_add_discard(index):
+    """Cells can be taken and freed"""
+    cells = [(0, 0), (9, 4), (3, 2), (9, 0), (0, 4)]
+    for cell in cells:
+        index.add(cell)
+    index.add((3, 2))
+    assert len(index) == len(cells)
+    for x in range(10):
+        for y in range(5):
+            assert ((x, y) in index) == ((x, y) in cells)
+
+    index.discard((3, 2))
+    index.discard((3, 3))
+    assert (3, 2) not in index
+    assert len(index) == len(cells) - 1
+
+
+def test_huge_plateau():
+    """A plateau too big for a bitmap uses a set"""
+    index = occupancy.Occupancy((10 ** 9, 10 ** 9))
+    assert index.bitmap is None
+    index.add((10 ** 9, 10 ** 9))
+    assert (10 ** 9, 10 ** 9) in index
@@ -0,0 +1,60 @@
+'''Test the command parser'''
+import pytest
+
+import rover.parser as parser
+
+
+@pytest.mark.parametrize("cmd,expect", [
+    ("5 5", (parser.OK, 5, 5)),
+    ("0 12", (parser.OK, 0, 12)),
+    ("-1 -1", (parser.OK, -1, -1)),
+    (b"5 7", (parser.OK, 5, 7)),
+    (memoryview(b"5 7"), (parser.OK, 5, 7)),
+    ("5", (parser.MALFORMED, 0, 0)),
+    ("", (parser.MALFORMED, 0, 0)),
+    ("5 5 N", (parser.MALFORMED, 0, 0)),
+    ("5  5", (parser.MALFORMED, 0, 0)),
+    (" 5 5", (parser.MALFORMED, 0, 0)),
+    ("5 R", (parser.MALFORMED, 0, 0)),
+    ("MLLR", (parser.MALFORMED, 0, 0)),
+])
+def test_parse_boundary(cmd, expect):
+    """Boundary lines are decoded into ints"""
+    assert parser.parse_boundary(cmd) == expect
+
+
+@pytest.mark.parametrize("cmd,expect", [
+    ("1 2 N", (parser.OK, 1, 2, 0)),
+    ("3 3 E", (parser.OK, 3, 3, 1)),
+    (b"0 0 S", (parser.OK, 0, 0, 2)),
+    (memoryview(b"10 20 W"), (parser.OK, 10, 20, 3)),
+    ("1 2 T", (parser.INVALID_HEADING, 0, 0, 0)),
+    ("1 2 ", (parser.INVALID_HEADING, 0, 0, 0)),
+    ("1 2", (parser.MALFORMED, 0, 0, 0)),
+    ("1 2  N", (parser.MALFORMED, 0, 0, 0)),
+    ("1  2 N", (parser.MALFORMED, 0, 0, 0)),
+    ("1 2 N E", (parser.MALFORMED, 0, 0, 0)),
+    ("N 2 N", (parser.MALFORMED, 0, 0, 0)),
+    ("LMLMLMLMM", (parser.MALFORMED, 0, 0, 0)),
+    ("", (parser.MALFORMED, 0, 0, 0)),
+])
+def test_parse_coordinates(cmd, expect):
+    """Coordinates lines are decoded into ints and a heading"""
+    assert parser.parse_coordinates(cmd) == expect
+
+
+@pytest.mark.parametrize("cmd", [
+    "1 2 N", "1 2", "1  2 N", "1 2 N E", " 1 2 N", "1 2 N ", "a b N",
+    "+1 2 N", "1 -2 S", "1\t2 N",
+])
+def test_same_as_split(cmd):
+    """Lines are accepted exactly when splitting on spaces would work"""
+    try:
+        x, y, _ = cmd.split(" ")
+        legacy = (int(x), int(y))
+    except ValueError:
+        legacy = None
+    code, x, y, _ = parser.parse_coordinates(cmd)
+    assert (code != parser.MALFORMED) == (legacy is not None)
+    if legacy is not None:
+        assert (x, y) == legacy
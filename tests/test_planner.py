@@ -0,0 +1,149 @@
+'''Test the path planner'''
+import collections
+import random
+
+import pytest
+
+import rover.exceptions as exceptions
+import rover.obstacles as obstacles
+import rover.planner as planner
+import rover.rover
+
+
+def shortest(walk, boundaries, blocked, start, goal):
+    """The fewest commands to the goal, breadth first"""
+    distances = {start: 0}
+    queue = collections.deque([start])
+    while queue:
+        state = queue.popleft()
+        if state[:2] == goal[:2] and goal[2:] in ((), state[2:]):
+            return distances[state]
+        for cmd in "LRM":
+            new_state, = walk(boundaries, state, cmd, blocked)
+            if new_state not in distances:
+                distances[new_state] = distances[state] + 1
+                queue.append(new_state)
+    return None
+
+
+def drive(boundaries, obstacle_map, start, commands):
+    """Where a rover ends after the commands"""
+    mars_hover = rover.rover.Rover()
+    mars_hover.set_boundaries(*boundaries)
+    if obstacle_map:
+        mars_hover.set_occupancy(obstacle_map)
+    mars_hover.place(*start)
+    rejected, invalid = mars_hover.run_commands(commands)
+    assert (rejected, invalid) == (0, 0)
+    location = mars_hover.navigation.location
+    return location.x, location.y, location.heading
+
+
+@pytest.mark.parametrize("heading", range(4))
+@pytest.mark.parametrize("goal", [(3, 3), (3, 0), (0, 3), (3, 3, 2),
+                                  (3, 6), (6, 6), (6, 3), (6, 0), (0, 0),
+                                  (3, 3, 0), (0, 6, 1), (6, 0, 3)])
+def test_open_ground(walk, heading, goal):
+    """Without obstacles the heuristic is the exact cost"""
+    plan = planner.Planner((6, 6))
+    commands = plan.plan((3, 3, heading), goal)
+    assert len(commands) == shortest(
+        walk, (6, 6), set(), (3, 3, heading), goal)
+    # only the states along the path are expanded
+    assert plan.expanded == len(commands) + 1
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_obstacles(walk, seed):
+    """The plans are as short as breadth first ones, around obstacles"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 12), rand.randint(0, 12))
+    obstacle_map = obstacles.ObstacleMap(boundaries)
+    for _ in range(rand.randint(0, 40)):
+        obstacle_map.add_cell(rand.randint(0, 12), rand.randint(0, 12))
+    for _ in range(rand.randint(0, 3)):
+        x, y = rand.randint(0, 12), rand.randint(0, 12)
+        obstacle_map.add_rectangle(x, y, x + rand.randint(0, 6), y)
+    free = [(x, y) for x in range(boundaries[0] + 1)
+            for y in range(boundaries[1] + 1) if (x, y) not in obstacle_map]
+    if not free:
+        return
+    blocked = {(x, y) for x in range(boundaries[0] + 1)
+               for y in range(boundaries[1] + 1) if (x, y) in obstacle_map}
+    start = (*rand.choice(free), rand.randrange(4))
+    goal = rand.choice(free)
+    if rand.random() < 0.5:
+        goal += (rand.randrange(4),)
+
+    commands = planner.Planner(boundaries, obstacle_map).plan(start, goal)
+    expected = shortest(walk, boundaries, blocked, start, goal)
+    if expected is None:
+        assert commands is None
+        return
+    assert len(commands) == expected
+    end = drive(boundaries, obstacle_map, start, commands)
+    assert end[:2] == goal[:2]
+    if len(goal) == 3:
+        assert end[2] == goal[2]
+
+
+def test_unreachable():
+    """A walled off goal can't be reached"""
+    obstacle_map = obstacles.ObstacleMap((9, 9))
+    obstacle_map.add_rectangle(0, 5, 9, 5)
+    plan = planner.Planner((9, 9), obstacle_map)
+    assert plan.plan((0, 0, 0), (9, 9)) is None
+    assert plan.expanded == 4 * 50
+
+
+@pytest.mark.parametrize("start, goal, error", [
+    ((10, 0, 0), (0, 0), exceptions.BoundaryError),
+    ((0, 0, 0), (0, -1), exceptions.BoundaryError),
+    ((2, 2, 0), (0, 0), exceptions.CollisionError),
+    ((0, 0, 0), (2, 2, 1), exceptions.CollisionError),
+])
+def test_invalid(start, goal, error):
+    """The start and the goal must be free cells of the plateau"""
+    obstacle_map = obstacles.ObstacleMap((9, 9))
+    obstacle_map.add_cell(2, 2)
+    with pytest.raises(error):
+        planner.Planner((9, 9), obstacle_map).plan(start, goal)
+
+
+def test_turn_table():
+    """Turns to face the directions of the goal, then the goal heading"""
+    table = planner.turn_table()
+    # goal to the North East
+    assert [table[(2 * 3 + 2) * 4 + heading] for heading in range(4)] == [
+        1, 1, 2, 2]
+    # goal to the West
+    assert [table[(0 * 3 + 1) * 4 + heading] for heading in range(4)] == [
+        1, 2, 1, 0]
+    table = planner.turn_table(2)
+    # goal cell reached, facing South
+    assert [table[(1 * 3 + 1) * 4 + heading] for heading in range(4)] == [
+        2, 1, 0, 1]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_weight(seed):
+    """A weighted heuristic gives plans at most that much longer"""
+    rand = random.Random(seed)
+    boundaries = (60, 60)
+    obstacle_map = obstacles.ObstacleMap(boundaries)
+    for _ in range(40):
+        x, y = rand.randint(0, 60), rand.randint(0, 60)
+        obstacle_map.add_rectangle(x, y, x + rand.randint(0, 8),
+                                   y + rand.randint(0, 8))
+    free = [(x, y) for x in range(61) for y in range(61)
+            if (x, y) not in obstacle_map]
+    start = (*rand.choice(free), rand.randrange(4))
+    goal = rand.choice(free)
+    plan = planner.Planner(boundaries, obstacle_map)
+    shortest_commands = plan.plan(start, goal)
+    if shortest_commands is None:
+        return
+    commands = plan.plan(start, goal, weight=1.5)
+    assert len(shortest_commands) <= len(commands) \
+        <= 1.5 * len(shortest_commands)
+    assert drive(boundaries, obstacle_map, start, commands)[:2] == goal
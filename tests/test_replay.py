@@ -0,0 +1,63 @@
+# pylint:disable=redefined-outer-name
+'''Test the replay index against replaying the commands'''
+import random
+
+import pytest
+
+import rover.occupancy as occupancy
+import rover.replay as replay
+
+
+def test_location_at(new_rover):
+    """The location after each command of the example"""
+    index = new_rover((5, 5), (1, 2, "N")).replay_index("LMLMLMLMM")
+    assert [index.location_at(step) for step in range(len(index) + 1)] == [
+        "1 2 N", "1 2 W", "0 2 W", "0 2 S", "0 1 S", "0 1 E", "1 1 E",
+        "1 1 N", "1 2 N", "1 3 N"]
+
+
+def test_rover_not_moved(new_rover):
+    """Building the index doesn't move the rover"""
+    test_rover = new_rover((5, 5), (3, 3, "E"))
+    index = test_rover.replay_index(b"MMRMMRMRRM")
+    assert index.location_at(10) == "5 1 E"
+    assert test_rover.navigate("") == "3 3 E"
+
+
+def test_out_of_range(new_rover):
+    """Only steps within the commands can be queried"""
+    index = new_rover((5, 5), (1, 2, "N")).replay_index("MM")
+    with pytest.raises(IndexError):
+        index.position_at(3)
+    with pytest.raises(IndexError):
+        index.position_at(-1)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_same_as_replay(seed, new_rover):
+    """Randomized check against navigating every prefix"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 6), rand.randint(0, 6))
+    initial_coord = (
+        rand.randint(0, boundaries[0]),
+        rand.randint(0, boundaries[1]),
+        rand.choice("NESW"),
+    )
+    taken = None
+    if seed % 2:
+        taken = occupancy.Occupancy(boundaries)
+        for _ in range(rand.randint(1, 6)):
+            taken.add((rand.randint(0, boundaries[0]),
+                       rand.randint(0, boundaries[1])))
+        taken.discard(initial_coord[:2])
+    # long turn runs span several blocks
+    alphabet = rand.choice(["MMMMLRX", "LLLLLRRM"])
+    cmds = "".join(rand.choice(alphabet)
+                   for _ in range(rand.randint(0, 3 * replay.BLOCK_SIZE)))
+
+    index = new_rover(boundaries, initial_coord,
+                      taken=taken).replay_index(cmds)
+    for step in range(len(cmds) + 1):
+        expect = new_rover(boundaries, initial_coord, taken=taken).navigate(
+            cmds[:step])
+        assert index.location_at(step) == expect
@@ -0,0 +1,129 @@
+'''Test the fleet routes'''
+import io
+import random
+
+import pytest
+
+import rover.control
+import rover.planner as planner
+import rover.routes as routes
+import rover.sinks as sinks
+import rover_routes
+
+
+def random_cells(rand, count, size):
+    """Random cells of a size x size plateau"""
+    return [(rand.randint(0, size), rand.randint(0, size))
+            for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_leg(seed):
+    """The legs cost as much as the planned commands on open ground"""
+    rand = random.Random(seed)
+    x, y, goal_x, goal_y = (rand.randint(0, 9) for _ in range(4))
+    heading = rand.randrange(4)
+    cost, end = routes.leg(x, y, heading, goal_x, goal_y)
+    commands = planner.Planner((9, 9)).plan((x, y, heading), (goal_x, goal_y))
+    assert cost == len(commands)
+    assert len(planner.Planner((9, 9)).plan(
+        (x, y, heading), (goal_x, goal_y, end))) == cost
+
+
+@pytest.mark.parametrize("bucket_size", [1, 3, 50])
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest(bucket_size, seed):
+    """The closest target is found from the buckets around"""
+    rand = random.Random(seed)
+    targets = random_cells(rand, 60, 30)
+    index = routes.TargetIndex(targets, bucket_size)
+    left = set(range(len(targets)))
+    while left:
+        x, y, heading = rand.randint(0, 30), rand.randint(0, 30), \
+            rand.randrange(4)
+        cost, target, _ = index.nearest(x, y, heading)
+        assert target in left
+        assert cost == min(routes.leg(x, y, heading, *targets[other])[0]
+                           for other in left)
+        index.take(target)
+        left.discard(target)
+    assert index.nearest(0, 0, 0) is None
+
+
+def test_assign():
+    """Every target goes to exactly one rover, the routes are balanced"""
+    rand = random.Random(0)
+    starts = [(*cell, rand.randrange(4)) for cell in random_cells(rand, 5, 99)]
+    targets = random_cells(rand, 300, 99)
+    assigned = routes.assign(starts, targets)
+    assert sorted(sum(assigned, [])) == list(range(len(targets)))
+    costs = [routes.route_cost(start, [targets[i] for i in route])
+             for start, route in zip(starts, assigned)]
+    assert max(costs) - min(costs) < 0.2 * max(costs)
+    assert routes.assign([], targets) == []
+    assert routes.assign(starts, []) == [[]] * 5
+
+
+def test_two_opt():
+    """Crossing legs are uncrossed, and routes never get longer"""
+    start = (0, 0, 1)
+    points = [(10, 0), (0, 1), (10, 1), (0, 2), (10, 2)]
+    better = routes.two_opt(start, points)
+    assert sorted(better) == sorted(points)
+    assert routes.route_cost(start, better) < routes.route_cost(start, points)
+
+    rand = random.Random(1)
+    for _ in range(20):
+        start = (*random_cells(rand, 1, 20)[0], rand.randrange(4))
+        points = random_cells(rand, rand.randint(0, 12), 20)
+        result = routes.two_opt(start, points)
+        assert sorted(result) == sorted(points)
+        assert routes.route_cost(start, result) <= routes.route_cost(
+            start, points)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimize(tmp_path, workers):
+    """The rovers drive through every target they can reach"""
+    map_file = tmp_path / "map.txt"
+    # a crater, and two cells walled in
+    map_file.write_text("4 4 6 6\n0 18 2 18\n2 19\n")
+    rand = random.Random(0)
+    starts = [(0, 0, 0), (19, 19, 2), (9, 9, 3), (5, 5, 0), (30, 0, 0)]
+    targets = random_cells(rand, 40, 19) + [(5, 4), (0, 19), (40, 40)]
+    fleet = routes.optimize(
+        (19, 19), starts, targets, str(map_file), workers)
+    assert [start for start, _ in fleet] == starts[:3]
+
+    mission = io.StringIO()
+    routes.write_mission(mission, (19, 19), fleet)
+    sink = sinks.ListSink()
+    control = rover.control.Control(
+        sink=sink, obstacles=str(map_file), track_coverage=True)
+    for line in mission.getvalue().splitlines():
+        control.process(line)
+    assert len(sink.results) == 3
+    walled = {(0, 19), (1, 19)}
+    visited = set(control.coverage.covered()) | {
+        start[:2] for start in starts[:3]}
+    assert {target for target in targets[:40]
+            if target not in control.blocked} - walled <= visited
+    assert not walled & visited
+
+
+def test_script(tmp_path, monkeypatch, capsys):
+    """The script writes a command file for rover_control.py"""
+    rovers = tmp_path / "rovers.txt"
+    rovers.write_text("1 2 N\n\n3 3 E\n")
+    targets = tmp_path / "targets.txt"
+    targets.write_text("1 3\n5 1\n")
+    monkeypatch.setattr("sys.argv", [
+        "rover_routes.py", "--plateau", "5", "5", "--rovers", str(rovers),
+        "--targets", str(targets)])
+    rover_routes.main()
+    assert capsys.readouterr().out == "5 5\n1 2 N\nM\n3 3 E\nMMRMM\n"
+
+    targets.write_text("1 3\nfive 1\n")
+    with pytest.raises(SystemExit):
+        rover_routes.main()
+    assert "targets.txt:2: malformed line" in capsys.readouterr().err
@@ -1,5 +1,8 @@
 # pylint:disable=redefined-outer-name
 '''Test Rover class'''
+import logging
+import random
+
 import pytest
 
 import rover.exceptions as exceptions
@@ -63,3 +66,48 @@ def test_invalid_wont_crash(test_rover, cmds, expect):
     """Invalid commands shouldn't make the rover crash"""
     final_coord = test_rover.navigate(cmds)
     assert final_coord == expect
+
+
+@pytest.mark.parametrize("engine", ["step", "runlength"])
+def test_summary(test_rover, caplog, engine):
+    """Each navigation logs a structured summary at info level"""
+    test_rover.engine = engine
+    test_rover.set_inital_position(0, 0, "N")
+    with caplog.at_level(logging.INFO):
+        test_rover.navigate("MMMMMMMXR")
+    summaries = [record.summary for record in caplog.records
+                 if hasattr(record, "summary")]
+    assert summaries == [{
+        "commands": 9,
+        "rejected": 2,
+        "invalid": 1,
+        "location": "0 5 E",
+    }]
+
+
+def test_trace_only_on_debug(test_rover, caplog):
+    """Each step is traced only when debugging"""
+    test_rover.set_inital_position(0, 0, "N")
+    with caplog.at_level(logging.INFO):
+        test_rover.navigate("MRM")
+    assert not [record for record in caplog.records
+                if record.levelno == logging.DEBUG]
+
+    with caplog.at_level(logging.DEBUG):
+        test_rover.navigate("MRM")
+    assert "move to (2, 1)" in caplog.messages
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_trace_same_as_silent(caplog, seed):
+    """Tracing each step doesn't change where the rover ends up"""
+    rand = random.Random(seed)
+    cmds = "".join(rand.choice("MMMLRX") for _ in range(100))
+    locations = []
+    for level in (logging.WARNING, logging.DEBUG):
+        new_rover = rover.rover.Rover()
+        new_rover.set_boundaries(4, 4)
+        new_rover.set_inital_position(2, 2, "N")
+        with caplog.at_level(level):
+            locations.append(new_rover.navigate(cmds))
+    assert locations[0] == locations[1]
@@ -0,0 +1,215 @@
+# pylint:disable=redefined-outer-name
+'''Test the rover_control script'''
+import io
+import logging
+import random
+import tracemalloc
+
+import pytest
+
+import rover.control
+import rover_control
+import rover_obstacles
+
+
+@pytest.fixture
+def cmd_file(tmp_path):
+    """Helper that writes a file with valid and invalid lines"""
+    rand = random.Random(0)
+    lines = ["MMM", "5 5"]
+    for _ in range(50):
+        lines.append(rand.choice([
+            f"{rand.randint(0, 6)} {rand.randint(0, 6)} "
+            f"{rand.choice('NESWT')}",
+            "1 1",
+            "",
+        ]))
+        lines.append("".join(
+            rand.choice("LRMMX") for _ in range(rand.randint(0, 30))))
+    path = tmp_path / "cmds.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_rover_blocks(tmp_path):
+    """The file is split into (boundary, coordinates, commands)"""
+    path = tmp_path / "cmds.txt"
+    path.write_text("5 5\n1 2 N\nLMLMLMLMM\n9 9 N\n3 3 E\nMMRMMRMRRM\n1 1 N\n")
+    assert list(rover_control.get_rover_blocks(path)) == [
+        ("5 5", "1 2 N", "LMLMLMLMM"),
+        ("5 5", "3 3 E", "MMRMMRMRRM"),
+    ]
+
+
+@pytest.mark.parametrize("workers,chunk_size", [
+    (2, 1),
+    (2, 7),
+    (3, 1000),
+])
+def test_parallel_same_as_serial(cmd_file, capsys, workers, chunk_size):
+    """Parallel mode prints exactly the same as the serial mode"""
+    rover_control.process_from_file(cmd_file)
+    serial = capsys.readouterr().out
+
+    rover_control.process_from_file_parallel(
+        cmd_file, workers, chunk_size=chunk_size)
+    assert capsys.readouterr().out == serial
+    assert serial
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_output_file(cmd_file, capsys, tmp_path, monkeypatch, workers):
+    """--output writes exactly what would be printed"""
+    rover_control.process_from_file(cmd_file)
+    serial = capsys.readouterr().out
+
+    output = tmp_path / "out.txt"
+    monkeypatch.setattr("sys.argv", [
+        "rover_control.py", "-f", str(cmd_file), "-o", str(output),
+        "--log-file", str(tmp_path / "rover.log"), "--workers", str(workers)])
+    rover_control.main()
+    assert capsys.readouterr().out == ""
+    assert output.read_text() == serial
+
+
+def test_resume_file(cmd_file, capsys, tmp_path, monkeypatch):
+    """--resume keeps the output of the checkpoint and finishes the file"""
+    rover_control.process_from_file(cmd_file)
+    serial = capsys.readouterr().out
+
+    output = tmp_path / "out.txt"
+    argv = [
+        "rover_control.py", "-f", str(cmd_file), "-o", str(output),
+        "--log-file", str(tmp_path / "rover.log"),
+        "--checkpoint", str(tmp_path / "checkpoint"),
+        "--checkpoint-every", "5"]
+    monkeypatch.setattr("sys.argv", argv)
+    rover_control.main()
+    assert output.read_text() == serial
+
+    # results written after the last checkpoint are dropped
+    output.write_text(serial + "1 1 N\n")
+    monkeypatch.setattr("sys.argv", argv + ["--resume"])
+    rover_control.main()
+    assert output.read_text() == serial
+
+
+def test_coverage_file(tmp_path, monkeypatch, capsys):
+    """--coverage writes the cells the rovers visited"""
+    cmd_file = tmp_path / "cmds.txt"
+    cmd_file.write_text("5 5\n1 2 N\nLMLMLMLMM\n")
+    output = tmp_path / "coverage.txt"
+    monkeypatch.setattr("sys.argv", [
+        "rover_control.py", "-f", str(cmd_file), "--coverage", str(output),
+        "--log-file", str(tmp_path / "rover.log")])
+    rover_control.main()
+    assert capsys.readouterr().out == "1 3 N\n"
+    assert output.read_text() == "0 1\n1 1\n0 2\n1 2\n1 3\n"
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_obstacles_file(tmp_path, monkeypatch, capsys, binary):
+    """--obstacles stops the rovers before the blocked cells"""
+    cmd_file = tmp_path / "cmds.txt"
+    cmd_file.write_text("5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMRMMRMRRM\n")
+    map_file = tmp_path / "map.txt"
+    map_file.write_text("# rocks\n1 3\n4 1 5 1\n")
+    if binary:
+        monkeypatch.setattr("sys.argv", [
+            "rover_obstacles.py", str(map_file), str(tmp_path / "map.bin"),
+            "--plateau", "5", "5"])
+        rover_obstacles.main()
+        map_file = tmp_path / "map.bin"
+    monkeypatch.setattr("sys.argv", [
+        "rover_control.py", "-f", str(cmd_file), "--obstacles", str(map_file),
+        "--log-file", str(tmp_path / "rover.log")])
+    rover_control.main()
+    assert capsys.readouterr().out == "1 2 N\n5 2 E\n"
+
+
+def test_read_line_chunks():
+    """Lines are split in chunks and unread chunks are skipped"""
+    cmd_file = io.StringIO("5 5\nLMLMLMLMM\n\nMM")
+    lines = rover_control.read_line_chunks(cmd_file, 4)
+    assert list(next(lines)) == ["5 5\n"]
+    assert next(next(lines)) == "LMLM"
+    assert [list(line) for line in lines] == [["\n"], ["MM"]]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 1024])
+def test_stream_same_as_serial(cmd_file, capsys, read_size):
+    """Streaming the lines prints exactly the same"""
+    rover_control.process_from_file(cmd_file)
+    serial = capsys.readouterr().out
+
+    rover_control.process_from_file(cmd_file, read_size=read_size)
+    assert capsys.readouterr().out == serial
+
+
+@pytest.mark.parametrize("engine", ["step", "runlength"])
+def test_mmap_same_as_serial(cmd_file, capsys, engine):
+    """Mapping the file prints exactly the same"""
+    rover_control.process_from_file(cmd_file, engine)
+    serial = capsys.readouterr().out
+
+    rover_control.process_from_file(cmd_file, engine, use_mmap=True)
+    assert capsys.readouterr().out == serial
+
+
+@pytest.mark.parametrize("content,expect", [
+    (b"", []),
+    (b"5 5", [b"5 5"]),
+    (b" 5 5 \r\n\n1 2 N\r\n", [b"5 5", b"", b"1 2 N"]),
+])
+def test_get_next_line_mmap(tmp_path, content, expect):
+    """Lines are stripped memoryviews of the file"""
+    path = tmp_path / "cmds.txt"
+    path.write_bytes(content)
+    assert [
+        line.tobytes() for line in rover_control.get_next_line_mmap(path)
+    ] == expect
+
+
+class HugeLineFile:
+    """File object whose second line is a huge command line
+
+    The same chunk is returned over and over, so the file itself doesn't take
+    memory.
+    """
+    def __init__(self, chunk, count):
+        self.chunk = chunk
+        self.count = count
+        self.lines = ["1000000 1000000\n", "0 0 N\n"]
+
+    def readline(self, size):
+        """Mimics a text file readline(size)"""
+        if self.lines:
+            return self.lines.pop(0)
+        if not self.count:
+            return ""
+        assert size >= len(self.chunk)
+        self.count -= 1
+        return self.chunk if self.count else "\n"
+
+
+def test_stream_huge_line(capsys, caplog):
+    """A multi-GB command line is processed with constant memory"""
+    # the moves rejected in each chunk are logged, don't keep the records
+    caplog.set_level(logging.CRITICAL)
+    read_size = 2 ** 20
+    # go around in a square, so after every 4 chunks it is back to 0 0 N
+    chunk = "M" * (read_size - 1) + "R"
+    # 2 GiB line
+    cmd_file = HugeLineFile(chunk, 2 ** 11 + 1)
+
+    control = rover.control.Control("runlength")
+    tracemalloc.start()
+    try:
+        for line in rover_control.read_line_chunks(cmd_file, read_size):
+            control.process_chunks(line)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert capsys.readouterr().out == "0 0 N\n"
+    assert peak < 4 * read_size
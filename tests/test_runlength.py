@@ -0,0 +1,114 @@
+# pylint:disable=redefined-outer-name
+'''Test the run-length navigation engine'''
+import logging
+import random
+
+import pytest
+
+import rover.exceptions as exceptions
+import rover.occupancy as occupancy
+import rover.rover
+import rover.runlength as runlength
+import rover.trajectory as trajectory
+
+
+@pytest.mark.parametrize("cmds,expect", [
+    ("", []),
+    ("MMM", [(3, 0, 0)]),
+    ("LLMRX", [(0, 2, 0), (1, 0, 0), (0, 1, 1)]),
+    ("RRRRMLL", [(0, 0, 0), (1, 0, 0), (0, 2, 0)]),
+    ("LRTM", [(0, 0, 1), (1, 0, 0)]),
+])
+def test_compress(cmds, expect):
+    """Check the commands are compressed into (moves, turns, invalid)"""
+    assert list(runlength.compress(cmds)) == expect
+
+
+@pytest.mark.parametrize("initial_coord,cmds,expect", [
+    ((1, 2, "N"), "LMLMLMLMM", "1 3 N"),
+    ((3, 3, "E"), "MMRMMRMRRM", "5 1 E"),
+    ((0, 0, "N"), "MMMMMMMMMMMMMMMMMM", "0 5 N"),
+    ((0, 0, "N"), "MMMTRUM", "1 3 E"),
+    ((2, 2, "W"), "MMMMMMLMMMMMMM", "0 0 S"),
+])
+def test_navigation(initial_coord, cmds, expect, new_rover):
+    """Test rover's navigation with the run-length engine"""
+    test_rover = new_rover((5, 5), initial_coord, "runlength")
+    assert test_rover.navigate(cmds) == expect
+
+
+def test_invalid_engine():
+    """Only known engines can be used"""
+    with pytest.raises(exceptions.InvalidEngine):
+        rover.rover.Rover("warp")
+
+
+def test_outside_boundaries(new_rover):
+    """A rover left outside the plateau can only move back into it"""
+    for engine in rover.rover.Rover.engines:
+        test_rover = new_rover((5, 5), (5, 5, "N"), engine)
+        test_rover.set_boundaries(3, 3)
+        assert test_rover.navigate("MMRMMRMM") == "5 5 S"
+        test_rover.set_boundaries(5, 4)
+        assert test_rover.navigate("MM") == "5 3 S"
+
+
+@pytest.mark.parametrize("engine", rover.rover.Rover.engines)
+@pytest.mark.parametrize("step_limit", [None, 0, 256])
+def test_logs_rejected(engine, step_limit, caplog, new_rover, tmp_path):
+    """Every engine logs the rejected moves and the invalid commands, also
+    while recording the trajectory"""
+    test_rover = new_rover((5, 5), (0, 0, "N"), engine)
+    if step_limit is not None:
+        recorder = trajectory.TrajectoryRecorder(tmp_path)
+        recorder.step_limit = step_limit
+        test_rover.set_recorder(recorder)
+    test_rover.navigate("MMMMMMMXR")
+    assert caplog.messages == [
+        "rejected 2 moves", "skipped 1 invalid commands"]
+
+
+def test_traced_logs_invalid_once(caplog, new_rover):
+    """Tracing logs the invalid commands once per series, not each one"""
+    test_rover = new_rover((5, 5), (0, 0, "N"))
+    with caplog.at_level(logging.DEBUG):
+        test_rover.navigate("MXRYM")
+    assert "skipped 2 invalid commands" in caplog.messages
+    assert not [record for record in caplog.records if record.exc_info]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_same_as_step(seed, new_rover):
+    """Randomized check that both engines end up in the same location"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 8), rand.randint(0, 8))
+    initial_coord = (
+        rand.randint(0, boundaries[0]),
+        rand.randint(0, boundaries[1]),
+        rand.choice("NESW"),
+    )
+    # mostly long straight segments, with some noise
+    alphabet = "M" * 6 + "LR" * 2 + "X "
+    cmds = "".join(rand.choice(alphabet) for _ in range(rand.randint(0, 300)))
+
+    step = new_rover(boundaries, initial_coord)
+    fast = new_rover(boundaries, initial_coord, "runlength")
+    assert fast.navigate(cmds) == step.navigate(cmds)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_same_as_step_with_fleet(seed, new_rover):
+    """Randomized check with cells taken by other rovers"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(3, 8), rand.randint(3, 8))
+    taken = occupancy.Occupancy(boundaries)
+    for _ in range(rand.randint(1, 10)):
+        taken.add((rand.randint(0, boundaries[0]),
+                   rand.randint(0, boundaries[1])))
+    initial_coord = (0, 0, rand.choice("NESW"))
+    taken.discard(initial_coord[:2])
+    cmds = "".join(rand.choice("MMMMMMLR") for _ in range(200))
+
+    step = new_rover(boundaries, initial_coord, taken=taken)
+    fast = new_rover(boundaries, initial_coord, "runlength", taken)
+    assert fast.navigate(cmds) == step.navigate(cmds)
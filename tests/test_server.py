@@ -0,0 +1,82 @@
+'''Test the rover command server'''
+import asyncio
+import socket
+
+import pytest
+
+import rover.maneuvers as maneuvers
+import rover.server as server
+
+
+async def exchange(data, path=None, **options):
+    """Starts a server, sends the data at once and reads until it closes"""
+    srv = await server.start("127.0.0.1", 0, path, **options)
+    async with srv:
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            port = srv.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        writer.write_eof()
+        output = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    return output
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"engine": "runlength"},
+    {"read_size": 3},
+    {"avoid_collisions": True},
+    {"maneuvers": maneuvers.ManeuverCache()},
+])
+def test_serve(options):
+    """The final coordinates of each rover are sent back"""
+    data = b"5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMRMMRMRRM"
+    output = asyncio.run(exchange(data, **options))
+    assert output == b"1 3 N\n5 1 E\n"
+
+
+def test_bad_lines():
+    """Bad lines are skipped, like rover_control.py does"""
+    data = b"MMM\n5 5\n9 9 N\n1 2 X\n" + b"1" * 5000 + b"\n1 2 N\r\nMMMM\n"
+    output = asyncio.run(exchange(data, read_size=100))
+    assert output == b"1 5 N\n"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"),
+                    reason="Unix sockets are not available")
+def test_unix_socket(tmp_path):
+    """The server can listen on a Unix socket"""
+    path = str(tmp_path / "rover.sock")
+    output = asyncio.run(exchange(b"5 5\n1 2 N\nLMLMLMLMM\n", path))
+    assert output == b"1 3 N\n"
+
+
+def test_huge_line_doesnt_starve():
+    """Short requests are answered while a huge line is being navigated"""
+    async def scenario():
+        srv = await server.start("127.0.0.1", 0, read_size=1024)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            _, hog = await asyncio.open_connection("127.0.0.1", port)
+            hog.write(b"5 5\n0 0 N\n")
+            # a command line that never ends while the other client is served
+            for _ in range(64):
+                hog.write(b"LR" * 4096)
+            await hog.drain()
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"5 5\n1 2 N\nLMLMLMLMM\n")
+            output = await asyncio.wait_for(reader.readline(), 10)
+
+            hog.write(b"M\n")
+            hog.write_eof()
+            for stream in (writer, hog):
+                stream.close()
+                await stream.wait_closed()
+        return output
+
+    assert asyncio.run(scenario()) == b"1 3 N\n"
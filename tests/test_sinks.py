@@ -0,0 +1,47 @@
+'''Test the result sinks'''
+import io
+
+import rover.control
+import rover.sinks as sinks
+
+
+def test_buffered():
+    """Results are only written once enough chars are pending"""
+    stream = io.StringIO()
+    sink = sinks.BufferedSink(stream, flush_size=12)
+    sink.write("1 3 N")
+    assert stream.getvalue() == ""
+    sink.write("5 1 E")
+    assert stream.getvalue() == "1 3 N\n5 1 E\n"
+    sink.write("0 0 S")
+    sink.close()
+    assert stream.getvalue() == "1 3 N\n5 1 E\n0 0 S\n"
+
+
+def test_buffered_stdout(capsys):
+    """By default, the results go to stdout"""
+    sink = sinks.BufferedSink()
+    sink.write("1 3 N")
+    sink.flush()
+    assert capsys.readouterr().out == "1 3 N\n"
+
+
+def test_list_and_callback():
+    """Results can be kept in memory or handed to a function"""
+    received = []
+    list_sink = sinks.ListSink()
+    callback_sink = sinks.CallbackSink(received.append)
+    for result in ["1 3 N", "5 1 E"]:
+        list_sink.write(result)
+        callback_sink.write(result)
+    assert list_sink.results == received == ["1 3 N", "5 1 E"]
+
+
+def test_control_sink(capsys):
+    """Control sends the final coordinates to its sink"""
+    sink = sinks.ListSink()
+    controller = rover.control.Control(sink=sink)
+    for cmd in ["5 5", "1 2 N", "LMLMLMLMM", "3 3 E", "MMRMMRMRRM"]:
+        controller.process(cmd)
+    assert sink.results == ["1 3 N", "5 1 E"]
+    assert capsys.readouterr().out == ""
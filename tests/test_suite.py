@@ -0,0 +1,62 @@
+'''Test the benchmark suite comparison'''
+import pytest
+
+from benchmarks import suite
+
+MIB = 2 ** 20
+
+
+def result(rate, peak_bytes=10 * MIB, unit="cmds"):
+    """Helper that builds the result of a path"""
+    return {"seconds": 1.0, f"{unit}_per_s": rate, "rovers_per_s": 1.0,
+            "peak_bytes": peak_bytes}
+
+
+@pytest.mark.parametrize("rate,expect", [
+    (1000, []),
+    (1200, []),
+    (901, []),
+    (899, ["short navigate: 899 cmds/s, was 1,000"]),
+])
+def test_throughput(rate, expect):
+    """Only throughput worse than the tolerance is a regression"""
+    baseline = {"short": {"navigate": result(1000)}}
+    results = {"short": {"navigate": result(rate)}}
+    assert suite.compare(results, baseline, 0.1) == expect
+
+
+def test_parse_in_lines():
+    """Parsing is compared in lines/s"""
+    baseline = {"long": {"parse": result(1000, unit="lines")}}
+    results = {"long": {"parse": result(500, unit="lines")}}
+    assert suite.compare(results, baseline, 0.1) == [
+        "long parse: 500 lines/s, was 1,000"]
+    # a baseline from before parsing counted lines can't be compared
+    baseline = {"long": {"parse": result(1000)}}
+    assert not suite.compare(results, baseline, 0.1)
+
+
+@pytest.mark.parametrize("peak_bytes,expect", [
+    (10 * MIB, []),
+    (11 * MIB, []),
+    (12 * MIB, ["short cli: peak 12.0 MiB, was 10.0 MiB"]),
+])
+def test_memory(peak_bytes, expect):
+    """Memory is a regression beyond the tolerance and the noise"""
+    baseline = {"short": {"cli": result(1000)}}
+    results = {"short": {"cli": result(1000, peak_bytes)}}
+    assert suite.compare(results, baseline, 0.1) == expect
+
+
+def test_small_memory_change():
+    """Changes below MIN_MEMORY_CHANGE are noise, whatever the ratio"""
+    baseline = {"short": {"cli": result(1000, 1000)}}
+    results = {"short": {"cli": result(1000, suite.MIN_MEMORY_CHANGE)}}
+    assert not suite.compare(results, baseline, 0.1)
+
+
+def test_missing_from_baseline():
+    """Workloads and paths new since the baseline are skipped"""
+    baseline = {"short": {"navigate": result(1000)}}
+    results = {"short": {"cli": result(1)}, "noise": {"navigate": result(1)}}
+    assert not suite.compare(results, baseline, 0.1)
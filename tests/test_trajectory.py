@@ -0,0 +1,93 @@
+# pylint:disable=redefined-outer-name
+'''Test the trajectory recorder'''
+import random
+
+import pytest
+
+import rover.control
+import rover.occupancy as occupancy
+import rover.sinks
+import rover.trajectory as trajectory
+
+
+def load(directory):
+    """Helper that reads every column of a trajectory"""
+    return {name: trajectory.load_column(directory / f"{name}.npy").tolist()
+            for name in ["x", "y", "heading", "rejected", "offsets"]}
+
+
+def test_example(tmp_path):
+    """Every step of the example is recorded"""
+    recorder = trajectory.TrajectoryRecorder(tmp_path)
+    control = rover.control.Control(
+        sink=rover.sinks.ListSink(), recorder=recorder)
+    for cmd in ["5 5", "1 2 N", "LMLMLMLMM", "5 5 N", "MMRM"]:
+        control.process(cmd)
+    recorder.close()
+
+    assert control.sink.results == ["1 3 N", "5 5 E"]
+    assert load(tmp_path) == {
+        "x": [1, 0, 0, 0, 0, 1, 1, 1, 1, 5, 5, 5, 5],
+        "y": [2, 2, 2, 1, 1, 1, 1, 2, 3, 5, 5, 5, 5],
+        "heading": [3, 3, 2, 2, 1, 1, 0, 0, 0, 0, 0, 1, 1],
+        "rejected": [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1],
+        "offsets": [0, 9, 13],
+    }
+
+
+@pytest.mark.parametrize("step_limit", [0, 256])
+@pytest.mark.parametrize("seed", range(20))
+def test_same_as_step(tmp_path, seed, step_limit, new_rover):
+    """Randomized check against navigating every prefix"""
+    rand = random.Random(seed)
+    boundaries = (rand.randint(0, 6), rand.randint(0, 6))
+    initial_coord = (0, 0, rand.choice("NESW"))
+    taken = None
+    if seed % 2:
+        taken = occupancy.Occupancy(boundaries)
+        for _ in range(rand.randint(1, 6)):
+            taken.add((rand.randint(0, boundaries[0]),
+                       rand.randint(0, boundaries[1])))
+        taken.discard(initial_coord[:2])
+    cmds = "".join(rand.choice("MMMMMLRX") for _ in range(rand.randint(0, 80)))
+    if seed % 3:
+        cmds = cmds.encode()
+
+    recorder = trajectory.TrajectoryRecorder(tmp_path, flush_size=7)
+    recorder.step_limit = step_limit
+    recorded = new_rover(boundaries, initial_coord, taken=taken)
+    recorded.set_recorder(recorder)
+    location = recorded.navigate(cmds)
+    recorder.close()
+    columns = load(tmp_path)
+
+    assert location == new_rover(
+        boundaries, initial_coord, taken=taken).navigate(cmds)
+    assert columns["offsets"] == [0, len(cmds)]
+    for step in range(len(cmds)):
+        prefix = new_rover(boundaries, initial_coord, taken=taken)
+        prefix.navigate(cmds[:step])
+        before = prefix.navigation.location.position
+        expect = prefix.navigate(cmds[step:step + 1])
+        x, y, heading = (columns[name][step] for name in ["x", "y", "heading"])
+        assert f"{x} {y} {'NESW'[heading]}" == expect
+        move = cmds[step:step + 1] in ("M", b"M")
+        was_rejected = move and prefix.navigation.location.position == before
+        assert columns["rejected"][step] == was_rejected
+
+
+def test_numpy_mmap(tmp_path, new_rover):
+    """The columns can be memory-mapped with NumPy"""
+    numpy = pytest.importorskip("numpy")
+    recorder = trajectory.TrajectoryRecorder(tmp_path, flush_size=3)
+    recorder.step_limit = 0
+    recorded = new_rover((9, 9), (0, 0, "N"))
+    recorded.set_recorder(recorder)
+    recorded.navigate("M" * 20)
+    recorder.close()
+
+    y = numpy.load(tmp_path / "y.npy", mmap_mode="r")
+    assert y.dtype == numpy.int64
+    assert y.tolist() == list(range(1, 10)) + [9] * 11
+    rejected = numpy.load(tmp_path / "rejected.npy", mmap_mode="r")
+    assert int(rejected.sum()) == 11